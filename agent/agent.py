@@ -1,8 +1,6 @@
 from typing import Any, Dict, Optional
 
-from langchain.tools import Tool
 from langchain.tools import BaseTool
-from langchain.agents.agent import AgentExecutor
 from langchain.agents.conversational.base import ConversationalAgent
 from langchain.callbacks.base import BaseCallbackManager
 from langchain.chains.llm import LLMChain
@@ -12,6 +10,7 @@ from langchain.schema.language_model import BaseLanguageModel
 from config import config
 from tools.human.tool import HumanTool
 from tools.reasoning.tool import ShowReasoningTool, HideReasoningTool
+from agent.executor import ParallelAgentExecutor
 from agent.output_parser import OutputParser
 from agent.prompt import (
     AGENT_PROMPT_PREFIX,
@@ -19,37 +18,20 @@ from agent.prompt import (
 )
 
 
-def create_agent(
-    llm: BaseLanguageModel,
-    shared_memory: Optional[ReadOnlySharedMemory] = None,
-    tools: list[BaseTool] = [],
-    callback_manager: Optional[BaseCallbackManager] = None,
-    verbose: bool = True,
-    agent_executor_kwargs: Optional[Dict[str, Any]] = None,
-    **kwargs: Dict[str, Any],
-) -> AgentExecutor:
-    """Instantiate planner for a given task."""
-
-    system_tools = [
+def system_tools() -> list[BaseTool]:
+    return [
         HumanTool(),
         ShowReasoningTool(),
         HideReasoningTool(),
     ]
 
-    tools.extend(system_tools)
-
-    if config.infrapilot_CONFIG.RAG_ENABLED:
-        from rag.ingest import ingest_documentation
-        ingest_documentation(source_dir="docs")
-        from rag.rag_chain import create_rag_chain
-        rag_chain = create_rag_chain(k=3)
-        docs_tool = Tool(
-            name="documentation_search",
-            func=lambda q: rag_chain.run(q),
-            description="Retrieve up-to-date Kubernetes/AWS documentation snippets"
-        )
-        tools.append(docs_tool)
 
+def create_conversational_agent(
+    llm: BaseLanguageModel,
+    tools: list[BaseTool],
+    **kwargs: Dict[str, Any],
+) -> ConversationalAgent:
+    """Planner agent whose prompt describes the given tools."""
     format_instructions = FORMAT_INSTRUCTIONS_TEMPLATE.format(
         natural_language=config.infrapilot_CONFIG.natural_language
     )
@@ -59,7 +41,7 @@ def create_agent(
         format_instructions=format_instructions,
     )
 
-    agent = ConversationalAgent(
+    return ConversationalAgent(
         llm_chain=LLMChain(
             llm=llm, prompt=prompt, verbose=config.infrapilot_CONFIG.verbose
         ),
@@ -68,11 +50,55 @@ def create_agent(
         **kwargs,
     )
 
-    return AgentExecutor.from_agent_and_tools(
+
+def create_agent(
+    llm: BaseLanguageModel,
+    shared_memory: Optional[ReadOnlySharedMemory] = None,
+    tools: list[BaseTool] = [],
+    callback_manager: Optional[BaseCallbackManager] = None,
+    verbose: bool = True,
+    agent_executor_kwargs: Optional[Dict[str, Any]] = None,
+    **kwargs: Dict[str, Any],
+) -> ParallelAgentExecutor:
+    """Instantiate planner for a given task."""
+
+    tools.extend(system_tools())
+
+    if config.infrapilot_CONFIG.RAG_ENABLED:
+        from rag.coordinator import coordinator
+        from rag.tool import DocumentationSearchTool
+
+        coordinator.start(source_dir="docs")
+        tools.append(DocumentationSearchTool(k=3))
+
+    agent = create_conversational_agent(llm, tools, **kwargs)
+    executor_kwargs = {
+        "max_workers": config.infrapilot_CONFIG.tool_workers,
+        **(agent_executor_kwargs or {}),
+    }
+
+    top_n = config.infrapilot_CONFIG.tool_router_top_n
+    if top_n > 0 and len(tools) > top_n:
+        from agent.tool_router import RoutedAgentExecutor, ToolRouter
+
+        return RoutedAgentExecutor.from_agent_and_tools(
+            agent=agent,
+            tools=tools,
+            router=ToolRouter(tools, top_n),
+            agent_factory=lambda routed_tools: create_conversational_agent(
+                llm, routed_tools, **kwargs
+            ),
+            memory=shared_memory,
+            callback_manager=callback_manager,
+            verbose=verbose,
+            **executor_kwargs,
+        )
+
+    return ParallelAgentExecutor.from_agent_and_tools(
         agent=agent,
         tools=tools,
         memory=shared_memory,
         callback_manager=callback_manager,
         verbose=verbose,
-        **(agent_executor_kwargs or {}),
+        **executor_kwargs,
     )
@@ -0,0 +1,118 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from langchain.agents.agent import AgentExecutor
+from langchain.callbacks.manager import (
+    AsyncCallbackManagerForChainRun,
+    CallbackManagerForChainRun,
+)
+from langchain.schema import AgentAction, AgentFinish
+from langchain.tools import BaseTool
+
+
+class _DeferredRun(partial):
+    """A tool run held back until the step's actions are all planned."""
+
+
+class _PooledTool:
+    """Stands in for a tool during one agent step.
+
+    run() defers the call, so the executor can run the step's calls
+    together; arun() waits for one of the step's slots first.
+    """
+
+    def __init__(
+        self, tool: BaseTool, slots: Optional[asyncio.Semaphore] = None
+    ):
+        self.tool = tool
+        self.slots = slots
+
+    @property
+    def return_direct(self) -> bool:
+        return self.tool.return_direct
+
+    def run(self, *args: Any, **kwargs: Any) -> _DeferredRun:
+        return _DeferredRun(self.tool.run, *args, **kwargs)
+
+    async def arun(self, *args: Any, **kwargs: Any) -> str:
+        async with self.slots:
+            return await self.tool.arun(*args, **kwargs)
+
+
+class ParallelAgentExecutor(AgentExecutor):
+    """AgentExecutor that runs the actions the agent plans in one step
+    concurrently, on at most max_workers workers.
+
+    Each action still goes through its tool's run, so its callbacks, such
+    as the approval of a RequireApprovalTool, apply to it alone; the
+    observations are returned together as the step's result.
+    """
+
+    max_workers: int = 4
+
+    def _take_next_step(
+        self,
+        name_to_tool_map: Dict[str, BaseTool],
+        color_mapping: Dict[str, str],
+        inputs: Dict[str, str],
+        intermediate_steps: List[Tuple[AgentAction, str]],
+        run_manager: Optional[CallbackManagerForChainRun] = None,
+    ) -> Union[AgentFinish, List[Tuple[AgentAction, str]]]:
+        pooled = {
+            name: _PooledTool(tool) for name, tool in name_to_tool_map.items()
+        }
+        output = super()._take_next_step(
+            pooled,
+            color_mapping,
+            inputs,
+            intermediate_steps,
+            run_manager=run_manager,
+        )
+        if isinstance(output, AgentFinish):
+            return output
+
+        runs = [
+            observation
+            for _, observation in output
+            if isinstance(observation, _DeferredRun)
+        ]
+        if len(runs) > 1 and self.max_workers > 1:
+            workers = min(self.max_workers, len(runs))
+            with ThreadPoolExecutor(workers) as pool:
+                observations = list(pool.map(lambda run: run(), runs))
+        else:
+            observations = [run() for run in runs]
+
+        results = iter(observations)
+        return [
+            (
+                action,
+                next(results)
+                if isinstance(observation, _DeferredRun)
+                else observation,
+            )
+            for action, observation in output
+        ]
+
+    async def _atake_next_step(
+        self,
+        name_to_tool_map: Dict[str, BaseTool],
+        color_mapping: Dict[str, str],
+        inputs: Dict[str, str],
+        intermediate_steps: List[Tuple[AgentAction, str]],
+        run_manager: Optional[AsyncCallbackManagerForChainRun] = None,
+    ) -> Union[AgentFinish, List[Tuple[AgentAction, str]]]:
+        slots = asyncio.Semaphore(max(1, self.max_workers))
+        pooled = {
+            name: _PooledTool(tool, slots=slots)
+            for name, tool in name_to_tool_map.items()
+        }
+        return await super()._atake_next_step(
+            pooled,
+            color_mapping,
+            inputs,
+            intermediate_steps,
+            run_manager=run_manager,
+        )
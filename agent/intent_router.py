@@ -0,0 +1,383 @@
+import json
+import math
+import re
+import time
+from collections import Counter
+from typing import Callable, Optional
+
+from langchain.tools import BaseTool
+
+from utils import utils
+from utils.text import singular, tokenize
+
+# Resource kinds list_kubernetes_resources is dispatched for.
+KUBERNETES_KINDS = {
+    "pod": "pods",
+    "deployment": "deployments",
+    "service": "services",
+    "svc": "services",
+    "node": "nodes",
+    "namespace": "namespaces",
+    "ns": "namespaces",
+    "configmap": "configmaps",
+    "secret": "secrets",
+    "ingress": "ingresses",
+    "ingresse": "ingresses",
+    "statefulset": "statefulsets",
+    "daemonset": "daemonsets",
+    "replicaset": "replicasets",
+    "job": "jobs",
+    "cronjob": "cronjobs",
+    "pvc": "pvc",
+    "pv": "pv",
+    "event": "events",
+    "serviceaccount": "serviceaccounts",
+}
+NAME = r"[a-z0-9]([-a-z0-9.]*[a-z0-9])?"
+NAMESPACE = (
+    r"(\s+(in|from)(\s+the)?\s+((?P<namespace>" + NAME + r")"
+    r"(\s+namespace)?|namespace\s+(?P<namespace2>" + NAME + r")"
+    r"|(?P<all>all\s+namespaces))"
+    r"|\s+-n\s+(?P<flag_namespace>" + NAME + r")"
+    r"|\s+(?P<flag_all>-a|-A|--all-namespaces)"
+    r")?"
+)
+LIST = r"(list|show|get|display|what are)(\s+me)?(\s+(all|the))*"
+
+
+# The pattern matches names case-insensitively; Kubernetes names must be
+# lowercase DNS-1123 labels (namespaces) or subdomains (pods).
+DNS1123_LABEL = re.compile(r"[a-z0-9]([-a-z0-9]*[a-z0-9])?")
+DNS1123_SUBDOMAIN = re.compile(
+    r"[a-z0-9]([-a-z0-9]*[a-z0-9])?(\.[a-z0-9]([-a-z0-9]*[a-z0-9])?)*"
+)
+
+
+def _namespace(match: re.Match, allow_all: bool = False) -> Optional[str]:
+    """Namespace of the query, "--all" for all namespaces where allow_all,
+    "" when none is named; None when it cannot be served."""
+    if match.group("all") or match.group("flag_all"):
+        return "--all" if allow_all else None
+    namespace = (
+        match.group("namespace")
+        or match.group("namespace2")
+        or match.group("flag_namespace")
+        or ""
+    )
+    if namespace and not (
+        len(namespace) <= 63 and DNS1123_LABEL.fullmatch(namespace)
+    ):
+        return None
+    return namespace
+
+
+def _pod_name(match: re.Match) -> Optional[str]:
+    name = match.group("name")
+    if len(name) <= 253 and DNS1123_SUBDOMAIN.fullmatch(name):
+        return name
+    return None
+
+
+def _list_resources(match: re.Match) -> Optional[dict]:
+    kind = KUBERNETES_KINDS.get(singular(match.group("kind").lower()))
+    namespace = _namespace(match, allow_all=True)
+    if kind is None or namespace is None:
+        return None
+    return {"resource_kind": kind, "namespace": namespace}
+
+
+def _pod_logs(match: re.Match) -> Optional[dict]:
+    name, namespace = _pod_name(match), _namespace(match)
+    if name is None or namespace is None:
+        return None
+    return {
+        "name": name,
+        "namespace": namespace,
+        "container_name": "",
+        "line_number": int(match.group("lines") or 50),
+    }
+
+
+def _describe_pod(match: re.Match) -> Optional[dict]:
+    name, namespace = _pod_name(match), _namespace(match)
+    if name is None or namespace is None:
+        return None
+    return {"name": name, "namespace": namespace}
+
+
+def _list_applications(match: re.Match) -> Optional[dict]:
+    namespace = _namespace(match, allow_all=True)
+    if namespace is None:
+        return None
+    return {"namespace": namespace}
+
+
+def _list_all(match: re.Match) -> dict:
+    groups = match.groupdict()
+    return {"all": bool(groups.get("all_flag") or groups.get("all"))}
+
+
+class Intent:
+    """A read-only request served by one tool: a pattern the whole query
+    must match, the builder of the tool input from the match, and example
+    queries for the classifier."""
+
+    def __init__(
+        self,
+        tool_name: str,
+        pattern: str,
+        arguments: Callable[[re.Match], Optional[dict]],
+        examples: list[str],
+    ):
+        self.tool_name = tool_name
+        self.pattern = re.compile(pattern + r"\s*[?.!]?", re.IGNORECASE)
+        self.arguments = arguments
+        self.examples = examples
+
+
+INTENTS = [
+    Intent(
+        "list_kubernetes_resources",
+        r"(" + LIST + r"|kubectl\s+get)\s+(?P<kind>[a-z]+)" + NAMESPACE,
+        _list_resources,
+        [
+            "list pods in kube-system",
+            "show me all deployments",
+            "get services in the default namespace",
+            "list nodes",
+            "show configmaps in namespace dev",
+            "kubectl get pods -n prod",
+            "list all pods in all namespaces",
+            "what are the secrets in staging",
+        ],
+    ),
+    Intent(
+        "get_kubernetes_pod_logs",
+        LIST + r"(\s+(last|latest)\s+(?P<lines>\d+)(\s+lines\s+of)?)?"
+        r"\s+logs?\s+(of|for|from)(\s+the)?\s+pod\s+(?P<name>" + NAME + r")"
+        + NAMESPACE,
+        _pod_logs,
+        [
+            "show logs of pod web-1",
+            "get the logs for pod api-7f9 in prod",
+            "show last 100 lines of logs of pod db-0",
+            "show me the logs of pod nginx",
+        ],
+    ),
+    Intent(
+        "describe_pod",
+        r"(kubectl\s+)?describe(\s+the)?\s+pod\s+(?P<name>" + NAME + r")"
+        + NAMESPACE,
+        _describe_pod,
+        [
+            "describe pod web-1",
+            "describe the pod api-7f9 in prod",
+            "kubectl describe pod nginx -n web",
+        ],
+    ),
+    Intent(
+        "list_applications",
+        r"(" + LIST + r"\s+(helm\s+)?(apps|applications|releases|charts)"
+        r"|helm\s+(list|ls))" + NAMESPACE,
+        _list_applications,
+        [
+            "list helm apps",
+            "show applications in namespace dev",
+            "list helm releases in all namespaces",
+            "helm list",
+        ],
+    ),
+    Intent(
+        "list_docker_containers",
+        r"(docker\s+ps(\s+(?P<all_flag>-a|--all))?"
+        r"|(list|show|get|display|what are)(\s+me)?(\s+(?P<all>all))?"
+        r"(\s+the)?(\s+running)?\s+(docker\s+)?containers)",
+        _list_all,
+        [
+            "docker ps -a",
+            "docker ps",
+            "list containers",
+            "show running containers",
+            "list all docker containers",
+        ],
+    ),
+    Intent(
+        "list_docker_images",
+        r"(docker\s+images(\s+(?P<all_flag>-a|--all))?"
+        r"|" + LIST + r"\s+(docker\s+)?images)",
+        _list_all,
+        [
+            "docker images",
+            "list docker images",
+            "show images",
+        ],
+    ),
+    Intent(
+        "list_docker_volumes",
+        r"(docker\s+volume\s+(ls|list)"
+        r"|" + LIST + r"\s+(docker\s+)?volumes)",
+        lambda match: {},
+        ["docker volume ls", "list volumes", "show docker volumes"],
+    ),
+]
+
+READ_CLASS = "read"
+AGENT_CLASS = "agent"
+# Requests the planner must handle, so the classifier learns what a
+# read-only request is not.
+AGENT_EXAMPLES = [
+    "create an nginx deployment with 3 replicas",
+    "delete the failing pods in kube-system",
+    "why is pod web-1 crashing",
+    "fix the deployment api",
+    "scale the deployment web to 5 replicas",
+    "restart the pod db-0",
+    "deploy wordpress with helm",
+    "upgrade my redis application",
+    "uninstall the application grafana",
+    "run an nginx container on port 8080",
+    "stop container web",
+    "remove the image nginx",
+    "pull the postgres image",
+    "build an image from github.com/org/app",
+    "create a volume named data",
+    "how do I reach the frontend service",
+    "explain what a stateful set is",
+    "compare the pods in dev and prod",
+    "list pods and delete the failing ones",
+    "which pods use the most memory",
+    "launch an ec2 instance",
+    "create an s3 bucket",
+    "show logs of container api",
+    "apply this yaml",
+]
+
+
+class IntentClassifier:
+    """Multinomial naive Bayes over query terms telling read-only requests
+    (the intent examples) from requests that need the planner."""
+
+    def __init__(self, examples: dict[str, list[str]]):
+        self.term_counts = {
+            label: Counter(
+                term for text in texts for term in self._terms(text)
+            )
+            for label, texts in examples.items()
+        }
+        total = sum(len(texts) for texts in examples.values())
+        self.log_priors = {
+            label: math.log(len(texts) / total)
+            for label, texts in examples.items()
+        }
+        self.vocabulary = set().union(*self.term_counts.values())
+
+    @staticmethod
+    def _terms(text: str) -> list[str]:
+        return [singular(term) for term in tokenize(text)]
+
+    def probabilities(self, text: str) -> dict[str, float]:
+        terms = [
+            term for term in self._terms(text) if term in self.vocabulary
+        ]
+        scores = {}
+        for label, counts in self.term_counts.items():
+            denominator = sum(counts.values()) + len(self.vocabulary)
+            scores[label] = self.log_priors[label] + sum(
+                math.log((counts[term] + 1) / denominator) for term in terms
+            )
+        top = max(scores.values())
+        weights = {
+            label: math.exp(score - top) for label, score in scores.items()
+        }
+        total = sum(weights.values())
+        return {label: weight / total for label, weight in weights.items()}
+
+
+class IntentRouter:
+    """Serves high-confidence read-only requests by calling their tool
+    directly, skipping the planner LLM.
+
+    A request is served only when the whole query matches an intent
+    pattern, the pattern yields valid tool input, and the classifier gives
+    that intent at least threshold probability; anything else falls back to
+    the agent. Counts and latencies of both paths are kept for stats().
+    """
+
+    def __init__(self, tools: list[BaseTool], threshold: float = 0.8):
+        self.threshold = threshold
+        tools_by_name = {tool.name: tool for tool in tools}
+        self.intents = [
+            intent for intent in INTENTS if intent.tool_name in tools_by_name
+        ]
+        self.tools = tools_by_name
+        self.classifier = IntentClassifier(
+            {
+                READ_CLASS: [
+                    example
+                    for intent in INTENTS
+                    for example in intent.examples
+                ],
+                AGENT_CLASS: AGENT_EXAMPLES,
+            }
+        )
+        self.served = 0
+        self.served_seconds = 0.0
+        self.fallbacks = 0
+        self.fallback_seconds = 0.0
+
+    def match(self, query: str) -> Optional[tuple[BaseTool, dict]]:
+        query = " ".join(query.split())
+        for intent in self.intents:
+            match = intent.pattern.fullmatch(query)
+            if match is None:
+                continue
+            arguments = intent.arguments(match)
+            if arguments is None:
+                continue
+            probabilities = self.classifier.probabilities(query)
+            if probabilities[READ_CLASS] < self.threshold:
+                return None
+            return self.tools[intent.tool_name], arguments
+        return None
+
+    def run(self, query: str) -> Optional[str]:
+        """Tool output for query, or None when the agent must handle it."""
+        start = time.perf_counter()
+        matched = self.match(query)
+        if matched is None:
+            return None
+        tool, arguments = matched
+        output = tool.run(json.dumps(arguments))
+        self.served += 1
+        self.served_seconds += time.perf_counter() - start
+        if output.startswith(utils.raw_format_prefix) or output.startswith(
+            "```"
+        ):
+            return output
+        return f"```\n{output}\n```"
+
+    def record_fallback(self, seconds: float):
+        self.fallbacks += 1
+        self.fallback_seconds += seconds
+
+    def stats(self) -> dict:
+        """Share of requests served, and the latency saved estimated as the
+        mean agent turn minus the mean fast-path turn, per request
+        served."""
+        total = self.served + self.fallbacks
+        stats = {
+            "fast_path_served": self.served,
+            "fast_path_rate": round(self.served / total, 3) if total else 0.0,
+        }
+        if self.served:
+            stats["fast_path_mean_ms"] = round(
+                1000 * self.served_seconds / self.served, 1
+            )
+        if self.served and self.fallbacks:
+            saved = (
+                self.fallback_seconds / self.fallbacks
+                - self.served_seconds / self.served
+            )
+            stats["latency_saved_s"] = round(saved * self.served, 2)
+        return stats
+
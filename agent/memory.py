@@ -0,0 +1,88 @@
+from typing import Any, Dict, List, Optional
+
+from langchain.memory import ConversationSummaryBufferMemory
+from langchain.schema import get_buffer_string
+from langchain.schema.messages import BaseMessage
+
+TRUNCATED_MARKER = "\n[truncated]"
+
+
+class TokenBudgetMemory(ConversationSummaryBufferMemory):
+    """Conversation memory held within max_token_limit tokens.
+
+    Recent turns are kept verbatim. When they outgrow the budget left by the
+    running summary, the oldest whole turns are folded into the summary with
+    one LLM call. A message larger than half the budget, e.g. a full
+    resource listing, is truncated before it is stored.
+
+    Each turn appends history and summary sizes to turn_metrics, and, when
+    prompt_metrics (a PromptTokenCallbackHandler on the agent LLM) is set,
+    the prompt tokens of the turn's LLM calls.
+    """
+
+    memory_key: str = "chat_history"
+    prompt_metrics: Optional[Any] = None
+    turn_metrics: List[Dict[str, int]] = []
+
+    def _count(self, text: str) -> int:
+        return self.llm.get_num_tokens(text) if text else 0
+
+    def _tokens(self, messages: List[BaseMessage]) -> int:
+        return self._count(
+            get_buffer_string(
+                messages,
+                human_prefix=self.human_prefix,
+                ai_prefix=self.ai_prefix,
+            )
+        )
+
+    def _truncate(self, text: str, limit: int) -> str:
+        tokens = self._count(text)
+        if tokens <= limit:
+            return text
+        return text[: len(text) * limit // tokens] + TRUNCATED_MARKER
+
+    def save_context(
+        self, inputs: Dict[str, Any], outputs: Dict[str, str]
+    ) -> None:
+        input_str, output_str = self._get_input_output(inputs, outputs)
+        message_limit = self.max_token_limit // 2
+        self.chat_memory.add_user_message(
+            self._truncate(input_str, message_limit)
+        )
+        self.chat_memory.add_ai_message(
+            self._truncate(output_str, message_limit)
+        )
+        summarized_turns = self.prune()
+
+        metrics = {
+            "turn": len(self.turn_metrics) + 1,
+            "history_tokens": self._tokens(self.chat_memory.messages),
+            "summary_tokens": self._count(self.moving_summary_buffer),
+            "summarized_turns": summarized_turns,
+        }
+        if self.prompt_metrics is not None:
+            calls = self.prompt_metrics.take()
+            metrics["llm_calls"] = len(calls)
+            metrics["prompt_tokens"] = sum(calls)
+            metrics["max_prompt_tokens"] = max(calls, default=0)
+        self.turn_metrics.append(metrics)
+
+    def prune(self) -> int:
+        """Fold the oldest turns into the summary until the history fits the
+        budget, always keeping the latest turn. Returns the turns folded."""
+        buffer = self.chat_memory.messages
+        budget = self.max_token_limit - self._count(self.moving_summary_buffer)
+        pruned: List[BaseMessage] = []
+        while len(buffer) > 2 and self._tokens(buffer) > budget:
+            # A turn is a human message and the AI response to it.
+            pruned.extend(buffer[:2])
+            del buffer[:2]
+        if pruned:
+            summary = self.predict_new_summary(
+                pruned, self.moving_summary_buffer
+            )
+            self.moving_summary_buffer = self._truncate(
+                summary, self.max_token_limit // 2
+            )
+        return len(pruned) // 2
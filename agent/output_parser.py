@@ -1,10 +1,15 @@
 import re
-from typing import Union
+from typing import List, Union
 
 from langchain.agents.agent import AgentOutputParser
 from langchain.agents.conversational.prompt import FORMAT_INSTRUCTIONS
 from langchain.schema import AgentAction, AgentFinish, OutputParserException
 
+ACTION_REGEX = r"Action: (.*?)[\n]*Action Input: (.*?)\nReason: .*"
+# Start of each action of the output.
+ACTION_LINE = re.compile(r"^(?=Action: )", re.MULTILINE)
+BATCH_THOUGHT = "Do I need to use a tool? Yes"
+
 
 class OutputParser(AgentOutputParser):
     """Output parser for the agent. It extends the convoAgent parser to support multiline observation."""
@@ -15,22 +20,38 @@ class OutputParser(AgentOutputParser):
     def get_format_instructions(self) -> str:
         return FORMAT_INSTRUCTIONS
 
-    def parse(self, text: str) -> Union[AgentAction, AgentFinish]:
+    def parse(
+        self, text: str
+    ) -> Union[AgentAction, List[AgentAction], AgentFinish]:
         if f"{self.ai_prefix}:" in text:
             return AgentFinish(
                 {"output": text.split(f"{self.ai_prefix}:")[-1].strip()}, text
             )
-        regex = r"Action: (.*?)[\n]*Action Input: (.*?)\nReason: .*"
-        match = re.search(regex, text, re.DOTALL)
-        if not match:
-            raise OutputParserException(
-                f"Could not parse LLM output: `{text}`"
+        # Independent actions may be batched: one Action, Action Input and
+        # Reason block each, all before the Observation.
+        preface, *blocks = ACTION_LINE.split(text)
+        if not blocks:
+            blocks = [text]
+        actions = []
+        for i, block in enumerate(blocks):
+            match = re.search(ACTION_REGEX, block, re.DOTALL)
+            if not match:
+                raise OutputParserException(
+                    f"Could not parse LLM output: `{text}`"
+                )
+            action = match.group(1)
+            action_input = match.group(2)
+            # The log of each action is its part of the output, so the
+            # scratchpad reads as one step per action.
+            log = preface + block if i == 0 else f"{BATCH_THOUGHT}\n{block}"
+            actions.append(
+                AgentAction(
+                    action.strip(),
+                    action_input.strip(" ").strip('"'),
+                    log.rstrip() if len(blocks) > 1 else text,
+                )
             )
-        action = match.group(1)
-        action_input = match.group(2)
-        return AgentAction(
-            action.strip(), action_input.strip(" ").strip('"'), text
-        )
+        return actions[0] if len(actions) == 1 else actions
 
     @property
     def _type(self) -> str:
@@ -25,6 +25,8 @@ Reason: the reason you use this tool(in {natural_language})
 Observation: the result of the action
 ```
 
+To take several independent actions at once, such as checking a few resources whose inputs do not depend on each other's results, repeat the Action, Action Input and Reason lines for each of them before the Observation. They run together, and their observations follow in the same order.
+
 When you have a response to say to the Human, or if you do not need to use a tool, you MUST use the format:
 
 ```
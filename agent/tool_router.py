@@ -0,0 +1,244 @@
+import re
+from typing import Any, Callable, Dict, Optional
+
+from langchain.agents.agent import BaseSingleActionAgent
+from langchain.callbacks.manager import (
+    AsyncCallbackManagerForChainRun,
+    CallbackManagerForChainRun,
+)
+from langchain.tools import BaseTool
+
+from agent.executor import ParallelAgentExecutor
+from rag.bm25 import BM25Index
+from utils.text import singular, tokenize
+
+# Tools offered on every query.
+ALWAYS_ON_TOOLS = (
+    "human",
+    "show_reasoning_output",
+    "hide_reasoning_output",
+    "documentation_search",
+)
+HUMAN_LINE = re.compile(r"^Human: (.*)$", re.MULTILINE)
+
+
+def _terms(text: str) -> str:
+    """Terms of a text with plurals folded, so "pods" matches "pod"."""
+    terms = []
+    for term in tokenize(text.replace("_", " ")):
+        terms.append(term)
+        if singular(term) != term:
+            terms.append(singular(term))
+    return " ".join(terms)
+
+
+class ToolRouter:
+    """Selects the tools relevant to a query: BM25 over tool names and
+    descriptions, plus the always-on system tools.
+
+    When no tool matches (e.g. "delete it"), the previous human message is
+    routed instead, and when that matches nothing either, every tool is
+    offered.
+    """
+
+    def __init__(
+        self,
+        tools: list[BaseTool],
+        top_n: int = 8,
+        always_on: tuple[str, ...] = ALWAYS_ON_TOOLS,
+    ):
+        self.tools = tools
+        self.top_n = top_n
+        self.always_on = set(always_on)
+        self.index = BM25Index()
+        for tool in tools:
+            if tool.name not in self.always_on:
+                self.index.add(
+                    tool.name, _terms(f"{tool.name} {tool.description}"), {}
+                )
+
+    def select(
+        self, query: str, previous_query: str = ""
+    ) -> list[BaseTool]:
+        """Routed tools, in their registration order."""
+        if self.top_n <= 0:
+            return list(self.tools)
+        hits = self.index.search(_terms(query), self.top_n)
+        if not hits and previous_query:
+            hits = self.index.search(_terms(previous_query), self.top_n)
+        if not hits:
+            return list(self.tools)
+
+        names = self.always_on | {name for name, _ in hits}
+        return [tool for tool in self.tools if tool.name in names]
+
+
+class RoutedAgentExecutor(ParallelAgentExecutor):
+    """ParallelAgentExecutor that builds an agent for each query with only
+    the tools the router selects, shrinking the prompt.
+
+    The routed agent runs on a copy of the executor, so concurrent calls
+    never share their tools or agent.
+    """
+
+    router: ToolRouter
+    agent_factory: Callable[[list[BaseTool]], BaseSingleActionAgent]
+
+    def _route(self, inputs: Dict[str, Any]) -> "RoutedAgentExecutor":
+        query = inputs.get("input", "")
+        history = inputs.get("chat_history", "")
+        previous = (
+            HUMAN_LINE.findall(history) if isinstance(history, str) else []
+        )
+        tools = self.router.select(query, previous[-1] if previous else "")
+        return self.copy(
+            update={"tools": tools, "agent": self.agent_factory(tools)}
+        )
+
+    def _call(
+        self,
+        inputs: Dict[str, str],
+        run_manager: Optional[CallbackManagerForChainRun] = None,
+    ) -> Dict[str, Any]:
+        executor = self._route(inputs)
+        return super(RoutedAgentExecutor, executor)._call(
+            inputs, run_manager=run_manager
+        )
+
+    async def _acall(
+        self,
+        inputs: Dict[str, str],
+        run_manager: Optional[AsyncCallbackManagerForChainRun] = None,
+    ) -> Dict[str, str]:
+        executor = self._route(inputs)
+        return await super(RoutedAgentExecutor, executor)._acall(
+            inputs, run_manager=run_manager
+        )
+
+
+# Recorded queries with the tool that serves them.
+ROUTING_QUERIES = [
+    ("list pods in the default namespace", "list_kubernetes_resources"),
+    ("show me all deployments", "list_kubernetes_resources"),
+    ("get the yaml of the nginx deployment", "get_kubernetes_resource_yaml"),
+    ("why is pod web-1 crashing, show its events", "describe_pod"),
+    ("show logs of pod api-7f9 in prod", "get_kubernetes_pod_logs"),
+    (
+        "how do I reach the frontend service",
+        "get_kubernetes_service_access_endpoints",
+    ),
+    (
+        "what is the url of the ingress shop",
+        "get_kubernetes_ingress_access_endpoints",
+    ),
+    ("watch pods in namespace dev", "watch_resources"),
+    ("delete the configmap app-config", "delete_a_kubernetes_resource"),
+    (
+        "create an nginx deployment with 3 replicas",
+        "construct_kubernetes_resources",
+    ),
+    ("apply this yaml", "apply_kubernetes_resources"),
+    ("deploy wordpress with helm", "search_helm_chart"),
+    (
+        "upgrade my redis application to use more memory",
+        "generate_upgrade_application_values",
+    ),
+    ("list helm applications", "list_applications"),
+    ("uninstall the application grafana", "delete_application"),
+    ("launch a t3.micro ec2 instance", "create_ec2_instance"),
+    ("terminate instance i-0abc", "terminate_ec2_instance"),
+    ("change the instance type of i-0abc to m5.large", "modify_ec2_instances"),
+    ("create an s3 bucket named logs-2024", "create_s3_bucket"),
+    ("what s3 buckets do I have", "list_s3_buckets"),
+    ("upload report.pdf to my bucket", "upload_s3_object"),
+    ("create a dynamodb table users with key id", "create_dynamodb_table"),
+    ("put an item into the users table", "put_dynamodb_item"),
+    (
+        "write a cloudformation template for a vpc",
+        "generate_cloudformation_template",
+    ),
+    (
+        "delete the cloudformation stack web-stack",
+        "delete_cloudformation_stack",
+    ),
+    ("run an nginx container on port 8080", "run_docker_container"),
+    ("stop container web", "stop_docker_container"),
+    ("show running containers", "list_docker_containers"),
+    ("show logs of container api", "logs_docker_container"),
+    ("pull the postgres image", "pull_docker_image"),
+    ("build an image from github.com/org/app", "build_docker_image"),
+    ("list docker images", "list_docker_images"),
+    ("create a volume named data", "create_docker_volume"),
+    ("list volumes", "list_docker_volumes"),
+]
+
+
+def routing_report(tools: list[BaseTool], llm: Any, top_n: int = 8) -> dict:
+    """Selection accuracy and prompt tokens saved on ROUTING_QUERIES.
+
+    Accuracy is the share of queries whose expected tool is selected;
+    tokens are those of the rendered agent prompt with an empty history.
+    """
+    import tiktoken
+
+    from agent.agent import create_conversational_agent
+
+    encoding = tiktoken.get_encoding("cl100k_base")
+
+    def prompt_tokens(agent_tools: list[BaseTool]) -> int:
+        agent = create_conversational_agent(llm, agent_tools)
+        prompt = agent.llm_chain.prompt.format(
+            input="", chat_history="", agent_scratchpad=""
+        )
+        return len(encoding.encode(prompt))
+
+    router = ToolRouter(tools, top_n)
+    full_tokens = prompt_tokens(tools)
+    hits = 0
+    routed_tokens = []
+    misses = []
+    for query, expected in ROUTING_QUERIES:
+        selected = router.select(query)
+        if any(tool.name == expected for tool in selected):
+            hits += 1
+        else:
+            misses.append(query)
+        routed_tokens.append(prompt_tokens(selected))
+
+    mean_tokens = sum(routed_tokens) / len(routed_tokens)
+    return {
+        "tools": len(tools),
+        "top_n": top_n,
+        "queries": len(ROUTING_QUERIES),
+        "accuracy": round(hits / len(ROUTING_QUERIES), 4),
+        "misses": misses,
+        "full_prompt_tokens": full_tokens,
+        "mean_routed_prompt_tokens": round(mean_tokens, 1),
+        "prompt_tokens_saved": round(1 - mean_tokens / full_tokens, 4),
+    }
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    from langchain.llms.fake import FakeListLLM
+
+    from agent.agent import system_tools
+    from aws.toolkit import AWSToolKit
+    from config import config
+    from docker.toolkit import DockerToolKit
+    from k8s.toolkit import KubernetesToolKit
+
+    config.init()
+    llm = FakeListLLM(responses=[""])
+    tools = []
+    # Tool descriptions only: skip the toolkits' cluster and daemon checks.
+    for toolkit_class in (KubernetesToolKit, AWSToolKit, DockerToolKit):
+        toolkit = toolkit_class.__new__(toolkit_class)
+        toolkit.llm = toolkit.construction_llm = llm
+        tools.extend(toolkit.get_tools())
+    tools.extend(system_tools())
+
+    top_n = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    print(json.dumps(routing_report(tools, llm, top_n), indent=2))
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from langchain.schema.language_model import BaseLanguageModel
 from .context import init_aws_session, ec2_client, s3_client, dynamodb_client
 from .tools.ec2.tool import (
@@ -26,8 +28,14 @@ from .tools.cloudformation.delete_tool import DeleteCloudFormationStackTool
 class AWSToolKit:
     """AWS toolkit for Infrapilot: provides EC2, S3 and DynamoDB operations via LLM-driven tools."""
 
-    def __init__(self, llm: BaseLanguageModel):
+    def __init__(
+        self,
+        llm: BaseLanguageModel,
+        construction_llm: Optional[BaseLanguageModel] = None,
+    ):
         self.llm = llm
+        # Writes CloudFormation templates; CLI commands are generated by llm.
+        self.construction_llm = construction_llm or llm
         init_aws_session()
 
     def get_tools(self):
@@ -48,7 +56,7 @@ class AWSToolKit:
             PutDynamoDBItemTool(llm=self.llm, dynamodb_client=dynamodb_client),
             GetDynamoDBItemTool(llm=self.llm, dynamodb_client=dynamodb_client),
             # CloudFormation
-            GenerateCloudFormationTemplateTool(llm=self.llm),
+            GenerateCloudFormationTemplateTool(llm=self.construction_llm),
             DeployCloudFormationStackTool(llm=self.llm),
             DeleteCloudFormationStackTool(llm=self.llm),
 
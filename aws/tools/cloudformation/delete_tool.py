@@ -1,10 +1,9 @@
-import subprocess
 import re
 import os
 import json
-import time
 from langchain.schema.language_model import BaseLanguageModel
 from langchain.agents.tools import BaseTool
+from tools.base import process
 
 class DeleteCloudFormationStackTool(BaseTool):
     name = "delete_cloudformation_stack"
@@ -15,6 +14,12 @@ class DeleteCloudFormationStackTool(BaseTool):
     llm: BaseLanguageModel
 
     def _run(self, query: str) -> str:
+        return process.run_steps(self._steps(query), self.llm)
+
+    async def _arun(self, query: str) -> str:
+        return await process.arun_steps(self._steps(query), self.llm)
+
+    def _steps(self, query: str) -> process.Steps:
         print(f"\n===== DELETE STACK TOOL: STARTING =====")
         print(f"Query received: {query}")
         
@@ -81,7 +86,7 @@ class DeleteCloudFormationStackTool(BaseTool):
         # --- STEP 4: Get all available stacks for debugging ---
         print("\n----- Listing available stacks -----")
         list_cmd = f"aws cloudformation list-stacks --region {region}"
-        list_result = subprocess.run(list_cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        list_result = yield process.Run(list_cmd)
         
         available_stacks = []
         similar_stacks = []
@@ -118,7 +123,7 @@ class DeleteCloudFormationStackTool(BaseTool):
         # --- STEP 5: Verify stack exists ---
         print(f"\n----- Checking if stack '{stack_name}' exists -----")
         describe_cmd = f"aws cloudformation describe-stacks --stack-name {stack_name} --region {region}"
-        describe_result = subprocess.run(describe_cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        describe_result = yield process.Run(describe_cmd)
         
         if describe_result.returncode != 0:
             print(f"Stack verification failed: {describe_result.stderr}")
@@ -148,7 +153,7 @@ class DeleteCloudFormationStackTool(BaseTool):
         # --- STEP 6: Execute delete ---
         print(f"\n----- Deleting stack '{stack_name}' -----")
         delete_cmd = f"aws cloudformation delete-stack --stack-name {stack_name} --region {region}"
-        delete_result = subprocess.run(delete_cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        delete_result = yield process.Run(delete_cmd)
         
         if delete_result.returncode == 0:
             print(f"Delete command successful: {delete_result.stdout}")
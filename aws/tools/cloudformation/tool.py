@@ -1,13 +1,12 @@
-import subprocess
 import re
 import yaml
 import random
 import string
 import os
-import time
 from collections import OrderedDict
 from langchain.schema.language_model import BaseLanguageModel
 from langchain.agents.tools import BaseTool
+from tools.base import process
 
 from .prompt import (
     PROMPT_GENERATE_CLOUDFORMATION_TEMPLATE,
@@ -23,10 +22,21 @@ class GenerateCloudFormationTemplateTool(BaseTool):
     llm: BaseLanguageModel
 
     def _run(self, query: str) -> str:
-        raw = self.llm.predict(
-            PROMPT_GENERATE_CLOUDFORMATION_TEMPLATE.format(query=query)
-        ).strip()
+        return self._save(
+            self.llm.predict(
+                PROMPT_GENERATE_CLOUDFORMATION_TEMPLATE.format(query=query)
+            )
+        )
+
+    async def _arun(self, query: str) -> str:
+        return self._save(
+            await self.llm.apredict(
+                PROMPT_GENERATE_CLOUDFORMATION_TEMPLATE.format(query=query)
+            )
+        )
 
+    def _save(self, raw: str) -> str:
+        raw = raw.strip()
         if raw.startswith("```"):
             lines = raw.splitlines()
             raw = "\n".join(lines[1:-1])
@@ -83,22 +93,26 @@ class DeployCloudFormationStackTool(BaseTool):
     llm: BaseLanguageModel
 
     def _run(self, query: str) -> str:
-        import subprocess
+        return process.run_steps(self._steps(query), self.llm)
+
+    async def _arun(self, query: str) -> str:
+        return await process.arun_steps(self._steps(query), self.llm)
+
+    def _steps(self, query: str) -> process.Steps:
         import json
-        import time
 
         # First check if AWS CLI connection is working
         aws_check_cmd = "aws sts get-caller-identity"
-        aws_check_result = subprocess.run(
-            aws_check_cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
-        )
+        aws_check_result = yield process.Run(aws_check_cmd)
         
         # Check if AWS CLI connection is properly established
         if aws_check_result.returncode != 0:
             return f"Error: AWS CLI connection failed. Please check your AWS credentials and network connection.\nError details: {aws_check_result.stderr}"
 
-        raw = self.llm.predict(
-            PROMPT_DEPLOY_CLOUDFORMATION_STACK.format(query=query)
+        raw = (
+            yield process.Predict(
+                PROMPT_DEPLOY_CLOUDFORMATION_STACK.format(query=query)
+            )
         ).strip()
 
         # Clear markdown formatting
@@ -124,9 +138,7 @@ class DeployCloudFormationStackTool(BaseTool):
 
         try:
             # Execute deployment command
-            result = subprocess.run(
-                cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
-            )
+            result = yield process.Run(cmd)
 
             # Check deployment command execution results
             if result.returncode != 0:
@@ -146,9 +158,7 @@ class DeployCloudFormationStackTool(BaseTool):
                 print(f"Checking stack status, attempt {attempts}/{max_attempts}...")
                 
                 check_cmd = f"aws cloudformation describe-stacks --stack-name {stack_name} {region_param}"
-                check_result = subprocess.run(
-                    check_cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
-                )
+                check_result = yield process.Run(check_cmd)
                 
                 if check_result.returncode != 0:
                     # If stack description command fails, usually means the stack doesn't exist or there's a permission issue
@@ -178,7 +188,7 @@ class DeployCloudFormationStackTool(BaseTool):
                     
                     # Stack is still being created/updated, wait and check again
                     print(f"[INFO] Stack is in {status} state. Waiting...")
-                    time.sleep(10)  # Wait 10 seconds before checking again
+                    yield process.Sleep(10)  # Wait 10 seconds before checking again
                     
                 except (json.JSONDecodeError, KeyError, IndexError) as e:
                     return f"Error parsing stack status: {e}\nRaw output: {check_result.stdout[:200]}..."
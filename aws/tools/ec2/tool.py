@@ -1,7 +1,6 @@
-import subprocess
 from typing import Any
 from langchain.schema.language_model import BaseLanguageModel
-from langchain.agents.tools import BaseTool
+from tools.base.tools import CommandTool
 from .prompt import (
     PROMPT_CREATE_INSTANCE,
     PROMPT_TERMINATE_INSTANCE,
@@ -9,7 +8,7 @@ from .prompt import (
 )
 
 
-class CreateEC2InstanceTool(BaseTool):
+class CreateEC2InstanceTool(CommandTool):
     """Tool to create EC2 instances via AWS CLI using LLM-generated commands."""
 
     name = "create_ec2_instance"
@@ -18,30 +17,10 @@ class CreateEC2InstanceTool(BaseTool):
     )
     llm: BaseLanguageModel
     ec2_client: Any
+    prompt = PROMPT_CREATE_INSTANCE
 
-    def _run(self, query: str) -> str:
-        raw = self.llm.predict(PROMPT_CREATE_INSTANCE.format(query=query)).strip()
-        if raw.startswith("```"):
-            lines = raw.splitlines()
-            raw = "\n".join(lines[1:-1])
-        cmd = raw.strip()
 
-        try:
-            result = subprocess.run(
-                cmd,
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-            )
-            if result.returncode == 0:
-                return result.stdout
-            return f"Error: {result.stderr}"
-        except Exception as e:
-            return f"Exception: {e}"
-
-
-class TerminateEC2InstanceTool(BaseTool):
+class TerminateEC2InstanceTool(CommandTool):
     """Tool to terminate EC2 instances via AWS CLI using LLM-generated commands."""
 
     name = "terminate_ec2_instance"
@@ -50,30 +29,10 @@ class TerminateEC2InstanceTool(BaseTool):
     )
     llm: BaseLanguageModel
     ec2_client: Any
+    prompt = PROMPT_TERMINATE_INSTANCE
 
-    def _run(self, query: str) -> str:
-        raw = self.llm.predict(PROMPT_TERMINATE_INSTANCE.format(query=query)).strip()
-        if raw.startswith("```"):
-            lines = raw.splitlines()
-            raw = "\n".join(lines[1:-1])
-        cmd = raw.strip()
-
-        try:
-            result = subprocess.run(
-                cmd,
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-            )
-            if result.returncode == 0:
-                return result.stdout
-            return f"Error: {result.stderr}"
-        except Exception as e:
-            return f"Exception: {e}"
 
-
-class ModifyEC2InstancesTool(BaseTool):
+class ModifyEC2InstancesTool(CommandTool):
     """Tool to modify EC2 instance attributes via AWS CLI using LLM-generated commands."""
 
     name = "modify_ec2_instances"
@@ -82,27 +41,7 @@ class ModifyEC2InstancesTool(BaseTool):
     )
     llm: BaseLanguageModel
     ec2_client: Any
-
-    def _run(self, query: str) -> str:
-        raw = self.llm.predict(PROMPT_MODIFY_INSTANCE.format(query=query)).strip()
-        if raw.startswith("```"):
-            lines = raw.splitlines()
-            raw = "\n".join(lines[1:-1])
-        cmd = raw.strip()
-
-        try:
-            result = subprocess.run(
-                cmd,
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-            )
-            if result.returncode == 0:
-                return result.stdout
-            return f"Error: {result.stderr}"
-        except Exception as e:
-            return f"Exception: {e}"
+    prompt = PROMPT_MODIFY_INSTANCE
 
 
 
@@ -1,4 +1,6 @@
 import json
+import threading
+import time
 from typing import Any, Dict, Optional, List
 from uuid import UUID
 import click
@@ -17,6 +19,11 @@ from pygments.lexers import YamlLexer
 from pygments.formatters import TerminalFormatter
 
 
+# Held while the terminal is read, by approval prompts and the human tool,
+# so actions of one agent step that run concurrently ask one at a time.
+terminal_lock = threading.Lock()
+
+
 class HumanRejectedException(Exception):
     """Exception to raise when a person manually review and rejects a value."""
 
@@ -38,7 +45,10 @@ def remove_triple_backticks(text):
 
 
 class ApprovalCallbackHandler(BaseCallbackHandler):
-    """Callback for manual approval."""
+    """Callback for manual approval.
+
+    Prompts are asked one at a time, also when tools run concurrently.
+    """
 
     raise_error: bool = True
 
@@ -51,7 +61,9 @@ class ApprovalCallbackHandler(BaseCallbackHandler):
         parent_run_id: Optional[UUID] = None,
         **kwargs: Any,
     ) -> Any:
-        if not self._approve(input_str, serialized):
+        with terminal_lock:
+            approved = self._approve(input_str, serialized)
+        if not approved:
             raise HumanRejectedException(
                 f"Inputs {input_str} to tool {serialized} were rejected."
             )
@@ -90,7 +102,122 @@ class ApprovalCallbackHandler(BaseCallbackHandler):
         )
 
 
+class PromptTokenCallbackHandler(BaseCallbackHandler):
+    """Counts the prompt tokens of each LLM call, with the tokenizer of
+    llm."""
+
+    run_inline = True
+
+    def __init__(self, llm: Any):
+        self.llm = llm
+        self.calls: List[int] = []
+
+    def on_llm_start(
+        self, serialized: Dict[str, Any], prompts: List[str], **kwargs: Any
+    ) -> None:
+        for prompt in prompts:
+            self.calls.append(self.llm.get_num_tokens(prompt))
+
+    def take(self) -> List[int]:
+        """Prompt tokens of the calls since the last take."""
+        calls, self.calls = self.calls, []
+        return calls
+
+
+class LatencyCallbackHandler(BaseCallbackHandler):
+    """Records the duration of each LLM call, in seconds."""
+
+    run_inline = True
+
+    def __init__(self):
+        self.started: Dict[UUID, float] = {}
+        self.calls: List[float] = []
+
+    def on_llm_start(
+        self,
+        serialized: Dict[str, Any],
+        prompts: List[str],
+        *,
+        run_id: UUID,
+        **kwargs: Any,
+    ) -> None:
+        self.started[run_id] = time.perf_counter()
+
+    def _finish(self, run_id: UUID) -> None:
+        start = self.started.pop(run_id, None)
+        if start is not None:
+            self.calls.append(time.perf_counter() - start)
+
+    def on_llm_end(
+        self, response: LLMResult, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._finish(run_id)
+
+    def on_llm_error(
+        self, error: BaseException, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._finish(run_id)
+
+
 class PrintReasoningCallbackHandler(BaseCallbackHandler):
+    """Print AI reasoning.
+
+    With a streaming LLM, each Reason: line, one per batched action, is
+    printed as soon as it is complete and the final answer is rendered
+    while it streams; without streaming, the reasoning is printed when the
+    LLM is done.
+    """
+
+    reason_prompt_prefix = "Reason:"
+    # Tokens of an async run are handled in order, on the event loop.
+    run_inline = True
+
+    def __init__(self, ai_prefix: str = "AI"):
+        self.ai_prefix = ai_prefix
+        self.buffer = ""
+        self.reasons_printed = 0
+        self.response: Optional[utils.AIResponseStream] = None
+
+    def on_llm_start(
+        self, serialized: Dict[str, Any], prompts: List[str], **kwargs: Any
+    ) -> None:
+        self.buffer = ""
+        self.reasons_printed = 0
+        self.response = None
+
+    def _print_reason(self, final: bool) -> None:
+        if not config.infrapilot_CONFIG.show_reasoning:
+            return
+        lines = self.buffer.splitlines()
+        if not final and not self.buffer.endswith("\n"):
+            # The last line may still be streaming.
+            lines = lines[:-1]
+        reasons = [
+            line[len(self.reason_prompt_prefix) :].strip()
+            for line in lines
+            if line.startswith(self.reason_prompt_prefix)
+        ]
+        for reason_text in reasons[self.reasons_printed :]:
+            utils.print_ai_reasoning(reason_text)
+        self.reasons_printed = len(reasons)
+
+    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        if self.response is not None:
+            self.response.write(token)
+            return
+
+        self.buffer += token
+        self._print_reason(final=False)
+        marker = f"{self.ai_prefix}:"
+        lines = self.buffer.split("\n")
+        for i, line in enumerate(lines):
+            if line.startswith(marker):
+                self._print_reason(final=True)
+                self.response = utils.AIResponseStream()
+                answer = "\n".join([line[len(marker) :]] + lines[i + 1 :])
+                self.response.write(answer)
+                break
+
     def on_llm_end(
         self,
         response: LLMResult,
@@ -100,15 +227,15 @@ class PrintReasoningCallbackHandler(BaseCallbackHandler):
         tags: Optional[List[str]] = None,
         **kwargs: Any,
     ) -> None:
-        if not config.infrapilot_CONFIG.show_reasoning:
-            return
-
-        generation_text = response.generations[0][0].text
-        lines = generation_text.splitlines()
-        reason_prompt_prefix = "Reason:"
-        for line in reversed(lines):
-            if line.startswith(reason_prompt_prefix):
-                reason_text = line.lstrip("Reason:").strip()
-                utils.print_ai_reasoning(reason_text)
-                break
-        """Print AI reasoning."""
+        if not self.buffer and self.response is None:
+            # Not streamed.
+            self.buffer = response.generations[0][0].text
+        self._print_reason(final=True)
+        if self.response is not None:
+            self.response.close()
+            self.response = None
+
+    def on_llm_error(self, error: BaseException, **kwargs: Any) -> None:
+        if self.response is not None:
+            self.response.close()
+            self.response = None
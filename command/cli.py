@@ -1,17 +1,19 @@
+import asyncio
 import sys
+import time
 from typing import Any
 import readline
 
 
-from langchain.chat_models import ChatOpenAI
-from langchain.memory import ConversationBufferMemory
 import colorama
 
 from callbacks import handlers
 from config import config
 from i18n import text
-from utils import utils
+from utils import models, utils
+from utils.llm_gateway import get_gateway
 from agent.agent import create_agent
+from agent.memory import TokenBudgetMemory
 from k8s.toolkit import KubernetesToolKit
 
 last_error = None
@@ -22,16 +24,46 @@ def setup_agent() -> Any:
     colorama.init()
 
     if config.infrapilot_CONFIG.RAG_ENABLED:
-        from rag.ingest import ingest_documentation
-        ingest_documentation(source_dir="docs")
-
-    llm = ChatOpenAI(
-        model_name="gpt-4",
-        temperature=0,
+        from rag.coordinator import coordinator
+
+        # Build the documentation index in the background.
+        coordinator.start(source_dir="docs")
+
+    settings = config.infrapilot_CONFIG
+    if settings.LLM_CACHE_SIZE > 0:
+        import langchain
+        from utils.llm_cache import CompletionCache
+
+        # Shared by the tools of every toolkit; their prompts are rendered
+        # from the request alone and sampled at temperature 0.
+        langchain.llm_cache = CompletionCache(
+            settings.LLM_CACHE_PATH,
+            settings.LLM_CACHE_SIZE,
+            settings.LLM_CACHE_TTL,
+        )
+
+    # Each role gets its own client; command generation, translation and
+    # summaries run on a faster model than planning and construction.
+    llm = models.create_llm("cli")
+    construction_llm = models.create_llm("construction")
+    # The planner streams its reasoning and answer to the terminal; tools
+    # keep non-streaming clients.
+    agent_llm = models.create_llm(
+        "planner",
+        streaming=config.infrapilot_CONFIG.streaming,
+        # A cached completion would not be streamed to the terminal.
+        cache=False,
         callbacks=[handlers.PrintReasoningCallbackHandler()],
     )
-    text.init_system_messages(llm)
-    memory = ConversationBufferMemory(memory_key="chat_history")
+    prompt_metrics = handlers.PromptTokenCallbackHandler(agent_llm)
+    agent_llm.callbacks.append(prompt_metrics)
+    text.init_system_messages(models.create_llm("translation"))
+    # Older turns are summarized to keep the history within the budget.
+    memory = TokenBudgetMemory(
+        llm=models.create_llm("summary"),
+        max_token_limit=config.infrapilot_CONFIG.memory_token_limit,
+        prompt_metrics=prompt_metrics,
+    )
 
     enabled_toolkits = [
         toolkit.lower() for toolkit in config.infrapilot_CONFIG.toolkits
@@ -39,18 +71,15 @@ def setup_agent() -> Any:
 
     tools = []
     if "kubernetes" in enabled_toolkits:
-        kubernetes_toolkit = KubernetesToolKit(llm=llm)
+        kubernetes_toolkit = KubernetesToolKit(llm=construction_llm)
         tools.extend(kubernetes_toolkit.get_tools())
 
+    # The Kubernetes toolkit relies on the AWS tools (e.g. for EKS); register
+    # them once, so the agent prompt does not describe every AWS tool twice.
+    if "aws" in enabled_toolkits or "kubernetes" in enabled_toolkits:
         from aws.toolkit import AWSToolKit
 
-        aws_toolkit = AWSToolKit(llm=llm)
-        tools.extend(aws_toolkit.get_tools())
-
-    if "aws" in enabled_toolkits:
-        from aws.toolkit import AWSToolKit
-
-        aws_toolkit = AWSToolKit(llm=llm)
+        aws_toolkit = AWSToolKit(llm=llm, construction_llm=construction_llm)
         tools.extend(aws_toolkit.get_tools())
 
     if "docker" in enabled_toolkits:
@@ -64,7 +93,7 @@ def setup_agent() -> Any:
         sys.exit(1)
 
     return create_agent(
-        llm,
+        agent_llm,
         shared_memory=memory,
         tools=tools,
         verbose=config.infrapilot_CONFIG.verbose,
@@ -73,6 +102,20 @@ def setup_agent() -> Any:
 
 def run():
     infrapilot_agent = setup_agent()
+    intent_router = None
+    if config.infrapilot_CONFIG.fast_path:
+        from agent.intent_router import IntentRouter
+
+        intent_router = IntentRouter(
+            infrapilot_agent.tools,
+            config.infrapilot_CONFIG.fast_path_threshold,
+        )
+
+    # One event loop for the session, so async LLM requests keep reusing
+    # the gateway's aiohttp connections.
+    loop = None
+    if config.infrapilot_CONFIG.async_agent:
+        loop = asyncio.new_event_loop()
 
     print(text.get("welcome"))
     user_query = None
@@ -90,16 +133,55 @@ def run():
         elif not user_query.strip():
             continue
 
+        latency_marks = models.latency_marks()
         try:
-            result = infrapilot_agent.run(user_query)
+            start = time.perf_counter()
+            result = intent_router and intent_router.run(user_query)
+            if result:
+                # Keep the request in the history for follow-up questions.
+                infrapilot_agent.memory.save_context(
+                    {"input": user_query}, {"output": result}
+                )
+            else:
+                if config.infrapilot_CONFIG.async_agent:
+                    result = loop.run_until_complete(
+                        infrapilot_agent.arun(user_query)
+                    )
+                else:
+                    result = infrapilot_agent.run(user_query)
+                if intent_router:
+                    intent_router.record_fallback(
+                        time.perf_counter() - start
+                    )
         except handlers.HumanRejectedException as he:
             utils.print_rejected_message()
             continue
         except Exception as e:
             handle_exception(e)
             continue
-
-        utils.print_ai_response(result)
+        finally:
+            streamed = utils.is_response_streamed()
+
+        if not streamed:
+            utils.print_ai_response(result)
+        if config.infrapilot_CONFIG.verbose:
+            metrics = dict(infrapilot_agent.memory.turn_metrics[-1])
+            if intent_router:
+                metrics.update(intent_router.stats())
+            # LLM calls of this turn only.
+            for role, latency in models.latency_report(latency_marks).items():
+                metrics[f"{role}_calls"] = latency["calls"]
+                metrics[f"{role}_mean_ms"] = latency["mean_ms"]
+            # Gateway counts are session-wide, hence the session_ prefix.
+            gateway = get_gateway().metrics()
+            metrics.update(
+                (f"session_llm_{key}", value) for key, value in gateway.items()
+            )
+            utils.print_turn_metrics(metrics)
+
+    if loop is not None:
+        loop.run_until_complete(get_gateway().aclose())
+        loop.close()
 
 
 def handle_exception(e):
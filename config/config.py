@@ -8,13 +8,79 @@ from dotenv import load_dotenv
 import os
 
 
+class ModelConfig(BaseModel):
+    """Chat model serving one role: its name, request timeout in seconds
+    and completion token cap (0 leaves it to the model)."""
+
+    model_name: str
+    timeout: float
+    max_tokens: int
+
+
+# Model roles with their default model, timeout and max tokens. The planner
+# and the manifest/template/chart-values constructors need GPT-4; one-line
+# CLI commands, message translation and history summaries do not.
+MODEL_ROLES = {
+    "planner": ("gpt-4", 120.0, 0),
+    "construction": ("gpt-4", 120.0, 0),
+    "cli": ("gpt-3.5-turbo", 30.0, 256),
+    "translation": ("gpt-3.5-turbo", 60.0, 1024),
+    "summary": ("gpt-3.5-turbo", 60.0, 0),
+    "rag_answer": ("gpt-4", 60.0, 512),
+}
+
+
 class Config(BaseModel):
     natural_language: str
     toolkits: list[str]
     show_reasoning: bool
+    streaming: bool
+    memory_token_limit: int
+    tool_router_top_n: int
+    fast_path: bool
+    fast_path_threshold: float
+    async_agent: bool
+    tool_workers: int
+    models: dict[str, ModelConfig]
     verbose: bool
     RAG_ENABLED: bool
     REMOTE_DOC_URLS: list[str]
+    REMOTE_DOC_WORKERS: int
+    REMOTE_DOC_TIMEOUT: float
+    REMOTE_DOC_CACHE_PATH: str
+    LLM_CACHE_PATH: str
+    LLM_CACHE_SIZE: int
+    LLM_CACHE_TTL: float
+    LLM_REQUESTS_PER_MINUTE: float
+    LLM_TOKENS_PER_MINUTE: float
+    LLM_MAX_RETRIES: int
+    LLM_REQUEST_DEADLINE: float
+    RAG_READY_TIMEOUT: float
+    RAG_INGEST_WORKERS: int
+    RAG_CHUNKER: str
+    RAG_SHARDED_INDEX: bool
+    RAG_SHARD_GLOBAL_K: int
+    RAG_DEDUP_THRESHOLD: float
+    RAG_VECTOR_STORE: str
+    RAG_FAISS_INDEX: str
+    RAG_FAISS_NPROBE: int
+    RAG_VECTOR_QUANTIZATION: str
+    RAG_QUANTIZED_RERANK: int
+    RAG_EMBEDDING_PROVIDER: str
+    RAG_EMBEDDING_MODEL: str
+    RAG_LOCAL_EMBEDDING_DIM: int
+    RAG_EMBEDDING_CACHE_PATH: str
+    RAG_EMBEDDING_CACHE_MB: int
+    RAG_EMBEDDING_BATCH_SIZE: int
+    RAG_EMBEDDING_CONCURRENCY: int
+    RAG_RETRIEVAL_MODE: str
+    RAG_FETCH_K: int
+    RAG_RRF_K: int
+    RAG_SEARCH_MODE: str
+    RAG_ANSWER_MODEL: str
+    RAG_SNIPPET_TOKEN_BUDGET: int
+    RAG_QUERY_CACHE_SIZE: int
+    RAG_QUERY_CACHE_TTL: float
 
 
 infrapilot_CONFIG: Config
@@ -27,6 +93,26 @@ def init():
     natural_language = utils.get_env("NATURAL_LANGUAGE", "English")
     toolkits = utils.get_env_list("TOOLKITS")
     show_reasoning = utils.get_env_bool("SHOW_REASONING", True)
+    streaming = utils.get_env_bool("STREAMING", True)
+    memory_token_limit = utils.get_env_int("MEMORY_TOKEN_LIMIT", 2000)
+    tool_router_top_n = utils.get_env_int("TOOL_ROUTER_TOP_N", 8)
+    fast_path = utils.get_env_bool("FAST_PATH", True)
+    fast_path_threshold = utils.get_env_float("FAST_PATH_THRESHOLD", 0.8)
+    async_agent = utils.get_env_bool("ASYNC_AGENT", False)
+    tool_workers = utils.get_env_int("TOOL_WORKERS", 4)
+    # e.g. CLI_MODEL, CLI_MODEL_TIMEOUT and CLI_MODEL_MAX_TOKENS.
+    models = {
+        role: ModelConfig(
+            model_name=utils.get_env(f"{role.upper()}_MODEL", model_name),
+            timeout=utils.get_env_float(
+                f"{role.upper()}_MODEL_TIMEOUT", timeout
+            ),
+            max_tokens=utils.get_env_int(
+                f"{role.upper()}_MODEL_MAX_TOKENS", max_tokens
+            ),
+        )
+        for role, (model_name, timeout, max_tokens) in MODEL_ROLES.items()
+    }
     verbose = utils.get_env_bool("VERBOSE", False)
     RAG_ENABLED = utils.get_env_bool("RAG_ENABLED", False)
     FETCH_REMOTE_DOCS = utils.get_env_bool("FETCH_REMOTE_DOCS", False)
@@ -34,9 +120,60 @@ def init():
         utils.get_env("REMOTE_DOC_URLS").split(",")
         if FETCH_REMOTE_DOCS else []
     )
-
-    if not openai_api_key:
-        raise Exception("OPENAI_API_KEY is not set")
+    REMOTE_DOC_WORKERS = utils.get_env_int("REMOTE_DOC_WORKERS", 8)
+    REMOTE_DOC_TIMEOUT = utils.get_env_float("REMOTE_DOC_TIMEOUT", 30.0)
+    REMOTE_DOC_CACHE_PATH = utils.get_env(
+        "REMOTE_DOC_CACHE_PATH", ".cache/remote_docs"
+    )
+    LLM_CACHE_PATH = utils.get_env("LLM_CACHE_PATH", ".cache/llm.sqlite")
+    LLM_CACHE_SIZE = utils.get_env_int("LLM_CACHE_SIZE", 1000)
+    LLM_CACHE_TTL = utils.get_env_float("LLM_CACHE_TTL", 86400.0)
+    LLM_REQUESTS_PER_MINUTE = utils.get_env_float(
+        "LLM_REQUESTS_PER_MINUTE", 200.0
+    )
+    LLM_TOKENS_PER_MINUTE = utils.get_env_float(
+        "LLM_TOKENS_PER_MINUTE", 40000.0
+    )
+    LLM_MAX_RETRIES = utils.get_env_int("LLM_MAX_RETRIES", 6)
+    LLM_REQUEST_DEADLINE = utils.get_env_float("LLM_REQUEST_DEADLINE", 180.0)
+    RAG_READY_TIMEOUT = utils.get_env_float("RAG_READY_TIMEOUT", 30.0)
+    RAG_INGEST_WORKERS = utils.get_env_int("RAG_INGEST_WORKERS", 0)
+    RAG_CHUNKER = utils.get_env("RAG_CHUNKER", "structure")
+    RAG_SHARDED_INDEX = utils.get_env_bool("RAG_SHARDED_INDEX", True)
+    RAG_SHARD_GLOBAL_K = utils.get_env_int("RAG_SHARD_GLOBAL_K", 0)
+    RAG_DEDUP_THRESHOLD = utils.get_env_float("RAG_DEDUP_THRESHOLD", 0.9)
+    RAG_VECTOR_STORE = utils.get_env("RAG_VECTOR_STORE", "chroma")
+    RAG_FAISS_INDEX = utils.get_env("RAG_FAISS_INDEX", "auto")
+    RAG_FAISS_NPROBE = utils.get_env_int("RAG_FAISS_NPROBE", 8)
+    RAG_VECTOR_QUANTIZATION = utils.get_env("RAG_VECTOR_QUANTIZATION", "none")
+    RAG_QUANTIZED_RERANK = utils.get_env_int("RAG_QUANTIZED_RERANK", 0)
+    RAG_EMBEDDING_PROVIDER = utils.get_env("RAG_EMBEDDING_PROVIDER", "openai")
+    RAG_EMBEDDING_MODEL = utils.get_env(
+        "RAG_EMBEDDING_MODEL", "text-embedding-ada-002"
+    )
+    RAG_LOCAL_EMBEDDING_DIM = utils.get_env_int(
+        "RAG_LOCAL_EMBEDDING_DIM", 1024
+    )
+    RAG_EMBEDDING_CACHE_PATH = utils.get_env(
+        "RAG_EMBEDDING_CACHE_PATH", ".cache/embeddings.sqlite"
+    )
+    RAG_EMBEDDING_CACHE_MB = utils.get_env_int("RAG_EMBEDDING_CACHE_MB", 1024)
+    RAG_EMBEDDING_BATCH_SIZE = utils.get_env_int(
+        "RAG_EMBEDDING_BATCH_SIZE", 512
+    )
+    RAG_EMBEDDING_CONCURRENCY = utils.get_env_int(
+        "RAG_EMBEDDING_CONCURRENCY", 4
+    )
+    RAG_RETRIEVAL_MODE = utils.get_env("RAG_RETRIEVAL_MODE", "hybrid")
+    RAG_FETCH_K = utils.get_env_int("RAG_FETCH_K", 20)
+    RAG_RRF_K = utils.get_env_int("RAG_RRF_K", 60)
+    RAG_SEARCH_MODE = utils.get_env("RAG_SEARCH_MODE", "qa")
+    RAG_ANSWER_MODEL = models["rag_answer"].model_name
+    RAG_SNIPPET_TOKEN_BUDGET = utils.get_env_int(
+        "RAG_SNIPPET_TOKEN_BUDGET", 1500
+    )
+    RAG_QUERY_CACHE_SIZE = utils.get_env_int("RAG_QUERY_CACHE_SIZE", 256)
+    RAG_QUERY_CACHE_TTL = utils.get_env_float("RAG_QUERY_CACHE_TTL", 3600.0)
 
     if not verbose:
         logging.basicConfig(level=logging.CRITICAL)
@@ -50,9 +187,53 @@ def init():
         natural_language=natural_language,
         toolkits=toolkits,
         show_reasoning=show_reasoning,
+        streaming=streaming,
+        memory_token_limit=memory_token_limit,
+        tool_router_top_n=tool_router_top_n,
+        fast_path=fast_path,
+        fast_path_threshold=fast_path_threshold,
+        async_agent=async_agent,
+        tool_workers=tool_workers,
+        models=models,
         verbose=verbose,
         RAG_ENABLED=RAG_ENABLED,
-        REMOTE_DOC_URLS=REMOTE_DOC_URLS
+        REMOTE_DOC_URLS=REMOTE_DOC_URLS,
+        REMOTE_DOC_WORKERS=REMOTE_DOC_WORKERS,
+        REMOTE_DOC_TIMEOUT=REMOTE_DOC_TIMEOUT,
+        REMOTE_DOC_CACHE_PATH=REMOTE_DOC_CACHE_PATH,
+        LLM_CACHE_PATH=LLM_CACHE_PATH,
+        LLM_CACHE_SIZE=LLM_CACHE_SIZE,
+        LLM_CACHE_TTL=LLM_CACHE_TTL,
+        LLM_REQUESTS_PER_MINUTE=LLM_REQUESTS_PER_MINUTE,
+        LLM_TOKENS_PER_MINUTE=LLM_TOKENS_PER_MINUTE,
+        LLM_MAX_RETRIES=LLM_MAX_RETRIES,
+        LLM_REQUEST_DEADLINE=LLM_REQUEST_DEADLINE,
+        RAG_READY_TIMEOUT=RAG_READY_TIMEOUT,
+        RAG_INGEST_WORKERS=RAG_INGEST_WORKERS,
+        RAG_CHUNKER=RAG_CHUNKER,
+        RAG_SHARDED_INDEX=RAG_SHARDED_INDEX,
+        RAG_SHARD_GLOBAL_K=RAG_SHARD_GLOBAL_K,
+        RAG_DEDUP_THRESHOLD=RAG_DEDUP_THRESHOLD,
+        RAG_VECTOR_STORE=RAG_VECTOR_STORE,
+        RAG_FAISS_INDEX=RAG_FAISS_INDEX,
+        RAG_FAISS_NPROBE=RAG_FAISS_NPROBE,
+        RAG_VECTOR_QUANTIZATION=RAG_VECTOR_QUANTIZATION,
+        RAG_QUANTIZED_RERANK=RAG_QUANTIZED_RERANK,
+        RAG_EMBEDDING_PROVIDER=RAG_EMBEDDING_PROVIDER,
+        RAG_EMBEDDING_MODEL=RAG_EMBEDDING_MODEL,
+        RAG_LOCAL_EMBEDDING_DIM=RAG_LOCAL_EMBEDDING_DIM,
+        RAG_EMBEDDING_CACHE_PATH=RAG_EMBEDDING_CACHE_PATH,
+        RAG_EMBEDDING_CACHE_MB=RAG_EMBEDDING_CACHE_MB,
+        RAG_EMBEDDING_BATCH_SIZE=RAG_EMBEDDING_BATCH_SIZE,
+        RAG_EMBEDDING_CONCURRENCY=RAG_EMBEDDING_CONCURRENCY,
+        RAG_RETRIEVAL_MODE=RAG_RETRIEVAL_MODE,
+        RAG_FETCH_K=RAG_FETCH_K,
+        RAG_RRF_K=RAG_RRF_K,
+        RAG_SEARCH_MODE=RAG_SEARCH_MODE,
+        RAG_ANSWER_MODEL=RAG_ANSWER_MODEL,
+        RAG_SNIPPET_TOKEN_BUDGET=RAG_SNIPPET_TOKEN_BUDGET,
+        RAG_QUERY_CACHE_SIZE=RAG_QUERY_CACHE_SIZE,
+        RAG_QUERY_CACHE_TTL=RAG_QUERY_CACHE_TTL,
     )
 
 
@@ -64,3 +245,13 @@ def set_verbose(verbose: bool):
 def set_show_reasoning(show_reasoning: bool):
     global infrapilot_CONFIG
     infrapilot_CONFIG.show_reasoning = show_reasoning
+
+
+def require_openai_api_key():
+    """Raise unless OPENAI_API_KEY is set.
+
+    Checked where an OpenAI chat model or embedding is created, so local
+    paths such as offline indexing with the hashing embeddings need no key.
+    """
+    if not utils.get_env("OPENAI_API_KEY"):
+        raise Exception("OPENAI_API_KEY is not set")
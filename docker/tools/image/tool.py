@@ -1,9 +1,8 @@
-import subprocess
 from typing import Any
 import json
 from langchain.schema.language_model import BaseLanguageModel
-from langchain.agents.tools import BaseTool
-from tools.base.tools import RequireApprovalTool
+from tools.base import process
+from tools.base.tools import CommandTool, RequireApprovalTool, parse_command
 from .prompt import (
     PROMPT_PULL_IMAGE,
     PROMPT_REMOVE_IMAGE,
@@ -14,33 +13,16 @@ import os
 import tempfile
 
 
-class PullImageTool(BaseTool):
+class PullImageTool(CommandTool):
     """Tool to pull Docker images via Docker CLI using LLM-generated commands."""
 
     name = "pull_docker_image"
     description = "Generate and run the Docker command to pull an image from a registry based on a natural language query."
     llm: BaseLanguageModel
+    prompt = PROMPT_PULL_IMAGE
 
-    def _run(self, query: str) -> str:
-        raw = self.llm.predict(PROMPT_PULL_IMAGE.format(query=query)).strip()
-        if raw.startswith("```"):
-            lines = raw.splitlines()
-            raw = "\n".join(lines[1:-1])
-        cmd = raw.strip()
-
-        try:
-            result = subprocess.run(
-                cmd,
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-            )
-            if result.returncode == 0:
-                return f"Image pulled successfully: {result.stdout}"
-            return f"Error: {result.stderr}"
-        except Exception as e:
-            return f"Exception: {e}"
+    def output(self, stdout: str) -> str:
+        return f"Image pulled successfully: {stdout}"
 
 
 class BuildImageTool(RequireApprovalTool):
@@ -55,8 +37,12 @@ class BuildImageTool(RequireApprovalTool):
     llm: BaseLanguageModel
 
     def _run(self, text: str) -> str:
-        import json
+        return process.run_steps(self._steps(text), self.llm)
 
+    async def _arun(self, text: str) -> str:
+        return await process.arun_steps(self._steps(text), self.llm)
+
+    def _steps(self, text: str) -> process.Steps:
         try:
             input_data = json.loads(text)
             repo_url = input_data.get("repo_url")
@@ -79,13 +65,7 @@ class BuildImageTool(RequireApprovalTool):
             with tempfile.TemporaryDirectory() as temp_dir:
                 # Clone the repository
                 clone_cmd = f"git clone {repo_url} {temp_dir}"
-                clone_result = subprocess.run(
-                    clone_cmd,
-                    shell=True,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                )
+                clone_result = yield process.Run(clone_cmd)
 
                 if clone_result.returncode != 0:
                     return f"Error cloning repository: {clone_result.stderr}"
@@ -97,13 +77,7 @@ class BuildImageTool(RequireApprovalTool):
 
                 # Build the Docker image
                 build_cmd = f"docker build -t {image_name}:{tag} -f {dockerfile_fullpath} {temp_dir}"
-                build_result = subprocess.run(
-                    build_cmd,
-                    shell=True,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                )
+                build_result = yield process.Run(build_cmd)
 
                 if build_result.returncode != 0:
                     return (
@@ -118,77 +92,48 @@ class BuildImageTool(RequireApprovalTool):
             return f"Exception: {e}"
 
 
-class RemoveImageTool(BaseTool):
+class RemoveImageTool(CommandTool):
     """Tool to remove Docker images via Docker CLI using LLM-generated commands."""
 
     name = "remove_docker_image"
     description = "Generate and run the Docker command to remove one or more images based on a natural language query."
     llm: BaseLanguageModel
+    prompt = PROMPT_REMOVE_IMAGE
 
-    def _run(self, query: str) -> str:
-        raw = self.llm.predict(PROMPT_REMOVE_IMAGE.format(query=query)).strip()
-        if raw.startswith("```"):
-            lines = raw.splitlines()
-            raw = "\n".join(lines[1:-1])
-        cmd = raw.strip()
-
-        try:
-            result = subprocess.run(
-                cmd,
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-            )
-            if result.returncode == 0:
-                return f"Image(s) removed: {result.stdout}"
-            return f"Error: {result.stderr}"
-        except Exception as e:
-            return f"Exception: {e}"
+    def output(self, stdout: str) -> str:
+        return f"Image(s) removed: {stdout}"
 
 
-class TagImageTool(BaseTool):
+class TagImageTool(CommandTool):
     """Tool to tag Docker images via Docker CLI using LLM-generated commands."""
 
     name = "tag_docker_image"
     description = "Generate and run the Docker command to create a tag for an image based on a natural language query."
     llm: BaseLanguageModel
+    prompt = PROMPT_TAG_IMAGE
 
-    def _run(self, query: str) -> str:
-        raw = self.llm.predict(PROMPT_TAG_IMAGE.format(query=query)).strip()
-        if raw.startswith("```"):
-            lines = raw.splitlines()
-            raw = "\n".join(lines[1:-1])
-        cmd = raw.strip()
-
-        try:
-            result = subprocess.run(
-                cmd,
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-            )
-            if result.returncode == 0:
-                return "Image tagged successfully"
-            return f"Error: {result.stderr}"
-        except Exception as e:
-            return f"Exception: {e}"
+    def output(self, stdout: str) -> str:
+        return "Image tagged successfully"
 
 
-class PushImageTool(BaseTool):
+class PushImageTool(CommandTool):
     """Tool to push Docker images via Docker CLI using LLM-generated commands."""
 
     name = "push_docker_image"
     description = "Generate and run the Docker command to push an image to a registry based on a natural language query."
     llm: BaseLanguageModel
+    prompt = PROMPT_PUSH_IMAGE
 
     def _run(self, query: str) -> str:
-        raw = self.llm.predict(PROMPT_PUSH_IMAGE.format(query=query)).strip()
-        if raw.startswith("```"):
-            lines = raw.splitlines()
-            raw = "\n".join(lines[1:-1])
-        cmd = raw.strip()
+        return process.run_steps(self._steps(query), self.llm)
+
+    async def _arun(self, query: str) -> str:
+        return await process.arun_steps(self._steps(query), self.llm)
+
+    def _steps(self, query: str) -> process.Steps:
+        cmd = parse_command(
+            (yield process.Predict(self.prompt.format(query=query)))
+        )
 
         try:
             # Extract image name from the push command for tagging
@@ -210,13 +155,7 @@ class PushImageTool(BaseTool):
                     tag_cmd = f"docker tag {source_image} {target_image}"
 
                     # Run tag command
-                    tag_result = subprocess.run(
-                        tag_cmd,
-                        shell=True,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE,
-                        text=True,
-                    )
+                    tag_result = yield process.Run(tag_cmd)
                     if tag_result.returncode != 0:
                         return f"Error tagging image: {tag_result.stderr}"
 
@@ -224,13 +163,7 @@ class PushImageTool(BaseTool):
                     cmd = f"docker push {target_image}"
 
             # Execute the push command
-            result = subprocess.run(
-                cmd,
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-            )
+            result = yield process.Run(cmd)
             if result.returncode == 0:
                 return f"Image pushed successfully: {result.stdout}"
             return f"Error: {result.stderr}"
@@ -238,7 +171,7 @@ class PushImageTool(BaseTool):
             return f"Exception: {e}"
 
 
-class ListImagesTool(BaseTool):
+class ListImagesTool(CommandTool):
     """Tool to list Docker images."""
 
     name = "list_docker_images"
@@ -248,30 +181,20 @@ class ListImagesTool(BaseTool):
         '"all" is a boolean value to indicate whether to list all images or just non-intermediate ones.'
     )
 
-    def _run(self, text: str) -> str:
+    def command(self, text: str) -> str:
         input_data = json.loads(text)
         all_images = input_data.get("all", False)
 
         cmd = "docker images"
         if all_images:
             cmd += " -a"
+        return cmd
 
-        try:
-            result = subprocess.run(
-                cmd,
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-            )
-            if result.returncode == 0:
-                return f"```\n{result.stdout}\n```"
-            return f"Error: {result.stderr}"
-        except Exception as e:
-            return f"Exception: {e}"
+    def output(self, stdout: str) -> str:
+        return f"```\n{stdout}\n```"
 
 
-class InspectImageTool(BaseTool):
+class InspectImageTool(CommandTool):
     """Tool to inspect Docker images."""
 
     name = "inspect_docker_image"
@@ -280,22 +203,11 @@ class InspectImageTool(BaseTool):
         "Input should be a string with the image ID or name."
     )
 
-    def _run(self, image_id: str) -> str:
-        cmd = f"docker image inspect {image_id}"
+    def command(self, image_id: str) -> str:
+        return f"docker image inspect {image_id}"
 
-        try:
-            result = subprocess.run(
-                cmd,
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-            )
-            if result.returncode == 0:
-                # Parse the output as JSON for better formatting
-                inspect_data = json.loads(result.stdout)
-                # Return a formatted JSON string
-                return json.dumps(inspect_data, indent=2)
-            return f"Error: {result.stderr}"
-        except Exception as e:
-            return f"Exception: {e}"
+    def output(self, stdout: str) -> str:
+        # Parse the output as JSON for better formatting
+        inspect_data = json.loads(stdout)
+        # Return a formatted JSON string
+        return json.dumps(inspect_data, indent=2)
@@ -1,9 +1,7 @@
-import subprocess
 from typing import Any
 import json
 from langchain.schema.language_model import BaseLanguageModel
-from langchain.agents.tools import BaseTool
-from tools.base.tools import RequireApprovalTool
+from tools.base.tools import CommandTool, RequireApprovalTool
 from .prompt import (
     PROMPT_CREATE_VOLUME,
     PROMPT_REMOVE_VOLUME,
@@ -11,7 +9,7 @@ from .prompt import (
 )
 
 
-class CreateVolumeTool(BaseTool):
+class CreateVolumeTool(CommandTool):
     """Tool to create Docker volumes via Docker CLI using LLM-generated commands."""
     
     name = "create_docker_volume"
@@ -19,30 +17,13 @@ class CreateVolumeTool(BaseTool):
         "Generate and run the Docker command to create a volume based on a natural language query."
     )
     llm: BaseLanguageModel
+    prompt = PROMPT_CREATE_VOLUME
 
-    def _run(self, query: str) -> str:
-        raw = self.llm.predict(PROMPT_CREATE_VOLUME.format(query=query)).strip()
-        if raw.startswith("```"):
-            lines = raw.splitlines()
-            raw = "\n".join(lines[1:-1])
-        cmd = raw.strip()
+    def output(self, stdout: str) -> str:
+        return f"Volume created: {stdout}"
 
-        try:
-            result = subprocess.run(
-                cmd,
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-            )
-            if result.returncode == 0:
-                return f"Volume created: {result.stdout}"
-            return f"Error: {result.stderr}"
-        except Exception as e:
-            return f"Exception: {e}"
 
-
-class RemoveVolumeTool(RequireApprovalTool):
+class RemoveVolumeTool(RequireApprovalTool, CommandTool):
     """Tool to remove Docker volumes via Docker CLI using LLM-generated commands."""
     
     name = "remove_docker_volume"
@@ -50,30 +31,13 @@ class RemoveVolumeTool(RequireApprovalTool):
         "Generate and run the Docker command to remove one or more volumes based on a natural language query."
     )
     llm: BaseLanguageModel
+    prompt = PROMPT_REMOVE_VOLUME
 
-    def _run(self, query: str) -> str:
-        raw = self.llm.predict(PROMPT_REMOVE_VOLUME.format(query=query)).strip()
-        if raw.startswith("```"):
-            lines = raw.splitlines()
-            raw = "\n".join(lines[1:-1])
-        cmd = raw.strip()
-
-        try:
-            result = subprocess.run(
-                cmd,
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-            )
-            if result.returncode == 0:
-                return f"Volume(s) removed: {result.stdout}"
-            return f"Error: {result.stderr}"
-        except Exception as e:
-            return f"Exception: {e}"
+    def output(self, stdout: str) -> str:
+        return f"Volume(s) removed: {stdout}"
 
 
-class InspectVolumeTool(BaseTool):
+class InspectVolumeTool(CommandTool):
     """Tool to inspect Docker volumes via Docker CLI using LLM-generated commands."""
     
     name = "inspect_docker_volume"
@@ -81,33 +45,16 @@ class InspectVolumeTool(BaseTool):
         "Generate and run the Docker command to inspect one or more volumes based on a natural language query."
     )
     llm: BaseLanguageModel
+    prompt = PROMPT_INSPECT_VOLUME
 
-    def _run(self, query: str) -> str:
-        raw = self.llm.predict(PROMPT_INSPECT_VOLUME.format(query=query)).strip()
-        if raw.startswith("```"):
-            lines = raw.splitlines()
-            raw = "\n".join(lines[1:-1])
-        cmd = raw.strip()
+    def output(self, stdout: str) -> str:
+        # Parse the output as JSON for better formatting
+        inspect_data = json.loads(stdout)
+        # Return a formatted JSON string
+        return json.dumps(inspect_data, indent=2)
 
-        try:
-            result = subprocess.run(
-                cmd,
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-            )
-            if result.returncode == 0:
-                # Parse the output as JSON for better formatting
-                inspect_data = json.loads(result.stdout)
-                # Return a formatted JSON string
-                return json.dumps(inspect_data, indent=2)
-            return f"Error: {result.stderr}"
-        except Exception as e:
-            return f"Exception: {e}"
 
-
-class ListVolumesTool(BaseTool):
+class ListVolumesTool(CommandTool):
     """Tool to list Docker volumes."""
     
     name = "list_docker_volumes"
@@ -116,19 +63,8 @@ class ListVolumesTool(BaseTool):
         'Input can be empty.'
     )
 
-    def _run(self, text: str = "") -> str:
-        cmd = "docker volume ls"
-            
-        try:
-            result = subprocess.run(
-                cmd,
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-            )
-            if result.returncode == 0:
-                return f"```\n{result.stdout}\n```"
-            return f"Error: {result.stderr}"
-        except Exception as e:
-            return f"Exception: {e}"
\ No newline at end of file
+    def command(self, text: str = "") -> str:
+        return "docker volume ls"
+
+    def output(self, stdout: str) -> str:
+        return f"```\n{stdout}\n```"
\ No newline at end of file
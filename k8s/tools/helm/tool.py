@@ -2,7 +2,7 @@ import json
 import logging
 import os
 import subprocess
-from langchain import LLMChain, PromptTemplate
+from typing import Optional
 from langchain.agents.tools import BaseTool
 import requests
 import yaml
@@ -16,6 +16,7 @@ from k8s.tools.helm.prompt import (
     CONSTRUCT_HELM_OVERRIDED_VALUES,
     CONSTRUCT_HELM_UPGRADE_VALUES,
 )
+from tools.base import process
 from tools.base.tools import RequireApprovalTool
 from kubernetes import config, dynamic
 from kubernetes.client import api_client
@@ -31,13 +32,11 @@ def trim_default_values(input_string):
     return first_300_lines
 
 
-def get_chart_default_values(chart_url: str):
+def get_chart_default_values(chart_url: str) -> process.Steps:
     """Get default values(in yaml) of a helm chart."""
-    helm_show_values_command = f"helm show values {chart_url}"
-
     try:
-        output = subprocess.check_output(
-            helm_show_values_command, shell=True, universal_newlines=True
+        output = yield from process.checked_output(
+            f"helm show values {chart_url}"
         )
 
         return trim_default_values(output)
@@ -47,7 +46,7 @@ def get_chart_default_values(chart_url: str):
         return f"Error: {e}"
 
 
-def get_helm_release_values(namespace: str, name: str):
+def get_helm_release_values(namespace: str, name: str) -> process.Steps:
     """Get values of a helm release."""
     helm_get_values_command = f"helm get values {name} -o yaml"
 
@@ -55,17 +54,22 @@ def get_helm_release_values(namespace: str, name: str):
         helm_get_values_command += f" --namespace {namespace}"
 
     try:
-        output = subprocess.check_output(
-            helm_get_values_command, shell=True, universal_newlines=True
-        )
-
-        return output
+        return (yield from process.checked_output(helm_get_values_command))
     except subprocess.CalledProcessError as e:
         return f"Helm get values failed: {e}"
     except Exception as e:
         return f"Error: {e}"
 
 
+def metadata_chart_url(release_values: str) -> str:
+    """Chart url recorded in the values of a release deployed by infrapilot."""
+    return (
+        yaml.safe_load(release_values)
+        .get("global", {})
+        .get("metadata_chart_url")
+    )
+
+
 def searchChart(keyword: str):
     """Search helm charts in Artifact Hub. Returns a matching chart object."""
     params = {
@@ -116,13 +120,8 @@ class SearchChartTool(BaseTool):
     )
     llm: BaseLanguageModel
 
-    def _run(self, text: str) -> str:
-        input = json.loads(text)
-        query = input.get("user_query")
-        keyword = input.get("keyword")
-        chart = searchChart(keyword)
-        default_values = get_chart_default_values(chart.get("content_url"))
-
+    @staticmethod
+    def _result(chart: dict, overrided_values: str) -> str:
         def clean_yaml_string(yaml_str):
             if yaml_str.startswith("```yaml"):
                 yaml_str = yaml_str[len("```yaml") :].strip()
@@ -130,16 +129,31 @@ class SearchChartTool(BaseTool):
                 yaml_str = yaml_str[:-3].strip()
             return yaml_str
 
-        prompt = PromptTemplate(
-            template=CONSTRUCT_HELM_OVERRIDED_VALUES,
-            input_variables=["query"],
-            partial_variables={"default_values": default_values},
-        )
-        chain = LLMChain(llm=self.llm, prompt=prompt)
-        overrided_values = clean_yaml_string(chain.run(query).strip())
+        overrided_values = clean_yaml_string(overrided_values.strip())
         chart["overrided_values"] = yaml.safe_load(overrided_values)
         return json.dumps(chart)
 
+    def _run(self, text: str) -> str:
+        return process.run_steps(self._steps(text), self.llm)
+
+    async def _arun(self, text: str) -> str:
+        return await process.arun_steps(self._steps(text), self.llm)
+
+    def _steps(self, text: str) -> process.Steps:
+        input = json.loads(text)
+        query = input.get("user_query")
+        keyword = input.get("keyword")
+        chart = yield process.Call(searchChart, (keyword,))
+        default_values = yield from get_chart_default_values(
+            chart.get("content_url")
+        )
+        overrided_values = yield process.Predict(
+            CONSTRUCT_HELM_OVERRIDED_VALUES.format(
+                query=query, default_values=default_values
+            )
+        )
+        return self._result(chart, overrided_values)
+
 
 class DeployApplicationTool(RequireApprovalTool):
     """Tool to deploy an application using helm charts."""
@@ -154,7 +168,7 @@ class DeployApplicationTool(RequireApprovalTool):
         '"values" is overrided values for the helm installation to satisfy user query.'
     )
 
-    def _run(self, text: str) -> str:
+    def command(self, text: str) -> str:
         input = json.loads(text)
         chart_url = input.get("chart_url")
         name = input.get("name")
@@ -183,11 +197,18 @@ class DeployApplicationTool(RequireApprovalTool):
         with open(file_path, "w") as file:
             yaml.dump(input.get("values"), file)
         helm_install_command += f" -f {file_path}"
+        return helm_install_command
+
+    def _run(self, text: str) -> str:
+        return process.run_steps(self._steps(text))
+
+    async def _arun(self, text: str) -> str:
+        return await process.arun_steps(self._steps(text))
 
+    def _steps(self, text: str) -> process.Steps:
+        name = json.loads(text).get("name")
         try:
-            output = subprocess.check_output(
-                helm_install_command, shell=True, universal_newlines=True
-            )
+            output = yield from process.checked_output(self.command(text))
 
             logger.debug(f"helm install output: {output}")
             return f"application {name} is deployed."
@@ -212,6 +233,12 @@ class GenerateUpgradeApplicationValuesTool(BaseTool):
     llm: BaseLanguageModel
 
     def _run(self, text: str) -> str:
+        return process.run_steps(self._steps(text), self.llm)
+
+    async def _arun(self, text: str) -> str:
+        return await process.arun_steps(self._steps(text), self.llm)
+
+    def _steps(self, text: str) -> process.Steps:
         input = json.loads(text)
         namespace = input.get("namespace")
         name = input.get("name")
@@ -220,30 +247,24 @@ class GenerateUpgradeApplicationValuesTool(BaseTool):
         if namespace == "":
             namespace = "default"
 
-        previous_values = get_helm_release_values(namespace, name)
-
-        chart_url = (
-            yaml.safe_load(previous_values)
-            .get("global", {})
-            .get("metadata_chart_url")
-        )
+        previous_values = yield from get_helm_release_values(namespace, name)
+        chart_url = metadata_chart_url(previous_values)
         if not chart_url:
             return "Missing chart_url metadata in previous release"
 
-        default_values = get_chart_default_values(chart_url)
-
-        prompt = PromptTemplate(
-            template=CONSTRUCT_HELM_UPGRADE_VALUES,
-            input_variables=["query"],
-            partial_variables={
-                "default_values": default_values,
-                "previous_values": previous_values,
-            },
+        default_values = yield from get_chart_default_values(chart_url)
+        overrided_values = yield process.Predict(
+            CONSTRUCT_HELM_UPGRADE_VALUES.format(
+                query=query,
+                default_values=default_values,
+                previous_values=previous_values,
+            )
         )
-        chain = LLMChain(llm=self.llm, prompt=prompt)
-        overrided_values_yaml = chain.run(query).strip()
+        return self._result(overrided_values)
 
-        overrided_values = yaml.safe_load(overrided_values_yaml)
+    @staticmethod
+    def _result(overrided_values_yaml: str) -> str:
+        overrided_values = yaml.safe_load(overrided_values_yaml.strip())
         if (
             "global" in overrided_values
             and "metadata_chart_url" in overrided_values["global"]
@@ -265,21 +286,17 @@ class UpgradeApplicationTool(RequireApprovalTool):
         '"values" is overrided values for helm upgrade to satisfy user query.'
     )
 
-    def _run(self, text: str) -> str:
+    def command(self, text: str, previous_values: str) -> Optional[str]:
+        """helm upgrade command; None when the release has no chart_url
+        metadata."""
         input = json.loads(text)
         namespace = input.get("namespace")
         name = input.get("name")
         values = input.get("values")
 
-        previous_values = get_helm_release_values(namespace, name)
-
-        chart_url = (
-            yaml.safe_load(previous_values)
-            .get("global", {})
-            .get("metadata_chart_url")
-        )
+        chart_url = metadata_chart_url(previous_values)
         if not chart_url:
-            return "Missing chart_url metadata in previous release"
+            return None
 
         if namespace == "":
             namespace = "default"
@@ -302,11 +319,26 @@ class UpgradeApplicationTool(RequireApprovalTool):
             with open(file_path, "w") as file:
                 yaml.dump(values, file)
             helm_upgrade_command += f" -f {file_path}"
+        return helm_upgrade_command
+
+    def _run(self, text: str) -> str:
+        return process.run_steps(self._steps(text))
+
+    async def _arun(self, text: str) -> str:
+        return await process.arun_steps(self._steps(text))
+
+    def _steps(self, text: str) -> process.Steps:
+        input = json.loads(text)
+        name = input.get("name")
+        previous_values = yield from get_helm_release_values(
+            input.get("namespace"), name
+        )
+        helm_upgrade_command = self.command(text, previous_values)
+        if helm_upgrade_command is None:
+            return "Missing chart_url metadata in previous release"
 
         try:
-            output = subprocess.check_output(
-                helm_upgrade_command, shell=True, universal_newlines=True
-            )
+            output = yield from process.checked_output(helm_upgrade_command)
 
             logger.debug(f"helm upgrade output: {output}")
             return f"application {name} is upgraded."
@@ -316,21 +348,26 @@ class UpgradeApplicationTool(RequireApprovalTool):
             return f"Error: {e}"
 
 
-def get_pod_ready_status_of_helm_release(name: str, namespace: str) -> str:
+def get_pod_ready_status_of_helm_release(
+    name: str, namespace: str
+) -> process.Steps:
     if namespace == "":
         namespace = "default"
 
     helm_list_command = f"helm get manifest {name} --namespace {namespace}"
 
     try:
-        output = subprocess.check_output(
-            helm_list_command, shell=True, universal_newlines=True
-        )
+        output = yield from process.checked_output(helm_list_command)
     except subprocess.CalledProcessError as e:
         return f"Failed to get helm manifest: {e}"
     except Exception as e:
         return f"Error: {e}"
 
+    return (yield process.Call(pod_ready_status, (output, namespace)))
+
+
+def pod_ready_status(output: str, namespace: str) -> str:
+    """Ready/desired replicas of the workloads in a release manifest."""
     resource_manifests = yaml.safe_load_all(output)
 
     dyn_client = dynamic.DynamicClient(
@@ -403,7 +440,7 @@ class ListApplicationsTool(BaseTool):
         "If namespace is --all, list applications in all namespaces."
     )
 
-    def _run(self, text: str) -> str:
+    def command(self, text: str) -> str:
         input = json.loads(text)
         namespace = input.get("namespace")
 
@@ -415,24 +452,35 @@ class ListApplicationsTool(BaseTool):
             if namespace == "":
                 namespace = "default"
             helm_list_command += f" --namespace {namespace}"
+        return helm_list_command
 
-        try:
-            output = subprocess.check_output(
-                helm_list_command, shell=True, universal_newlines=True
-            )
+    def _run(self, text: str) -> str:
+        return process.run_steps(self._steps(text))
 
+    async def _arun(self, text: str) -> str:
+        return await process.arun_steps(self._steps(text))
+
+    def _steps(self, text: str) -> process.Steps:
+        try:
+            output = yield from process.checked_output(self.command(text))
         except subprocess.CalledProcessError as e:
             return f"Helm list failed: {e}"
         except Exception as e:
             return f"Error: {e}"
 
         helm_releases = json.loads(output)
-        for helm_release in helm_releases:
+        ready = yield process.Gather(
+            [
+                get_pod_ready_status_of_helm_release(
+                    helm_release.get("name"), helm_release.get("namespace")
+                )
+                for helm_release in helm_releases
+            ]
+        )
+        for helm_release, release_ready in zip(helm_releases, ready):
             del helm_release["chart"]
             del helm_release["app_version"]
-            helm_release["ready"] = get_pod_ready_status_of_helm_release(
-                helm_release.get("name"), helm_release.get("namespace")
-            )
+            helm_release["ready"] = release_ready
         return json.dumps(helm_releases)
 
 
@@ -446,28 +494,35 @@ class GetApplicationResourcesTool(BaseTool):
         'Input should be a json string with two keys: "name" and "namespace".'
     )
 
-    def _run(self, text: str) -> str:
-        input = json.loads(text)
-        name = input.get("name")
-        namespace = input.get("namespace")
+    @staticmethod
+    def _namespace(text: str) -> str:
+        namespace = json.loads(text).get("namespace")
+        return "default" if namespace == "" else namespace
 
-        if namespace == "":
-            namespace = "default"
+    def command(self, text: str) -> str:
+        name = json.loads(text).get("name")
+        return f"helm get manifest {name} --namespace {self._namespace(text)}"
 
-        helm_manifest_command = (
-            f"helm get manifest {name} --namespace {namespace}"
-        )
+    def _run(self, text: str) -> str:
+        return process.run_steps(self._steps(text))
 
-        try:
-            output = subprocess.check_output(
-                helm_manifest_command, shell=True, universal_newlines=True
-            )
+    async def _arun(self, text: str) -> str:
+        return await process.arun_steps(self._steps(text))
 
+    def _steps(self, text: str) -> process.Steps:
+        try:
+            output = yield from process.checked_output(self.command(text))
         except subprocess.CalledProcessError as e:
             return f"Helm delete failed: {e}"
         except Exception as e:
             return f"Error: {e}"
 
+        return (
+            yield process.Call(self._resources, (output, self._namespace(text)))
+        )
+
+    @staticmethod
+    def _resources(output: str, namespace: str) -> str:
         resource_manifests = yaml.safe_load_all(output)
 
         dyn_client = dynamic.DynamicClient(
@@ -504,30 +559,36 @@ class GetApplicationAccessEndpointsTool(BaseTool):
         'Input should be a json string with two keys: "name" and "namespace".'
     )
 
-    def _run(self, text: str) -> str:
-        input = json.loads(text)
-        name = input.get("name")
-        namespace = input.get("namespace")
+    @staticmethod
+    def _namespace(text: str) -> str:
+        namespace = json.loads(text).get("namespace")
+        return "default" if namespace == "" else namespace
 
-        helm_manifest_command = f"helm get manifest {name}"
+    def command(self, text: str) -> str:
+        name = json.loads(text).get("name")
+        return f"helm get manifest {name} --namespace {self._namespace(text)}"
 
-        if namespace == "":
-            namespace = "default"
+    def _run(self, text: str) -> str:
+        return process.run_steps(self._steps(text))
 
-        helm_manifest_command += f" --namespace {namespace}"
+    async def _arun(self, text: str) -> str:
+        return await process.arun_steps(self._steps(text))
 
+    def _steps(self, text: str) -> process.Steps:
         try:
-            output = subprocess.check_output(
-                helm_manifest_command, shell=True, universal_newlines=True
-            )
-            output = output.replace('`', '')
-
+            output = yield from process.checked_output(self.command(text))
         except subprocess.CalledProcessError as e:
             return f"Helm delete failed: {e}"
         except Exception as e:
             return f"Error: {e}"
 
-        resource_manifests = yaml.safe_load_all(output)
+        return (
+            yield process.Call(self._endpoints, (output, self._namespace(text)))
+        )
+
+    @staticmethod
+    def _endpoints(output: str, namespace: str) -> str:
+        resource_manifests = yaml.safe_load_all(output.replace("`", ""))
 
         dyn_client = dynamic.DynamicClient(
             api_client.ApiClient(configuration=config.load_kube_config())
@@ -565,7 +626,7 @@ class GetApplicationDetailTool(BaseTool):
         'Input should be a json string with two keys: "name" and "namespace".'
     )
 
-    def _run(self, text: str) -> str:
+    def command(self, text: str) -> str:
         input = json.loads(text)
         name = input.get("name")
         namespace = input.get("namespace")
@@ -573,21 +634,10 @@ class GetApplicationDetailTool(BaseTool):
         if namespace == "":
             namespace = "default"
 
-        helm_status_command = (
-            f"helm status {name} --show-resources --namespace {namespace}"
-        )
-
-        try:
-            output = subprocess.check_output(
-                helm_status_command, shell=True, universal_newlines=True
-            )
-
-        except subprocess.CalledProcessError as e:
-            return f"Helm status failed: {e}"
-        except Exception as e:
-            return f"Error: {e}"
+        return f"helm status {name} --show-resources --namespace {namespace}"
 
-        # Trim NOTES
+    @staticmethod
+    def _trim_notes(output: str) -> str:
         index = output.find("NOTES:")
 
         if index != -1:
@@ -595,6 +645,22 @@ class GetApplicationDetailTool(BaseTool):
 
         return output
 
+    def _run(self, text: str) -> str:
+        return process.run_steps(self._steps(text))
+
+    async def _arun(self, text: str) -> str:
+        return await process.arun_steps(self._steps(text))
+
+    def _steps(self, text: str) -> process.Steps:
+        try:
+            output = yield from process.checked_output(self.command(text))
+        except subprocess.CalledProcessError as e:
+            return f"Helm status failed: {e}"
+        except Exception as e:
+            return f"Error: {e}"
+
+        return self._trim_notes(output)
+
 
 class DeleteApplicationTool(RequireApprovalTool):
     """Tool to delete an application."""
@@ -605,7 +671,7 @@ class DeleteApplicationTool(RequireApprovalTool):
         'Input should be a json string with two keys: "name" and "namespace".'
     )
 
-    def _run(self, text: str) -> str:
+    def command(self, text: str) -> str:
         input = json.loads(text)
         name = input.get("name")
         namespace = input.get("namespace")
@@ -613,12 +679,17 @@ class DeleteApplicationTool(RequireApprovalTool):
         if namespace == "":
             namespace = "default"
 
-        helm_delete_command = f"helm delete {name} --namespace {namespace}"
+        return f"helm delete {name} --namespace {namespace}"
+
+    def _run(self, text: str) -> str:
+        return process.run_steps(self._steps(text))
+
+    async def _arun(self, text: str) -> str:
+        return await process.arun_steps(self._steps(text))
 
+    def _steps(self, text: str) -> process.Steps:
         try:
-            output = subprocess.check_output(
-                helm_delete_command, shell=True, universal_newlines=True
-            )
+            output = yield from process.checked_output(self.command(text))
 
             logger.debug(f"helm delete output: {output}")
             return "Application is deleted."
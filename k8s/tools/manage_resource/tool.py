@@ -15,6 +15,7 @@ from k8s.tools.manage_resource.prompt import (
     CONSTRUCT_RESOURCES_TO_CREATE_PROMPT,
     CONSTRUCT_RESOURCES_TO_UPDATE_PROMPT,
 )
+from tools.base import process
 from tools.base.tools import RequireApprovalTool
 from kubernetes import config, dynamic, client
 from kubernetes.client import api_client
@@ -36,7 +37,7 @@ class ListResourcesTool(BaseTool):
         "If namespace is --all, lists in all namespaces."
     )
 
-    def _run(self, text: str) -> str:
+    def command(self, text: str) -> str:
         input = json.loads(text)
 
         resource_kind = str(input.get("resource_kind")).lower()
@@ -49,10 +50,12 @@ class ListResourcesTool(BaseTool):
             kubectl_get_command += " --all-namespaces"
         elif namespace:
             kubectl_get_command += f" -n {namespace}"
+        return kubectl_get_command
 
+    def _run(self, text: str) -> str:
         try:
             output = subprocess.check_output(
-                kubectl_get_command, shell=True, universal_newlines=True
+                self.command(text), shell=True, universal_newlines=True
             )
 
         except subprocess.CalledProcessError as e:
@@ -63,6 +66,16 @@ class ListResourcesTool(BaseTool):
         # Print raw output without markdown rendering
         return f"{utils.raw_format_prefix}\n{output}"
 
+    async def _arun(self, text: str) -> str:
+        try:
+            output = await process.check_output(self.command(text))
+        except subprocess.CalledProcessError as e:
+            return f"kubectl get failed: {e}"
+        except Exception as e:
+            return f"Error: {e}"
+
+        return f"{utils.raw_format_prefix}\n{output}"
+
 
 class ListResourcesForInfoTool(ListResourcesTool):
     """Tool to list resources for info."""
@@ -280,7 +293,7 @@ class DescribePodTool(BaseTool):
         'Input should be a json string with two keys: "name" and "namespace".'
     )
 
-    def _run(self, text: str) -> str:
+    def command(self, text: str) -> str:
         input = json.loads(text)
 
         name = input.get("name")
@@ -288,13 +301,12 @@ class DescribePodTool(BaseTool):
         if namespace == "":
             namespace = "default"
 
-        kubectl_describe_command = (
-            f"kubectl describe pod {name} -n {namespace}"
-        )
+        return f"kubectl describe pod {name} -n {namespace}"
 
+    def _run(self, text: str) -> str:
         try:
             output = subprocess.check_output(
-                kubectl_describe_command, shell=True, universal_newlines=True
+                self.command(text), shell=True, universal_newlines=True
             )
         except subprocess.CalledProcessError as e:
             return f"kubectl get failed: {e}"
@@ -303,6 +315,14 @@ class DescribePodTool(BaseTool):
 
         return output
 
+    async def _arun(self, text: str) -> str:
+        try:
+            return await process.check_output(self.command(text))
+        except subprocess.CalledProcessError as e:
+            return f"kubectl get failed: {e}"
+        except Exception as e:
+            return f"Error: {e}"
+
 
 class GetPodLogsTool(BaseTool):
     """Tool to get logs of a pod."""
@@ -396,15 +416,20 @@ class ConstructResourceTool(BaseTool):
     )
     llm: BaseLanguageModel
 
-    def _run(self, text: str) -> str:
-        input = json.loads(text)
-        query = input.get("user_query")
+    def _chain(self) -> LLMChain:
         prompt = PromptTemplate(
             template=CONSTRUCT_RESOURCES_TO_CREATE_PROMPT,
             input_variables=["query"],
         )
-        chain = LLMChain(llm=self.llm, prompt=prompt)
-        return chain.run(json.dumps(query)).strip()
+        return LLMChain(llm=self.llm, prompt=prompt)
+
+    def _run(self, text: str) -> str:
+        query = json.loads(text).get("user_query")
+        return self._chain().run(json.dumps(query)).strip()
+
+    async def _arun(self, text: str) -> str:
+        query = json.loads(text).get("user_query")
+        return (await self._chain().arun(json.dumps(query))).strip()
 
 
 class ConstructResourceForUpdateTool(BaseTool):
@@ -419,9 +444,10 @@ class ConstructResourceForUpdateTool(BaseTool):
     )
     llm: BaseLanguageModel
 
-    def _run(self, text: str) -> str:
+    @staticmethod
+    def current_resource(text: str) -> dict:
+        """Spec of the resource to update, trimmed for the prompt."""
         input = json.loads(text)
-        query = input.get("user_query")
         resource_kind = input.get("resource_kind")
         resource_name = input.get("resource_name")
         namespace = input.get("namespace")
@@ -437,11 +463,10 @@ class ConstructResourceForUpdateTool(BaseTool):
             kind=gvk.kind,
         )
 
+        resource = resources.get(
+            name=resource_name, namespace=namespace
+        ).to_dict()
         try:
-            resource_raw = resources.get(
-                name=resource_name, namespace=namespace
-            )
-            resource = resource_raw.to_dict()
             # make prompt short.
             del resource["metadata"]["managedFields"]
             del resource["metadata"]["resourceVersion"]
@@ -450,16 +475,28 @@ class ConstructResourceForUpdateTool(BaseTool):
             del resource["status"]
         except KeyError:
             pass
+        return resource
+
+    def _run(self, text: str) -> str:
+        return process.run_steps(self._steps(text), self.llm)
+
+    async def _arun(self, text: str) -> str:
+        return await process.arun_steps(self._steps(text), self.llm)
+
+    def _steps(self, text: str) -> process.Steps:
+        query = json.loads(text).get("user_query")
+        try:
+            resource = yield process.Call(self.current_resource, (text,))
         except Exception as e:
             return f"Error getting resource detail: {e}"
 
-        prompt = PromptTemplate(
-            template=CONSTRUCT_RESOURCES_TO_UPDATE_PROMPT,
-            input_variables=["query"],
-            partial_variables={"current_resource_spec": yaml.dump(resource)},
+        answer = yield process.Predict(
+            CONSTRUCT_RESOURCES_TO_UPDATE_PROMPT.format(
+                query=json.dumps(query),
+                current_resource_spec=yaml.dump(resource),
+            )
         )
-        chain = LLMChain(llm=self.llm, prompt=prompt)
-        return chain.run(json.dumps(query)).strip()
+        return answer.strip()
 
 
 class ApplyResourcesTool(RequireApprovalTool):
@@ -0,0 +1,161 @@
+"""Benchmark of documentation ingestion and retrieval on the real corpus.
+
+Run with ``python -m rag.benchmark [source_dir] [--output report.json]``.
+Embeddings are always the deterministic local ones, so numbers are
+comparable between runs and need no API key: the key is cleared, so an
+accidental OpenAI call fails instead of skewing the timings. Other RAG_*
+settings (chunker, vector store, retrieval mode, ...) are taken from the
+environment.
+"""
+import os
+import resource
+import statistics
+import tempfile
+import time
+
+from config import config
+
+# Fixed query set: each query with the doc that answers it.
+BENCHMARK_QUERIES = [
+    ("launch an ec2 instance with a key pair", "ec2/run-instances.rst"),
+    ("show the bucket policy of an s3 bucket", "s3api/get-bucket-policy.rst"),
+    ("copy a local file to s3", "s3/cp.rst"),
+    ("create an iam role with a trust policy", "iam/create-role.rst"),
+    ("configure kubectl for an eks cluster", "eks/update-kubeconfig.rst"),
+    ("invoke a lambda function", "lambda/invoke.rst"),
+    ("docker login to ecr", "ecr/get-login-password.rst"),
+    ("deploy a cloudformation template", "cloudformation/deploy.rst"),
+    ("create an rds db instance", "rds/create-db-instance.rst"),
+    ("assume an iam role with sts", "sts/assume-role.rst"),
+    ("write an item to a dynamodb table", "dynamodb/put-item.rst"),
+    ("list ec2 security groups", "ec2/describe-security-groups.rst"),
+    (
+        "add a dns record in route53",
+        "route53/change-resource-record-sets.rst",
+    ),
+    ("send a message to an sqs queue", "sqs/send-message.rst"),
+    ("deployment rolling update strategy", "deployment-v1.md"),
+    ("pod container restart policy", "pod-v1.md"),
+    ("cron job schedule", "cron-job-v1.md"),
+    ("stateful set volume claim templates", "stateful-set-v1.md"),
+    ("service type loadbalancer ports", "service-v1.md"),
+    ("ingress rules and tls", "ingress-v1.md"),
+    ("configmap data keys", "config-map-v1.md"),
+    ("secret type and data", "secret-v1.md"),
+    ("persistent volume claim access modes", "persistent-volume-claim-v1.md"),
+    ("horizontal pod autoscaler metrics", "horizontal-pod-autoscaler-v2.md"),
+]
+
+
+def directory_bytes(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of this process and of its finished children
+    (the splitting workers); ru_maxrss is in KiB on Linux."""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(own, children) * 1024
+
+
+def percentile(values: list[float], share: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+def run_benchmark(
+    source_dir: str = "docs", k: int = 3, rounds: int = 5
+) -> dict:
+    """Ingest source_dir into a fresh index and query it.
+
+    Latencies are over rounds passes of the query set on the warm
+    retriever; recall@k is the share of queries whose expected doc is among
+    the top-k results. Expects config.init() to have been called.
+    """
+    from rag.ingest import ingest_documentation
+    from rag.rag_chain import create_retriever
+
+    settings = config.infrapilot_CONFIG
+    report = {
+        "settings": {
+            "chunker": settings.RAG_CHUNKER,
+            "vector_store": settings.RAG_VECTOR_STORE,
+            "retrieval_mode": settings.RAG_RETRIEVAL_MODE,
+            "embedding_dimensions": settings.RAG_LOCAL_EMBEDDING_DIM,
+            "k": k,
+        }
+    }
+    with tempfile.TemporaryDirectory() as persist_directory:
+        report["ingest"] = ingest_documentation(source_dir, persist_directory)
+        report["index_bytes"] = directory_bytes(persist_directory)
+
+        start = time.perf_counter()
+        retriever = create_retriever(k=k, persist_directory=persist_directory)
+        report["cold_open_ms"] = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        retriever.get_relevant_documents(BENCHMARK_QUERIES[0][0])
+        report["cold_first_query_ms"] = (time.perf_counter() - start) * 1000
+
+        latencies = []
+        hits = 0
+        for round_index in range(rounds):
+            for query, expected in BENCHMARK_QUERIES:
+                start = time.perf_counter()
+                documents = retriever.get_relevant_documents(query)
+                latencies.append((time.perf_counter() - start) * 1000)
+                if round_index == 0:
+                    sources = [
+                        source
+                        for document in documents
+                        for source in document.metadata.get(
+                            "sources", [document.metadata.get("source", "")]
+                        )
+                    ]
+                    hits += any(
+                        source.endswith(expected) for source in sources
+                    )
+
+    report["query_ms"] = {
+        "p50": statistics.median(latencies),
+        "p99": percentile(latencies, 0.99),
+        "mean": statistics.fmean(latencies),
+    }
+    report[f"recall@{k}"] = hits / len(BENCHMARK_QUERIES)
+    report["peak_rss_bytes"] = peak_rss_bytes()
+    return report
+
+
+def _rounded(value):
+    if isinstance(value, float):
+        return round(value, 3)
+    if isinstance(value, dict):
+        return {key: _rounded(item) for key, item in value.items()}
+    return value
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source_dir", nargs="?", default="docs")
+    parser.add_argument("-k", type=int, default=3)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--output", help="write the JSON report here")
+    args = parser.parse_args()
+
+    os.environ["RAG_EMBEDDING_PROVIDER"] = "local"
+    config.init()
+    # load_dotenv() may have set it; nothing here may call OpenAI.
+    os.environ.pop("OPENAI_API_KEY", None)
+    report = _rounded(run_benchmark(args.source_dir, args.k, args.rounds))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    print(output)
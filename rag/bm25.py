@@ -0,0 +1,103 @@
+import heapq
+import math
+import os
+import pickle
+from collections import Counter, defaultdict
+from typing import Any, Optional
+
+from utils.text import tokenize
+
+BM25_FILENAME = "bm25.pkl"
+
+
+class BM25Index:
+    """Incrementally maintained inverted index with Okapi BM25 scoring.
+
+    Holds the chunk texts as well, so lexical hits can be returned without
+    touching the vector store.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: dict[str, dict[str, int]] = defaultdict(dict)
+        self.chunks: dict[str, dict[str, Any]] = {}
+        self.total_length = 0
+
+    @classmethod
+    def load(cls, persist_directory: str) -> "BM25Index":
+        path = os.path.join(persist_directory, BM25_FILENAME)
+        try:
+            with open(path, "rb") as file:
+                return pickle.load(file)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return cls()
+
+    def save(self, persist_directory: str):
+        os.makedirs(persist_directory, exist_ok=True)
+        path = os.path.join(persist_directory, BM25_FILENAME)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as file:
+            pickle.dump(self, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    def add(self, chunk_id: str, text: str, metadata: dict[str, Any]):
+        if chunk_id in self.chunks:
+            self.remove([chunk_id])
+        frequencies = Counter(tokenize(text))
+        length = sum(frequencies.values())
+        for term, frequency in frequencies.items():
+            self.postings[term][chunk_id] = frequency
+        self.chunks[chunk_id] = {
+            "text": text,
+            "metadata": metadata,
+            "length": length,
+            "terms": list(frequencies),
+        }
+        self.total_length += length
+
+    def remove(self, chunk_ids: list[str]):
+        for chunk_id in chunk_ids:
+            chunk = self.chunks.pop(chunk_id, None)
+            if chunk is None:
+                continue
+            self.total_length -= chunk["length"]
+            for term in chunk["terms"]:
+                postings = self.postings.get(term)
+                if postings is None:
+                    continue
+                postings.pop(chunk_id, None)
+                if not postings:
+                    del self.postings[term]
+
+    def search(self, query: str, k: int = 4) -> list[tuple[str, float]]:
+        """Top-k (chunk_id, score) pairs for a query."""
+        count = len(self.chunks)
+        if not count:
+            return []
+
+        average_length = self.total_length / count
+        scores: dict[str, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(
+                1 + (count - len(postings) + 0.5) / (len(postings) + 0.5)
+            )
+            for chunk_id, frequency in postings.items():
+                length = self.chunks[chunk_id]["length"]
+                norm = self.k1 * (
+                    1 - self.b + self.b * length / average_length
+                )
+                scores[chunk_id] += (
+                    idf * frequency * (self.k1 + 1) / (frequency + norm)
+                )
+
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+    def get(self, chunk_id: str) -> Optional[dict[str, Any]]:
+        return self.chunks.get(chunk_id)
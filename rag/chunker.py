@@ -0,0 +1,184 @@
+import re
+from typing import Optional
+
+from langchain.schema import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+# Characters allowed in rst section adornments.
+RST_ADORNMENT = re.compile(r"^([=\-~^\"'`#*+<>:._])\1{2,}\s*$")
+MARKDOWN_HEADING = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+CODE_FENCE = re.compile(r"^\s*(```|~~~)")
+
+
+class Section:
+    def __init__(self, breadcrumb: list[str], lines: list[str]):
+        self.breadcrumb = breadcrumb
+        self.lines = lines
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines).strip()
+
+
+def parse_sections(text: str) -> list[Section]:
+    """Split rst or markdown into sections at headings, keeping the heading
+    path of each section. Headings inside code fences are ignored."""
+    lines = text.splitlines()
+    sections = [Section([], [])]
+    breadcrumb: list[str] = []
+    # rst heading levels are defined by the order adornments first appear.
+    rst_styles: list[tuple[str, bool]] = []
+    in_fence = False
+    i = 0
+
+    def start_section(level: int, title: str, heading_lines: list[str]):
+        del breadcrumb[level:]
+        breadcrumb.append(title)
+        sections.append(Section(list(breadcrumb), list(heading_lines)))
+
+    while i < len(lines):
+        line = lines[i]
+        if CODE_FENCE.match(line):
+            in_fence = not in_fence
+        elif not in_fence:
+            heading = MARKDOWN_HEADING.match(line)
+            next_line = lines[i + 1] if i + 1 < len(lines) else ""
+            after_next = lines[i + 2] if i + 2 < len(lines) else ""
+
+            overlined = (
+                RST_ADORNMENT.match(line)
+                and next_line.strip()
+                and RST_ADORNMENT.match(after_next)
+                and after_next.strip()[0] == line.strip()[0]
+            )
+            underlined = (
+                line.strip()
+                and not line[0].isspace()
+                and not RST_ADORNMENT.match(line)
+                and RST_ADORNMENT.match(next_line)
+                and len(next_line.rstrip()) >= len(line.rstrip())
+            )
+
+            if heading:
+                level = len(heading.group(1)) - 1
+                start_section(level, heading.group(2), [line])
+                i += 1
+                continue
+            if overlined or underlined:
+                adornment = line if overlined else next_line
+                style = (adornment.strip()[0], bool(overlined))
+                if style not in rst_styles:
+                    rst_styles.append(style)
+                title = (next_line if overlined else line).strip()
+                count = 3 if overlined else 2
+                start_section(
+                    rst_styles.index(style), title, lines[i : i + count]
+                )
+                i += count
+                continue
+
+        sections[-1].lines.append(line)
+        i += 1
+
+    return [section for section in sections if section.text]
+
+
+class StructureAwareSplitter:
+    """Chunker that follows document structure instead of character counts.
+
+    A document that fits in chunk_size becomes a single chunk. Longer
+    documents are split at section boundaries, merging adjacent sections up
+    to chunk_size; only sections larger than that are split by characters.
+    Each chunk records the heading path it starts in as "breadcrumb".
+    """
+
+    def __init__(self, chunk_size: int = 4000, chunk_overlap: int = 200):
+        self.chunk_size = chunk_size
+        self.fallback = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size, chunk_overlap=chunk_overlap
+        )
+
+    def split_text(self, text: str) -> list[tuple[str, list[str]]]:
+        sections = parse_sections(text)
+        if len(text.strip()) <= self.chunk_size or not sections:
+            breadcrumb = sections[0].breadcrumb if sections else []
+            return [(text.strip(), breadcrumb)] if text.strip() else []
+
+        chunks: list[tuple[str, list[str]]] = []
+        current: list[str] = []
+        current_breadcrumb: Optional[list[str]] = None
+        current_size = 0
+
+        def flush():
+            nonlocal current, current_breadcrumb, current_size
+            if current:
+                chunks.append(("\n\n".join(current), current_breadcrumb))
+            current, current_breadcrumb, current_size = [], None, 0
+
+        for section in sections:
+            section_text = section.text
+            if len(section_text) > self.chunk_size:
+                flush()
+                for piece in self.fallback.split_text(section_text):
+                    chunks.append((piece, section.breadcrumb))
+                continue
+            if current_size + len(section_text) + 2 > self.chunk_size:
+                flush()
+            if current_breadcrumb is None:
+                current_breadcrumb = section.breadcrumb
+            current.append(section_text)
+            current_size += len(section_text) + 2
+        flush()
+        return chunks
+
+    def split_documents(self, documents: list[Document]) -> list[Document]:
+        chunks = []
+        for document in documents:
+            for text, breadcrumb in self.split_text(document.page_content):
+                chunks.append(
+                    Document(
+                        page_content=text,
+                        metadata={
+                            **document.metadata,
+                            "breadcrumb": " > ".join(breadcrumb),
+                        },
+                    )
+                )
+        return chunks
+
+
+def compare_chunkers(paths: list[str], dimensions: int = 1536) -> dict:
+    """Chunk count and estimated index size of each chunker over paths.
+
+    Index size counts float32 vectors of the given dimension plus the stored
+    chunk text.
+    """
+    from rag.loader import CHUNKERS, load_and_split
+
+    report = {}
+    for chunker in CHUNKERS:
+        chunks = [
+            chunk for path in paths for chunk in load_and_split(path, chunker)
+        ]
+        text_bytes = sum(len(c.page_content.encode()) for c in chunks)
+        report[chunker] = {
+            "chunks": len(chunks),
+            "index_bytes": len(chunks) * dimensions * 4 + text_bytes,
+        }
+
+    baseline, structured = report["recursive"], report["structure"]
+    for key in ("chunks", "index_bytes"):
+        ratio = structured[key] / max(baseline[key], 1)
+        report[f"{key}_reduction"] = round(1 - ratio, 4)
+    return report
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    from rag.ingest import discover_documents
+
+    source_dir = sys.argv[1] if len(sys.argv) > 1 else "docs"
+    report = compare_chunkers(discover_documents(source_dir))
+    print(json.dumps(report, indent=2))
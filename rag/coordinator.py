@@ -0,0 +1,83 @@
+import fcntl
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Optional
+
+from rag.ingest import PERSIST_DIRECTORY, ingest_documentation
+
+LOCK_FILENAME = ".ingest.lock"
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def ingest_lock(persist_directory: str):
+    """Inter-process lock so concurrent infrapilot runs don't both rebuild.
+
+    A process that finds the lock taken waits for the holder to finish; its
+    own ingestion is then an incremental no-op.
+    """
+    os.makedirs(persist_directory, exist_ok=True)
+    with open(os.path.join(persist_directory, LOCK_FILENAME), "w") as file:
+        fcntl.flock(file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(file, fcntl.LOCK_UN)
+
+
+class IngestionCoordinator:
+    """Builds or refreshes the documentation index once per process, on a
+    background thread, so startup never blocks on ingestion."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self.error: Optional[Exception] = None
+
+    def start(
+        self,
+        source_dir: str = "docs",
+        persist_directory: str = PERSIST_DIRECTORY,
+    ):
+        """Start ingestion unless it already started. Safe to call often."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._run,
+                args=(source_dir, persist_directory),
+                name="rag-ingest",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def _run(self, source_dir: str, persist_directory: str):
+        try:
+            with ingest_lock(persist_directory):
+                ingest_documentation(
+                    source_dir=source_dir,
+                    persist_directory=persist_directory,
+                )
+        except Exception as e:
+            logger.error(f"Documentation ingestion failed: {e}")
+            self.error = e
+        finally:
+            self._ready.set()
+
+    @property
+    def started(self) -> bool:
+        return self._thread is not None
+
+    def is_ready(self) -> bool:
+        return self._ready.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for ingestion to finish. Returns False on timeout."""
+        return self._ready.wait(timeout)
+
+
+coordinator = IngestionCoordinator()
@@ -0,0 +1,219 @@
+import os
+import pickle
+import zlib
+from collections import defaultdict
+from typing import Optional
+
+import numpy as np
+
+DEDUP_FILENAME = "dedup.pkl"
+SHINGLE_SIZE = 5
+NUM_PERMUTATIONS = 128
+# 16 bands of 8 rows: pairs above ~0.7 Jaccard almost always share a band.
+NUM_BANDS = 16
+# Smallest prime above 2**32, the range of crc32.
+MERSENNE_PRIME = (1 << 32) + 15
+
+_rng = np.random.default_rng(1)
+# a < 2**31 keeps a * hash + b within uint64.
+_A = _rng.integers(1, 1 << 31, NUM_PERMUTATIONS, dtype=np.uint64)
+_B = _rng.integers(0, 1 << 31, NUM_PERMUTATIONS, dtype=np.uint64)
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set[str]:
+    """Overlapping word n-grams of the lowercased, whitespace-normalized
+    text; texts shorter than size words are a single shingle."""
+    words = text.lower().split()
+    if len(words) <= size:
+        return {" ".join(words)}
+    return {
+        " ".join(words[i : i + size]) for i in range(len(words) - size + 1)
+    }
+
+
+def minhash(text: str) -> np.ndarray:
+    """MinHash signature of the shingles of a text."""
+    hashes = np.fromiter(
+        (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles(text)),
+        dtype=np.uint64,
+    )
+    permuted = (np.outer(hashes, _A) + _B) % MERSENNE_PRIME
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def similarity(first: np.ndarray, second: np.ndarray) -> float:
+    """Jaccard similarity estimated from two MinHash signatures."""
+    return float(np.mean(first == second))
+
+
+class DedupIndex:
+    """Clusters of near-duplicate chunks, found with MinHash LSH.
+
+    The first chunk of a cluster is its canonical chunk: the only one that
+    is embedded and stored in the vector store. Later chunks whose estimated
+    Jaccard similarity to it reaches threshold become members and map to it.
+    Clusters never span scopes (shards), so routed queries still reach the
+    canonical chunk. When a canonical chunk is removed, a surviving member
+    is promoted and must be embedded in its place.
+    """
+
+    def __init__(self, threshold: float = 0.9):
+        self.threshold = threshold
+        self.signatures: dict[str, np.ndarray] = {}
+        self.scopes: dict[str, str] = {}
+        self.canonical_of: dict[str, str] = {}
+        self.members: dict[str, list[str]] = {}
+        self.buckets: dict[tuple, set[str]] = defaultdict(set)
+
+    @classmethod
+    def load(cls, persist_directory: str) -> "DedupIndex":
+        path = os.path.join(persist_directory, DEDUP_FILENAME)
+        try:
+            with open(path, "rb") as file:
+                return pickle.load(file)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return cls()
+
+    def save(self, persist_directory: str):
+        os.makedirs(persist_directory, exist_ok=True)
+        path = os.path.join(persist_directory, DEDUP_FILENAME)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as file:
+            pickle.dump(self, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def __len__(self) -> int:
+        return len(self.canonical_of)
+
+    @property
+    def duplicates(self) -> int:
+        """Chunks that are not embedded because they duplicate another."""
+        return len(self.canonical_of) - len(self.members)
+
+    def _bands(self, scope: str, signature: np.ndarray) -> list[tuple]:
+        rows = NUM_PERMUTATIONS // NUM_BANDS
+        return [
+            (scope, band, signature[band * rows : (band + 1) * rows].tobytes())
+            for band in range(NUM_BANDS)
+        ]
+
+    def _make_canonical(self, chunk_id: str):
+        for band in self._bands(
+            self.scopes[chunk_id], self.signatures[chunk_id]
+        ):
+            self.buckets[band].add(chunk_id)
+
+    def add(self, chunk_id: str, text: str, scope: str = "") -> Optional[str]:
+        """Register a chunk. Returns the canonical chunk it duplicates, or
+        None if it is canonical itself and has to be embedded."""
+        if chunk_id in self.canonical_of:
+            self.remove([chunk_id])
+        signature = minhash(text)
+        self.signatures[chunk_id] = signature
+        self.scopes[chunk_id] = scope
+
+        candidates = set()
+        for band in self._bands(scope, signature):
+            candidates.update(self.buckets.get(band, ()))
+        best, best_similarity = None, self.threshold
+        for candidate in candidates:
+            score = similarity(signature, self.signatures[candidate])
+            if score >= best_similarity:
+                best, best_similarity = candidate, score
+
+        if best is not None:
+            self.canonical_of[chunk_id] = best
+            self.members[best].append(chunk_id)
+            return best
+        self.canonical_of[chunk_id] = chunk_id
+        self.members[chunk_id] = [chunk_id]
+        self._make_canonical(chunk_id)
+        return None
+
+    def remove(self, chunk_ids: list[str]) -> list[str]:
+        """Forget chunks. Returns the members promoted to canonical in place
+        of removed canonical chunks; they need to be embedded."""
+        removed = set(chunk_ids)
+        orphaned = []
+        for chunk_id in removed:
+            canonical = self.canonical_of.pop(chunk_id, None)
+            if canonical is None:
+                continue
+            if canonical == chunk_id:
+                for band in self._bands(
+                    self.scopes[chunk_id], self.signatures[chunk_id]
+                ):
+                    bucket = self.buckets.get(band)
+                    if bucket is not None:
+                        bucket.discard(chunk_id)
+                        if not bucket:
+                            del self.buckets[band]
+                orphaned.append(self.members.pop(chunk_id))
+            elif canonical in self.members:
+                self.members[canonical].remove(chunk_id)
+            self.signatures.pop(chunk_id, None)
+            self.scopes.pop(chunk_id, None)
+
+        promoted = []
+        for members in orphaned:
+            survivors = [key for key in members if key not in removed]
+            if not survivors:
+                continue
+            canonical = survivors[0]
+            promoted.append(canonical)
+            self.members[canonical] = survivors
+            for key in survivors:
+                self.canonical_of[key] = canonical
+            self._make_canonical(canonical)
+        return promoted
+
+    def canonical(self, chunk_id: str) -> str:
+        return self.canonical_of.get(chunk_id, chunk_id)
+
+    def cluster(self, chunk_id: str) -> list[str]:
+        """All chunks sharing the vector of a chunk, canonical first."""
+        return self.members.get(self.canonical(chunk_id), [chunk_id])
+
+
+def dedup_report(paths: list[str], threshold: float = 0.9) -> dict:
+    """Embedding work and vector index space saved by near-duplicate
+    elimination, per chunker. Clusters are scoped to shards as in ingestion;
+    index bytes count 1536-dimensional float32 vectors."""
+    from rag.loader import CHUNKERS, load_and_split
+    from rag.manifest import chunk_id
+    from rag.shards import shard_for
+
+    report = {"threshold": threshold}
+    for chunker in CHUNKERS:
+        index = DedupIndex(threshold)
+        embedded_chars = saved_chars = 0
+        for path in paths:
+            scope = shard_for(path)
+            for i, chunk in enumerate(load_and_split(path, chunker)):
+                text = chunk.page_content
+                if index.add(chunk_id(path, i), text, scope) is None:
+                    embedded_chars += len(text)
+                else:
+                    saved_chars += len(text)
+        report[chunker] = {
+            "chunks": len(index),
+            "embedded_chunks": len(index) - index.duplicates,
+            "duplicate_chunks": index.duplicates,
+            "embedding_chars_saved": saved_chars,
+            "embedding_work_reduction": round(
+                saved_chars / max(saved_chars + embedded_chars, 1), 4
+            ),
+            "vector_bytes_saved": index.duplicates * 1536 * 4,
+        }
+    return report
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    from rag.ingest import discover_documents
+
+    source_dir = sys.argv[1] if len(sys.argv) > 1 else "docs"
+    report = dedup_report(discover_documents(source_dir))
+    print(json.dumps(report, indent=2))
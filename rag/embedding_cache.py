@@ -0,0 +1,229 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from langchain.embeddings.base import Embeddings
+
+logger = logging.getLogger(__name__)
+
+# After an eviction the cache is trimmed to this share of its cap, so that
+# eviction does not run again on every insert.
+EVICT_TO_RATIO = 0.9
+
+
+def normalize_text(text: str) -> str:
+    """Whitespace-insensitive form of a text, used for cache keys."""
+    return " ".join(text.split())
+
+
+def cache_key(model: str, text: str) -> str:
+    normalized = normalize_text(text)
+    return hashlib.sha256(f"{model}\0{normalized}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """On-disk embedding cache in SQLite with LRU eviction and a size cap.
+
+    Sizes and last use times are kept apart from the vectors, so the LRU
+    scan never reads vector pages, and the total size is counted once on
+    open and then kept up to date.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, size INTEGER NOT NULL, "
+            "last_used REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS vectors ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS entries_last_used "
+            "ON entries (last_used)"
+        )
+        self._migrate()
+        self._conn.commit()
+        self.total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()[0]
+
+    def _migrate(self):
+        """Move entries of the single-table layout into entries/vectors."""
+        if not self._conn.execute(
+            "SELECT 1 FROM sqlite_master "
+            "WHERE type = 'table' AND name = 'embeddings'"
+        ).fetchone():
+            return
+        self._conn.execute(
+            "INSERT OR IGNORE INTO entries "
+            "SELECT key, size, last_used FROM embeddings"
+        )
+        self._conn.execute(
+            "INSERT OR IGNORE INTO vectors SELECT key, vector FROM embeddings"
+        )
+        self._conn.execute("DROP TABLE embeddings")
+
+    def _sizes(self, keys: list[str]) -> dict[str, int]:
+        sizes: dict[str, int] = {}
+        # SQLite limits the number of bound parameters per statement.
+        for i in range(0, len(keys), 500):
+            batch = keys[i : i + 500]
+            placeholders = ",".join("?" * len(batch))
+            sizes.update(
+                self._conn.execute(
+                    f"SELECT key, size FROM entries "
+                    f"WHERE key IN ({placeholders})",
+                    batch,
+                ).fetchall()
+            )
+        return sizes
+
+    def get_many(self, keys: list[str]) -> dict[str, list[float]]:
+        found: dict[str, list[float]] = {}
+        with self._lock:
+            for i in range(0, len(keys), 500):
+                batch = keys[i : i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM vectors "
+                    f"WHERE key IN ({placeholders})",
+                    batch,
+                ).fetchall()
+                for key, blob in rows:
+                    vector = array("f")
+                    vector.frombytes(blob)
+                    found[key] = vector.tolist()
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE entries SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+                self._conn.commit()
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items: dict[str, list[float]]):
+        now = time.time()
+        blobs = {
+            key: array("f", vector).tobytes() for key, vector in items.items()
+        }
+        with self._lock:
+            replaced = self._sizes(list(blobs))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO entries (key, size, last_used) "
+                "VALUES (?, ?, ?)",
+                [(key, len(blob), now) for key, blob in blobs.items()],
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO vectors (key, vector) VALUES (?, ?)",
+                list(blobs.items()),
+            )
+            self._conn.commit()
+            self.total_bytes += sum(len(blob) for blob in blobs.values())
+            self.total_bytes -= sum(replaced.values())
+            self._evict()
+
+    def _evict(self):
+        if self.total_bytes <= self.max_bytes:
+            return
+
+        target = self.total_bytes - int(self.max_bytes * EVICT_TO_RATIO)
+        freed = 0
+        stale = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM entries ORDER BY last_used"
+        ):
+            stale.append((key,))
+            freed += size
+            if freed >= target:
+                break
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", stale)
+        self._conn.executemany("DELETE FROM vectors WHERE key = ?", stale)
+        self._conn.commit()
+        self.total_bytes -= freed
+        logger.debug(f"Evicted {len(stale)} cached embeddings")
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings that look up the cache first and embed misses in batches.
+
+    Misses are deduplicated and sent to the underlying model in batches of
+    batch_size, with at most concurrency batches in flight.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        cache: EmbeddingCache,
+        model: Optional[str] = None,
+        batch_size: int = 512,
+        concurrency: int = 4,
+    ):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.model = model or getattr(
+            embeddings, "model", type(embeddings).__name__
+        )
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys = [cache_key(self.model, text) for text in texts]
+        vectors = self.cache.get_many(list(set(keys)))
+
+        missing: dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                missing.setdefault(key, text)
+
+        if missing:
+            missing_keys = list(missing)
+            batches = [
+                missing_keys[i : i + self.batch_size]
+                for i in range(0, len(missing_keys), self.batch_size)
+            ]
+
+            def embed_batch(batch_keys: list[str]) -> dict[str, list[float]]:
+                embedded = self.embeddings.embed_documents(
+                    [missing[key] for key in batch_keys]
+                )
+                result = dict(zip(batch_keys, embedded))
+                self.cache.put_many(result)
+                return result
+
+            if len(batches) == 1:
+                vectors.update(embed_batch(batches[0]))
+            else:
+                with ThreadPoolExecutor(
+                    max_workers=self.concurrency
+                ) as executor:
+                    for result in executor.map(embed_batch, batches):
+                        vectors.update(result)
+
+        return [vectors[key] for key in keys]
+
+    def embed_query(self, text: str) -> list[float]:
+        key = cache_key(self.model, text)
+        vector = self.cache.get_many([key]).get(key)
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+            self.cache.put_many({key: vector})
+        return vector
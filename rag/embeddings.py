@@ -0,0 +1,76 @@
+import threading
+
+from langchain.embeddings.base import Embeddings
+
+from config import config
+from rag.embedding_cache import CachedEmbeddings, EmbeddingCache
+
+# Vector sizes of the OpenAI embedding models.
+OPENAI_EMBEDDING_DIMENSIONS = {
+    "text-embedding-ada-002": 1536,
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+}
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Process-wide embedding cache, shared by ingestion and retrieval."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = EmbeddingCache(
+                config.infrapilot_CONFIG.RAG_EMBEDDING_CACHE_PATH,
+                max_bytes=config.infrapilot_CONFIG.RAG_EMBEDDING_CACHE_MB
+                << 20,
+            )
+    return _cache
+
+
+def embedding_signature() -> str:
+    """Identifies the configured embedding space. Vectors from different
+    signatures are not comparable, so a change requires re-indexing."""
+    provider = config.infrapilot_CONFIG.RAG_EMBEDDING_PROVIDER.lower()
+    if provider == "local":
+        dimensions = config.infrapilot_CONFIG.RAG_LOCAL_EMBEDDING_DIM
+        return f"local:hashing-{dimensions}"
+    return f"{provider}:{config.infrapilot_CONFIG.RAG_EMBEDDING_MODEL}"
+
+
+def embedding_dimensions() -> int:
+    """Vector size of the configured embedding model, without calling it;
+    0 if unknown."""
+    settings = config.infrapilot_CONFIG
+    if settings.RAG_EMBEDDING_PROVIDER.lower() == "local":
+        return settings.RAG_LOCAL_EMBEDDING_DIM
+    return OPENAI_EMBEDDING_DIMENSIONS.get(settings.RAG_EMBEDDING_MODEL, 0)
+
+
+def get_embeddings() -> Embeddings:
+    """Embedding model used for the documentation index and its queries."""
+    provider = config.infrapilot_CONFIG.RAG_EMBEDDING_PROVIDER.lower()
+
+    if provider == "local":
+        from rag.hashing_embeddings import HashingEmbeddings
+
+        # Computing a local vector is cheaper than a cache lookup.
+        return HashingEmbeddings(
+            dimensions=config.infrapilot_CONFIG.RAG_LOCAL_EMBEDDING_DIM
+        )
+
+    if provider == "openai":
+        from langchain.embeddings import OpenAIEmbeddings
+
+        config.require_openai_api_key()
+        model = config.infrapilot_CONFIG.RAG_EMBEDDING_MODEL
+        return CachedEmbeddings(
+            OpenAIEmbeddings(model=model),
+            get_embedding_cache(),
+            model=model,
+            batch_size=config.infrapilot_CONFIG.RAG_EMBEDDING_BATCH_SIZE,
+            concurrency=config.infrapilot_CONFIG.RAG_EMBEDDING_CONCURRENCY,
+        )
+
+    raise Exception(f"Embedding provider {provider} is not supported.")
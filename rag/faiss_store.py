@@ -0,0 +1,341 @@
+import json
+import logging
+import math
+import os
+import shutil
+import time
+from typing import Any, Optional
+
+import numpy as np
+from langchain.embeddings.base import Embeddings
+from langchain.schema import Document
+
+FAISS_DIRECTORY = "faiss"
+CURRENT_FILENAME = "CURRENT"
+INDEX_FILENAME = "index.faiss"
+VECTORS_FILENAME = "vectors.npy"
+IDS_FILENAME = "ids.npy"
+OFFSETS_FILENAME = "offsets.npy"
+CHUNKS_FILENAME = "chunks.bin"
+# Below this many vectors an exact flat scan beats IVF and needs no training.
+IVF_MIN_VECTORS = 20000
+QUANTIZATIONS = ("none", "float16", "int8")
+
+logger = logging.getLogger(__name__)
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def build_index(
+    vectors: np.ndarray, index_type: str = "auto", quantization: str = "none"
+):
+    """Inner-product index over L2-normalized vectors, i.e. cosine.
+
+    "auto" picks an exact flat index for small collections and an IVF index
+    with ~4*sqrt(n) lists for large ones. With quantization, vectors are
+    stored as float16 (2x smaller) or int8 (4x smaller) scalar codes.
+    """
+    import faiss
+
+    count, dimensions = vectors.shape
+    if index_type == "auto":
+        index_type = "ivf" if count >= IVF_MIN_VECTORS else "flat"
+    if quantization not in QUANTIZATIONS:
+        raise Exception(f"Quantization {quantization} is not supported.")
+    scalar_type = {
+        "float16": faiss.ScalarQuantizer.QT_fp16,
+        "int8": faiss.ScalarQuantizer.QT_8bit,
+    }.get(quantization)
+    metric = faiss.METRIC_INNER_PRODUCT
+
+    if index_type == "flat":
+        if scalar_type is None:
+            index = faiss.IndexFlatIP(dimensions)
+        else:
+            index = faiss.IndexScalarQuantizer(dimensions, scalar_type, metric)
+    elif index_type == "ivf":
+        nlist = max(1, min(int(4 * math.sqrt(count)), count // 39))
+        quantizer = faiss.IndexFlatIP(dimensions)
+        if scalar_type is None:
+            index = faiss.IndexIVFFlat(quantizer, dimensions, nlist, metric)
+        else:
+            index = faiss.IndexIVFScalarQuantizer(
+                quantizer, dimensions, nlist, scalar_type, metric
+            )
+    else:
+        raise Exception(f"FAISS index type {index_type} is not supported.")
+    index.train(vectors)
+    index.add(vectors)
+    return index
+
+
+class FaissCollection:
+    """One FAISS collection on disk, with a memory-mapped chunk store.
+
+    Each persisted version lives in its own directory holding the FAISS
+    index, fixed-width chunk ids,
+    and the chunk texts and metadata as JSON records addressed by an offset
+    array. Opening is a handful of mmaps, so cold starts are cheap and
+    concurrent processes share pages. A CURRENT file names the live version
+    and is swapped atomically on persist.
+
+    With a quantized index, rerank > 0 fetches rerank * k candidates and
+    re-scores them against full-precision vectors stored beside the index,
+    of which only the candidate rows are paged in. Without re-ranking no
+    float32 copy is kept; rebuilds decode the kept rows from the index.
+    dimensions is the size of the embeddings, for persisting a collection
+    that has none yet.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        embedding_function: Embeddings,
+        index_type: str = "auto",
+        nprobe: int = 8,
+        quantization: str = "none",
+        rerank: int = 0,
+        dimensions: int = 0,
+    ):
+        self.directory = directory
+        self.embedding_function = embedding_function
+        self.index_type = index_type
+        self.nprobe = nprobe
+        self.quantization = quantization
+        self.rerank = rerank
+        self.dimensions = dimensions
+        self._loaded = False
+        self._version: Optional[str] = None
+        self.index = None
+        self.ids: Optional[np.ndarray] = None
+        self.vectors: Optional[np.ndarray] = None
+        self.offsets: Optional[np.ndarray] = None
+        self.chunks: Optional[np.ndarray] = None
+        self.pending_ids: list[str] = []
+        self.pending_records: list[bytes] = []
+        self.pending_vectors: list[list[float]] = []
+        self.deleted: set[str] = set()
+
+    def _version_path(self, *names: str) -> str:
+        return os.path.join(self.directory, self._version, *names)
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(os.path.join(self.directory, CURRENT_FILENAME)) as file:
+                self._version = file.read().strip()
+        except FileNotFoundError:
+            return
+
+        self._read_index()
+        self.ids = np.load(self._version_path(IDS_FILENAME), mmap_mode="r")
+        self.vectors = None
+        if os.path.exists(self._version_path(VECTORS_FILENAME)):
+            self.vectors = np.load(
+                self._version_path(VECTORS_FILENAME), mmap_mode="r"
+            )
+        self.offsets = np.load(
+            self._version_path(OFFSETS_FILENAME), mmap_mode="r"
+        )
+        if os.path.getsize(self._version_path(CHUNKS_FILENAME)):
+            self.chunks = np.memmap(
+                self._version_path(CHUNKS_FILENAME), dtype=np.uint8, mode="r"
+            )
+
+    def _read_index(self):
+        import faiss
+
+        path = self._version_path(INDEX_FILENAME)
+        # MMAP_IFC maps the codes of flat, scalar-quantized and IVF indexes
+        # alike, so they are paged in on demand and shared by processes.
+        flags = faiss.IO_FLAG_MMAP_IFC
+        with open(path, "rb") as file:
+            if file.read(2) == b"Iw":
+                # IVF indexes (fourcc "Iw..") also take read-only lists.
+                flags |= faiss.IO_FLAG_READ_ONLY
+        self.index = faiss.read_index(path, flags)
+        if hasattr(self.index, "nprobe"):
+            self.index.nprobe = self.nprobe
+
+    def _write_index(self, matrix: np.ndarray, path: str):
+        import faiss
+
+        if len(matrix):
+            index = build_index(matrix, self.index_type, self.quantization)
+        else:
+            index = faiss.IndexFlatIP(matrix.shape[1])
+        faiss.write_index(index, path)
+
+    def _keeps_vectors(self) -> bool:
+        """Whether float32 vectors are stored besides the index. Only
+        re-ranking reads them; otherwise rebuilds decode the index."""
+        return self.quantization != "none" and self.rerank > 0
+
+    def _stored_vectors(self, rows: list[int]) -> np.ndarray:
+        if self.vectors is not None:
+            return np.asarray(self.vectors[rows])
+        import faiss
+
+        if hasattr(self.index, "nprobe"):
+            faiss.extract_index_ivf(self.index).make_direct_map()
+        return self.index.reconstruct_batch(np.asarray(rows, dtype=np.int64))
+
+    def __len__(self) -> int:
+        self._load()
+        return 0 if self.ids is None else len(self.ids)
+
+    def add_documents(self, documents: list[Document], ids: list[str]):
+        vectors = self.embedding_function.embed_documents(
+            [document.page_content for document in documents]
+        )
+        for document, key, vector in zip(documents, ids, vectors):
+            self.deleted.discard(key)
+            self.pending_ids.append(key)
+            self.pending_vectors.append(vector)
+            self.pending_records.append(
+                json.dumps(
+                    {
+                        "text": document.page_content,
+                        "metadata": document.metadata,
+                    }
+                ).encode("utf-8")
+            )
+
+    def delete(self, ids: list[str]):
+        self.deleted.update(ids)
+
+    def _record(self, row: int) -> bytes:
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        return bytes(self.chunks[start:end])
+
+    def persist(self):
+        if not self.pending_ids and not self.deleted:
+            return
+        self._load()
+
+        ids: list[str] = []
+        records: list[bytes] = []
+        vectors = []
+        if self.ids is not None:
+            # Re-added ids replace their stored rows.
+            dropped = self.deleted | set(self.pending_ids)
+            keep = [
+                row
+                for row, key in enumerate(self.ids)
+                if key.decode("ascii") not in dropped
+            ]
+            if keep:
+                vectors.append(self._stored_vectors(keep))
+            ids.extend(self.ids[row].decode("ascii") for row in keep)
+            records.extend(self._record(row) for row in keep)
+        if len(self.pending_vectors):
+            vectors.append(
+                normalize(np.asarray(self.pending_vectors, dtype=np.float32))
+            )
+        ids.extend(self.pending_ids)
+        records.extend(self.pending_records)
+
+        version = f"v{time.time_ns()}"
+        version_directory = os.path.join(self.directory, version)
+        os.makedirs(version_directory, exist_ok=True)
+
+        def path(name: str) -> str:
+            return os.path.join(version_directory, name)
+
+        if ids:
+            matrix = np.ascontiguousarray(
+                vectors[0] if len(vectors) == 1 else np.concatenate(vectors)
+            )
+        else:
+            # Nothing to search; the shape only has to be well-formed.
+            dimensions = (
+                self.index.d if self.index is not None else self.dimensions
+            )
+            matrix = np.zeros((0, dimensions), dtype=np.float32)
+        self._write_index(matrix, path(INDEX_FILENAME))
+        if self._keeps_vectors():
+            np.save(path(VECTORS_FILENAME), matrix)
+        np.save(path(IDS_FILENAME), np.array(ids, dtype="S40"))
+        offsets = np.zeros(len(records) + 1, dtype=np.int64)
+        np.cumsum([len(record) for record in records], out=offsets[1:])
+        np.save(path(OFFSETS_FILENAME), offsets)
+        with open(path(CHUNKS_FILENAME), "wb") as file:
+            for record in records:
+                file.write(record)
+
+        current = os.path.join(self.directory, CURRENT_FILENAME)
+        with open(f"{current}.tmp", "w") as file:
+            file.write(version)
+        os.replace(f"{current}.tmp", current)
+
+        previous = self._version
+        self._loaded = False
+        self.pending_ids = []
+        self.pending_records = []
+        self.pending_vectors = []
+        self.deleted = set()
+        self._load()
+        if previous and previous != version:
+            # Processes that still map the old files keep reading them.
+            shutil.rmtree(
+                os.path.join(self.directory, previous), ignore_errors=True
+            )
+        logger.info(f"Persisted {len(ids)} vectors to {version_directory}")
+
+    def _search_rows(
+        self, queries: np.ndarray, k: int
+    ) -> list[tuple[np.ndarray, np.ndarray]]:
+        """Inner products and rows of the top-k vectors of each query."""
+        fetch_k = k
+        if self.rerank and self.vectors is not None:
+            fetch_k = k * self.rerank
+        scores, rows = self.index.search(queries, min(fetch_k, len(self)))
+        if fetch_k == k:
+            return list(zip(scores, rows))
+
+        results = []
+        for query, query_rows in zip(queries, rows):
+            # Sorted rows keep the reads from vectors.npy sequential.
+            query_rows = np.sort(query_rows[query_rows >= 0])
+            query_scores = np.asarray(self.vectors[query_rows]) @ query
+            top = np.argsort(-query_scores)[:k]
+            results.append((query_scores[top], query_rows[top]))
+        return results
+
+    def similarity_search_by_vectors_with_relevance_scores(
+        self, embeddings: list[list[float]], k: int = 4
+    ) -> list[list[tuple[Document, float]]]:
+        """Top-k documents with cosine distances (lower is closer) for a
+        batch of query embeddings."""
+        self._load()
+        if not len(self):
+            return [[] for _ in embeddings]
+        queries = normalize(np.asarray(embeddings, dtype=np.float32))
+
+        batch = []
+        for scores, rows in self._search_rows(queries, k):
+            results = []
+            for score, row in zip(scores, rows):
+                if row < 0:
+                    continue
+                record: dict[str, Any] = json.loads(self._record(int(row)))
+                document = Document(
+                    page_content=record["text"], metadata=record["metadata"]
+                )
+                results.append((document, 1.0 - float(score)))
+            batch.append(results)
+        return batch
+
+    def similarity_search_by_vector_with_relevance_scores(
+        self, embedding: list[float], k: int = 4
+    ) -> list[tuple[Document, float]]:
+        """Top-k documents with cosine distances (lower is closer)."""
+        return self.similarity_search_by_vectors_with_relevance_scores(
+            [embedding], k
+        )[0]
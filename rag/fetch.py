@@ -0,0 +1,163 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from langchain.schema import Document
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "infrapilot-docs-fetcher"
+HTML_TYPES = ("text/html", "application/xhtml+xml")
+
+
+class FetchResult:
+    """Outcome of fetching one URL: "fetched" (200), "not_modified" (304,
+    body read from the cache) or "failed"."""
+
+    def __init__(
+        self,
+        url: str,
+        status: str,
+        body: Optional[bytes] = None,
+        content_type: str = "",
+        sha256: str = "",
+        error: str = "",
+    ):
+        self.url = url
+        self.status = status
+        self.body = body
+        self.content_type = content_type
+        self.sha256 = sha256
+        self.error = error
+
+
+class RemoteDocFetcher:
+    """Fetches documentation pages concurrently with HTTP conditional
+    requests.
+
+    Response bodies and their ETag / Last-Modified validators are kept in
+    cache_dir, so a page that did not change comes back as a bodyless 304.
+    All workers share one keep-alive connection pool.
+    """
+
+    def __init__(self, cache_dir: str, workers: int = 8, timeout: float = 30):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.cache_dir = cache_dir
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        adapter = HTTPAdapter(
+            pool_connections=self.workers, pool_maxsize=self.workers
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _cache_path(self, url: str, extension: str) -> str:
+        name = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{name}.{extension}")
+
+    def _cached(self, url: str) -> Optional[dict]:
+        try:
+            with open(self._cache_path(url, "json"), encoding="utf-8") as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _store(self, url: str, body: bytes, entry: dict):
+        for extension, data, mode in (
+            ("body", body, "wb"),
+            ("json", json.dumps(entry), "w"),
+        ):
+            path = self._cache_path(url, extension)
+            with open(f"{path}.tmp", mode) as file:
+                file.write(data)
+            os.replace(f"{path}.tmp", path)
+
+    def fetch(self, url: str) -> FetchResult:
+        cached = self._cached(url)
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        try:
+            response = self.session.get(
+                url, headers=headers, timeout=self.timeout
+            )
+            if response.status_code == 304 and cached:
+                with open(self._cache_path(url, "body"), "rb") as file:
+                    body = file.read()
+                return FetchResult(
+                    url,
+                    "not_modified",
+                    body,
+                    cached.get("content_type", ""),
+                    cached.get("sha256", ""),
+                )
+            response.raise_for_status()
+        except Exception as e:
+            return FetchResult(url, "failed", error=str(e))
+
+        body = response.content
+        entry = {
+            "url": url,
+            "etag": response.headers.get("ETag", ""),
+            "last_modified": response.headers.get("Last-Modified", ""),
+            "content_type": response.headers.get("Content-Type", ""),
+            "sha256": hashlib.sha256(body).hexdigest(),
+        }
+        self._store(url, body, entry)
+        return FetchResult(
+            url, "fetched", body, entry["content_type"], entry["sha256"]
+        )
+
+    def fetch_all(self, urls: list[str]) -> list[FetchResult]:
+        """Fetch urls on a bounded thread pool, in input order."""
+        urls = [url.strip() for url in urls if url.strip()]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = list(executor.map(self.fetch, urls))
+
+        counts = {"fetched": 0, "not_modified": 0, "failed": 0}
+        for result in results:
+            counts[result.status] += 1
+            if result.status == "failed":
+                logger.error(f"Error fetching {result.url}: {result.error}")
+        logger.info(
+            f"Fetched {len(urls)} remote docs in "
+            f"{time.perf_counter() - start:.2f}s: {counts['fetched']} "
+            f"downloaded, {counts['not_modified']} not modified, "
+            f"{counts['failed']} failed"
+        )
+        return results
+
+
+def parse_remote_doc(result: FetchResult) -> Document:
+    """Document with the text of a fetched page; HTML is partitioned with
+    unstructured, as UnstructuredURLLoader does in "single" mode."""
+    text = result.body.decode("utf-8", errors="replace")
+    if result.content_type.split(";")[0].strip() in HTML_TYPES:
+        from unstructured.partition.html import partition_html
+
+        elements = partition_html(text=text)
+        text = "\n\n".join(str(element) for element in elements)
+    return Document(page_content=text, metadata={"source": result.url})
+
+
+if __name__ == "__main__":
+    import sys
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    fetcher = RemoteDocFetcher(".cache/remote_docs")
+    for result in fetcher.fetch_all(sys.argv[1:]):
+        print(result.status, result.url)
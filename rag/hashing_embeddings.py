@@ -0,0 +1,69 @@
+import zlib
+
+import numpy as np
+from langchain.embeddings.base import Embeddings
+
+from utils.text import SUBTOKEN_PATTERN, TOKEN_PATTERN
+
+
+def extract_features(text: str) -> list[str]:
+    """Word, sub-word, word-bigram and character-trigram features.
+
+    Compound tokens such as ``describe-instances`` or ``--stack-name`` are
+    kept whole and also split into their parts, so both exact CLI tokens and
+    their pieces contribute.
+    """
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    features = []
+    previous = None
+    for token in tokens:
+        features.append(token)
+        parts = SUBTOKEN_PATTERN.findall(token)
+        if len(parts) > 1:
+            features.extend(parts)
+        padded = f"<{token}>"
+        features.extend(
+            "#" + padded[i : i + 3] for i in range(len(padded) - 2)
+        )
+        if previous is not None:
+            features.append(f"{previous} {token}")
+        previous = token
+    return features
+
+
+class HashingEmbeddings(Embeddings):
+    """Local CPU embeddings from hashed n-gram features (the hashing trick).
+
+    Needs no network or model download, so the docs corpus can be indexed
+    offline and tests and benchmarks run without OpenAI. Vectors are
+    log-scaled signed feature counts, L2-normalized.
+    """
+
+    def __init__(self, dimensions: int = 1024):
+        self.dimensions = dimensions
+        self.model = f"hashing-{dimensions}"
+
+    def _embed(self, text: str) -> np.ndarray:
+        hashes = np.fromiter(
+            (zlib.crc32(f.encode("utf-8")) for f in extract_features(text)),
+            dtype=np.int64,
+        )
+        if hashes.size == 0:
+            return np.zeros(self.dimensions, dtype=np.float32)
+
+        indices = hashes % self.dimensions
+        signs = np.where((hashes // self.dimensions) & 1, -1.0, 1.0)
+        counts = np.bincount(
+            indices, weights=signs, minlength=self.dimensions
+        )
+        vector = np.sign(counts) * np.log1p(np.abs(counts))
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector.astype(np.float32)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self._embed(text).tolist() for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._embed(text).tolist()
@@ -1,83 +1,332 @@
-from langchain.document_loaders import (
-    UnstructuredURLLoader,
-    DirectoryLoader,
-    TextLoader,
-    UnstructuredMarkdownLoader,
-    UnstructuredRSTLoader,
-)
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.embeddings import OpenAIEmbeddings
-from langchain.vectorstores import Chroma
+import logging
+import os
+import time
+from collections import defaultdict
+from typing import Iterator, Optional
+
+from langchain.schema import Document
 from config import config
+from rag.bm25 import BM25_FILENAME, BM25Index
+from rag.dedup import DEDUP_FILENAME, DedupIndex
+from rag.embeddings import embedding_signature, get_embeddings
+from rag.fetch import RemoteDocFetcher, parse_remote_doc
+from rag.loader import chunker_settings, iter_chunks, split_documents
+from rag.manifest import IngestManifest, chunk_id, sha256_file
+from rag.shards import (
+    DEFAULT_SHARD,
+    ShardRouter,
+    open_vectorstore,
+    save_shards,
+    shard_for,
+)
 
-def ingest_documentation(source_dir: str = "docs"):
-    config.init()
-    documents = []
+PERSIST_DIRECTORY = ".chromadb"
+DOC_EXTENSIONS = (".md", ".rst", ".txt")
+# Chunks are added in batches: large enough for the embedder to batch and
+# parallelize its calls, below Chroma's upsert limit (~5k).
+ADD_BATCH_SIZE = 4000
 
-    # 1. Fetch remote docs if configured
-    if config.infrapilot_CONFIG.REMOTE_DOC_URLS:
-        url_loader = UnstructuredURLLoader(urls=config.infrapilot_CONFIG.REMOTE_DOC_URLS)
-        web_docs = url_loader.load()
-        documents.extend(web_docs)
-        print(f"Fetched {len(web_docs)} docs from remote URLs")
-    # ── Markdown (.md)
-    md_loader = DirectoryLoader(
-        source_dir,
-        glob="**/*.md",
-        loader_cls=TextLoader
-    )
-    md_docs = md_loader.load()
+logger = logging.getLogger(__name__)
 
-    # ── reStructuredText (.rst)
-    rst_loader = DirectoryLoader(
-        source_dir,
-        glob="**/*.rst",
-        loader_cls=TextLoader
-    )
-    rst_docs = rst_loader.load()
 
-    # ── Plain text (.txt)
-    txt_loader = DirectoryLoader(
-        source_dir,
-        glob="**/*.txt",
-        loader_cls=TextLoader
+def index_settings() -> dict:
+    """Settings that invalidate every stored chunk when they change."""
+    return {
+        "embedding": embedding_signature(),
+        **chunker_settings(config.infrapilot_CONFIG.RAG_CHUNKER.lower()),
+        "lexical_index": "bm25",
+        "sharded": config.infrapilot_CONFIG.RAG_SHARDED_INDEX,
+        "vector_store": config.infrapilot_CONFIG.RAG_VECTOR_STORE.lower(),
+        "faiss_index": config.infrapilot_CONFIG.RAG_FAISS_INDEX.lower(),
+        "quantization": (
+            config.infrapilot_CONFIG.RAG_VECTOR_QUANTIZATION.lower()
+        ),
+        "dedup_threshold": config.infrapilot_CONFIG.RAG_DEDUP_THRESHOLD,
+    }
+
+
+def discover_documents(source_dir: str) -> list[str]:
+    """List local documentation files, in a stable order."""
+    paths = []
+    for root, dirs, files in os.walk(source_dir):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith(DOC_EXTENSIONS):
+                paths.append(os.path.join(root, name))
+    return paths
+
+
+class ChunkWriter:
+    """Buffers streamed chunks and adds them to the vector store in batches.
+    The lexical index is updated as chunks arrive. With a dedup index, near
+    duplicates of an indexed chunk are not embedded."""
+
+    def __init__(
+        self,
+        vectorstore,
+        bm25: BM25Index,
+        dedup: Optional[DedupIndex] = None,
+        batch_size: int = ADD_BATCH_SIZE,
+    ):
+        self.vectorstore = vectorstore
+        self.bm25 = bm25
+        self.dedup = dedup
+        self.batch_size = batch_size
+        self.chunks: list[Document] = []
+        self.ids: list[str] = []
+        self.count = 0
+        self.duplicates = 0
+        self.duplicate_chars = 0
+        # Time spent embedding chunks and adding them to the vector store.
+        self.seconds = 0.0
+
+    def add(self, chunks: list[Document], ids: list[str]):
+        for chunk, key in zip(chunks, ids):
+            self.bm25.add(key, chunk.page_content, chunk.metadata)
+            if self.dedup is not None and self.dedup.add(
+                key, chunk.page_content, chunk.metadata.get("shard", "")
+            ):
+                self.duplicates += 1
+                self.duplicate_chars += len(chunk.page_content)
+                continue
+            self.embed(chunk, key)
+
+    def embed(self, chunk: Document, key: str):
+        self.chunks.append(chunk)
+        self.ids.append(key)
+        if len(self.chunks) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.chunks:
+            start = time.perf_counter()
+            self.vectorstore.add_documents(self.chunks, ids=self.ids)
+            self.seconds += time.perf_counter() - start
+            self.count += len(self.chunks)
+        self.chunks = []
+        self.ids = []
+
+
+def _timed(items: Iterator, timings: dict, key: str) -> Iterator:
+    """Yield from items, adding the time spent producing them to
+    timings[key]."""
+    iterator = iter(items)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            timings[key] += time.perf_counter() - start
+        yield item
+
+
+def ingest_documentation(
+    source_dir: str = "docs", persist_directory: str = PERSIST_DIRECTORY
+) -> dict:
+    """Bring the vector store in sync with the documentation sources.
+
+    Only added or changed sources are split and embedded; chunks of changed
+    or deleted sources are evicted. A warm restart without doc changes only
+    stats the files. Expects config.init() to have been called.
+
+    Returns counts and per-stage seconds of the run. Splitting overlaps
+    embedding, so split_s is only the time spent waiting for chunks.
+    """
+    start = time.perf_counter()
+    stats = {
+        "changed_sources": 0,
+        "deleted_sources": 0,
+        "chunks": 0,
+        "embedded_chunks": 0,
+        "scan_s": 0.0,
+        "split_s": 0.0,
+        "embed_s": 0.0,
+        "persist_s": 0.0,
+        "total_s": 0.0,
+    }
+    manifest = IngestManifest.load(persist_directory, index_settings())
+    sharded = config.infrapilot_CONFIG.RAG_SHARDED_INDEX
+
+    # Chunk ids to evict, by shard.
+    stale: dict[str, list[str]] = defaultdict(list)
+
+    def evict(source: str):
+        shard = manifest.get(source).get("shard", DEFAULT_SHARD)
+        stale[shard].extend(manifest.remove(source))
+
+    dedup_threshold = config.infrapilot_CONFIG.RAG_DEDUP_THRESHOLD
+    index_files = [BM25_FILENAME]
+    if dedup_threshold:
+        index_files.append(DEDUP_FILENAME)
+    index_missing = not all(
+        os.path.exists(os.path.join(persist_directory, name))
+        for name in index_files
     )
-    txt_docs = txt_loader.load()
+    if manifest.is_outdated() or (manifest.sources and index_missing):
+        logger.info("Ingestion settings changed—rebuilding the index.")
+        for source in list(manifest.sources):
+            evict(source)
+
+    seen: set[str] = set()
+    changed: dict[str, dict] = {}
+    remote_docs: list[Document] = []
+    changed_paths: list[str] = []
+
+    # 1. Fetch remote docs if configured, revalidating cached pages
+    if config.infrapilot_CONFIG.REMOTE_DOC_URLS:
+        fetcher = RemoteDocFetcher(
+            config.infrapilot_CONFIG.REMOTE_DOC_CACHE_PATH,
+            workers=config.infrapilot_CONFIG.REMOTE_DOC_WORKERS,
+            timeout=config.infrapilot_CONFIG.REMOTE_DOC_TIMEOUT,
+        )
+        for result in fetcher.fetch_all(
+            config.infrapilot_CONFIG.REMOTE_DOC_URLS
+        ):
+            source = result.url
+            seen.add(source)
+            entry = manifest.get(source)
+            # Keep the indexed copy of pages that are unreachable for now.
+            if result.status == "failed":
+                continue
+            if entry and entry.get("sha256") == result.sha256:
+                continue
+            changed[source] = {"sha256": result.sha256}
+            remote_docs.append(parse_remote_doc(result))
 
-    count_local = len(md_docs) + len(rst_docs) + len(txt_docs)
-    print(
-        f"Loaded {count_local} local docs from '{source_dir}' "
-        f"({len(md_docs)} md, {len(rst_docs)} rst, {len(txt_docs)} txt)"
+    # 2. Local docs (.md, .rst, .txt): stat first, hash only when touched
+    local_paths = discover_documents(source_dir)
+    for path in local_paths:
+        seen.add(path)
+        stat = os.stat(path)
+        if manifest.is_unchanged(path, stat):
+            continue
+        entry = {
+            "sha256": sha256_file(path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+        previous = manifest.get(path)
+        if previous and previous.get("sha256") == entry["sha256"]:
+            manifest.set(path, {**previous, **entry})
+            continue
+        changed[path] = entry
+        changed_paths.append(path)
+
+    deleted = [source for source in manifest.sources if source not in seen]
+    logger.info(
+        f"Scanned {len(local_paths)} local docs in '{source_dir}': "
+        f"{len(changed)} added or changed, {len(deleted)} deleted"
     )
 
-    documents.extend(md_docs)
-    documents.extend(rst_docs)
-    documents.extend(txt_docs)
+    stats["changed_sources"] = len(changed)
+    stats["deleted_sources"] = len(deleted)
+    stats["scan_s"] = time.perf_counter() - start
 
     # 2a️⃣ Short-circuit if nothing to index
-    if not documents:
-        print("⚠️  No documentation found—skipping ingestion.")
-        return
-
-    # 3️⃣ Split into chunks
-    splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-    docs_chunks = splitter.split_documents(documents)
-
-    # 3a️⃣ Also bail on empty chunks
-    if not docs_chunks:
-        print("⚠️  No document chunks—nothing to index.")
-        return
-
-    # 4️⃣ Embed & persist
-    embeddings = OpenAIEmbeddings()
-    vectorstore = Chroma.from_documents(
-        docs_chunks,
-        embeddings,
-        persist_directory=".chromadb"
+    if not seen:
+        logger.warning("⚠️  No documentation found—skipping ingestion.")
+        return stats
+
+    if not changed and not deleted and not stale:
+        manifest.save()
+        stats["chunks"] = manifest.chunk_count()
+        stats["total_s"] = time.perf_counter() - start
+        logger.info(
+            f"Documentation index up to date "
+            f"({manifest.chunk_count()} chunks) in "
+            f"{stats['total_s']:.2f}s"
+        )
+        return stats
+
+    for source in deleted:
+        evict(source)
+    for source in changed:
+        if manifest.get(source):
+            evict(source)
+    stale_ids = [key for ids in stale.values() for key in ids]
+
+    # 3️⃣ Evict stale chunks
+    vectorstore = open_vectorstore(
+        persist_directory, get_embeddings(), router=ShardRouter({})
     )
+    bm25 = BM25Index.load(persist_directory)
+    dedup = None
+    if dedup_threshold:
+        dedup = DedupIndex.load(persist_directory)
+        dedup.threshold = dedup_threshold
+    writer = ChunkWriter(vectorstore, bm25, dedup)
+    if stale_ids:
+        if dedup is not None:
+            # Near duplicates never had vectors of their own.
+            stale = {
+                shard: [key for key in ids if dedup.canonical(key) == key]
+                for shard, ids in stale.items()
+            }
+        vectorstore.delete(stale)
+        bm25.remove(stale_ids)
+        # Duplicates of evicted chunks take over their vectors.
+        for key in dedup.remove(stale_ids) if dedup else []:
+            chunk = bm25.get(key)
+            writer.embed(
+                Document(
+                    page_content=chunk["text"], metadata=chunk["metadata"]
+                ),
+                key,
+            )
+
+    # 4️⃣ Split in parallel and stream chunks to the embedder
+    chunker = config.infrapilot_CONFIG.RAG_CHUNKER.lower()
+
+    def split_sources() -> Iterator[tuple[str, list[Document]]]:
+        for doc in remote_docs:
+            source = doc.metadata.get("source", "")
+            yield source, split_documents([doc], chunker)
+        yield from iter_chunks(
+            changed_paths,
+            workers=config.infrapilot_CONFIG.RAG_INGEST_WORKERS,
+            chunker=chunker,
+        )
+
+    for source, chunks in _timed(split_sources(), stats, "split_s"):
+        shard = shard_for(source) if sharded else DEFAULT_SHARD
+        ids = []
+        for index, chunk in enumerate(chunks):
+            chunk.metadata["chunk_index"] = index
+            chunk.metadata["shard"] = shard
+            ids.append(chunk_id(source, index))
+        manifest.set(
+            source, {**changed[source], "shard": shard, "chunk_ids": ids}
+        )
+        writer.add(chunks, ids)
+    writer.flush()
+    persist_start = time.perf_counter()
     vectorstore.persist()
-    print(f"Ingested {len(docs_chunks)} chunks into .chromadb")
+    bm25.save(persist_directory)
+    if dedup is not None:
+        dedup.save(persist_directory)
+    save_shards(persist_directory, manifest.sources)
+    manifest.save()
+    stats["persist_s"] = time.perf_counter() - persist_start
+    stats["embed_s"] = writer.seconds
+    stats["chunks"] = manifest.chunk_count()
+    stats["embedded_chunks"] = writer.count
+    stats["total_s"] = time.perf_counter() - start
+    logger.info(
+        f"Ingested {writer.count} chunks into {persist_directory} "
+        f"(evicted {len(stale_ids)} stale) "
+        f"in {stats['total_s']:.2f}s"
+    )
+    if writer.duplicates:
+        logger.info(
+            f"Skipped embedding {writer.duplicates} near-duplicate chunks "
+            f"({writer.duplicate_chars} characters)"
+        )
+    return stats
 
 
 if __name__ == "__main__":
-    ingest_documentation()
\ No newline at end of file
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    config.init()
+    ingest_documentation()
@@ -0,0 +1,119 @@
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import partial
+from typing import Iterator, Optional
+
+from langchain.schema import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from rag.chunker import StructureAwareSplitter
+
+CHUNKERS = ("structure", "recursive")
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+# Structure-aware chunks hold a whole small doc or a few sections.
+STRUCTURED_CHUNK_SIZE = 4000
+STRUCTURED_CHUNK_OVERLAP = 200
+# Below this many files a process pool costs more than it saves.
+MIN_PARALLEL_FILES = 64
+# Files in flight per worker; bounds memory when the consumer is slower.
+QUEUE_DEPTH = 8
+PROGRESS_EVERY = 500
+
+logger = logging.getLogger(__name__)
+
+
+def chunker_settings(chunker: str) -> dict:
+    if chunker == "structure":
+        return {
+            "splitter": "structure",
+            "chunk_size": STRUCTURED_CHUNK_SIZE,
+            "chunk_overlap": STRUCTURED_CHUNK_OVERLAP,
+        }
+    if chunker == "recursive":
+        return {
+            "splitter": "recursive_character",
+            "chunk_size": CHUNK_SIZE,
+            "chunk_overlap": CHUNK_OVERLAP,
+        }
+    raise Exception(f"Chunker {chunker} is not supported.")
+
+
+def split_documents(
+    documents: list[Document], chunker: str = "structure"
+) -> list[Document]:
+    if chunker == "structure":
+        splitter = StructureAwareSplitter(
+            chunk_size=STRUCTURED_CHUNK_SIZE,
+            chunk_overlap=STRUCTURED_CHUNK_OVERLAP,
+        )
+    else:
+        splitter = RecursiveCharacterTextSplitter(
+            chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP
+        )
+    return splitter.split_documents(documents)
+
+
+def load_and_split(path: str, chunker: str = "structure") -> list[Document]:
+    """Load one documentation file and split it into chunks."""
+    with open(path, "r", encoding="utf-8", errors="replace") as file:
+        text = file.read()
+    document = Document(page_content=text, metadata={"source": path})
+    return split_documents([document], chunker)
+
+
+def _report(done: int, total: int, start: float):
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    logger.info(f"Split {done}/{total} files ({done / elapsed:.0f} files/s)")
+
+
+def iter_chunks(
+    paths: list[str],
+    workers: Optional[int] = None,
+    chunker: str = "structure",
+) -> Iterator[tuple[str, list[Document]]]:
+    """Yield (path, chunks) for every file, as soon as it is split.
+
+    Files are sharded across a process pool with a bounded number in
+    flight, so the full corpus is never held in memory at once. Results may
+    arrive out of order.
+    """
+    start = time.perf_counter()
+    total = len(paths)
+    workers = workers or os.cpu_count() or 1
+    split_file = partial(load_and_split, chunker=chunker)
+
+    if workers == 1 or total < MIN_PARALLEL_FILES:
+        for done, path in enumerate(paths, start=1):
+            yield path, split_file(path)
+            if done % PROGRESS_EVERY == 0:
+                _report(done, total, start)
+        if total:
+            _report(total, total, start)
+        return
+
+    pending_paths = iter(paths)
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = {}
+
+        def submit(count: int):
+            for path in pending_paths:
+                in_flight[executor.submit(split_file, path)] = path
+                count -= 1
+                if count == 0:
+                    break
+
+        submit(workers * QUEUE_DEPTH)
+        while in_flight:
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                path = in_flight.pop(future)
+                yield path, future.result()
+                done += 1
+                if done % PROGRESS_EVERY == 0:
+                    _report(done, total, start)
+            submit(len(finished))
+    _report(total, total, start)
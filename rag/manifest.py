@@ -0,0 +1,101 @@
+import hashlib
+import json
+import os
+from typing import Any, Optional
+
+MANIFEST_FILENAME = "ingest_manifest.json"
+
+
+def sha256_file(path: str) -> str:
+    """Content hash of a file on disk."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def sha256_text(text: str) -> str:
+    """Content hash of an in-memory document, e.g. a fetched web page."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def chunk_id(source: str, index: int) -> str:
+    """Stable vector store id of the index-th chunk of a source."""
+    return hashlib.sha1(f"{source}#{index}".encode("utf-8")).hexdigest()
+
+
+class IngestManifest:
+    """Per-source content hashes and chunk ids of the documentation index.
+
+    The manifest is persisted next to the vector store so that a restart only
+    embeds added or changed sources and evicts chunks of deleted ones.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        settings: dict[str, Any],
+        sources: Optional[dict[str, dict[str, Any]]] = None,
+        stored_settings: Optional[dict[str, Any]] = None,
+    ):
+        self.path = path
+        self.settings = settings
+        self.sources = sources or {}
+        self.stored_settings = stored_settings
+
+    @classmethod
+    def load(
+        cls, persist_directory: str, settings: dict[str, Any]
+    ) -> "IngestManifest":
+        path = os.path.join(persist_directory, MANIFEST_FILENAME)
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return cls(path, settings)
+
+        return cls(
+            path,
+            settings,
+            sources=data.get("sources", {}),
+            stored_settings=data.get("settings"),
+        )
+
+    def is_outdated(self) -> bool:
+        """Whether the index was built with different ingestion settings."""
+        return bool(self.sources) and self.stored_settings != self.settings
+
+    def is_unchanged(self, source: str, stat: os.stat_result) -> bool:
+        """Cheap check that a local file was not touched since ingestion."""
+        entry = self.sources.get(source)
+        return (
+            entry is not None
+            and entry.get("size") == stat.st_size
+            and entry.get("mtime_ns") == stat.st_mtime_ns
+        )
+
+    def get(self, source: str) -> Optional[dict[str, Any]]:
+        return self.sources.get(source)
+
+    def set(self, source: str, entry: dict[str, Any]):
+        self.sources[source] = entry
+
+    def remove(self, source: str) -> list[str]:
+        """Drop a source and return the chunk ids that must be evicted."""
+        entry = self.sources.pop(source, None) or {}
+        return entry.get("chunk_ids", [])
+
+    def chunk_count(self) -> int:
+        return sum(
+            len(entry.get("chunk_ids", [])) for entry in self.sources.values()
+        )
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(
+                {"settings": self.settings, "sources": self.sources}, file
+            )
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,159 @@
+import json
+import time
+
+import numpy as np
+
+from rag.faiss_store import VECTORS_FILENAME, FaissCollection
+
+NUMPY_DIRECTORY = "numpy"
+
+
+def top_k(scores: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """Scores and columns of the k largest scores of each row, best first.
+    argpartition selects them in linear time; only those k are sorted."""
+    k = min(k, scores.shape[1])
+    if k < scores.shape[1]:
+        columns = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        columns = np.broadcast_to(np.arange(k), scores.shape)
+    top = np.take_along_axis(scores, columns, axis=1)
+    order = np.argsort(-top, axis=1)
+    return (
+        np.take_along_axis(top, order, axis=1),
+        np.take_along_axis(columns, order, axis=1),
+    )
+
+
+class NumpyCollection(FaissCollection):
+    """Collection searched exactly from one in-memory NumPy matrix.
+
+    Uses the on-disk layout of FaissCollection without the FAISS index: the
+    L2-normalized vectors are read into a single contiguous float32 array
+    and a batch of queries is one matrix product plus argpartition. Suited
+    to corpora whose vectors fit in memory; faiss is not required.
+    """
+
+    def _read_index(self):
+        # A private copy: one sequential read on open instead of page
+        # faults during the first queries.
+        self.matrix = np.ascontiguousarray(
+            np.load(self._version_path(VECTORS_FILENAME)), dtype=np.float32
+        )
+
+    def _keeps_vectors(self) -> bool:
+        return True
+
+    def _write_index(self, matrix: np.ndarray, path: str):
+        pass
+
+    def _search_rows(
+        self, queries: np.ndarray, k: int
+    ) -> list[tuple[np.ndarray, np.ndarray]]:
+        if len(queries) == 1:
+            scores = (self.matrix @ queries[0])[np.newaxis]
+        else:
+            scores = queries @ self.matrix.T
+        return list(zip(*top_k(scores, k)))
+
+
+class _FixedEmbeddings:
+    """Embeddings returning precomputed vectors, for benchmarking."""
+
+    def __init__(self, vectors: np.ndarray):
+        self.vectors = vectors
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self.vectors[int(text)].tolist() for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.vectors[0].tolist()
+
+
+def benchmark(
+    sizes: list[int],
+    dimensions: int = 384,
+    queries: int = 100,
+    k: int = 10,
+    chroma_max: int = 100000,
+) -> dict:
+    """Per-query latency of NumpyCollection against a Chroma collection.
+
+    Uses random unit vectors and stores and searches them through each
+    backend directly, so only vector search is timed. Chroma is skipped
+    above chroma_max vectors, where building its HNSW index takes long.
+    """
+    import tempfile
+
+    from langchain.vectorstores import Chroma
+
+    rng = np.random.default_rng(0)
+    report = {"dimensions": dimensions, "queries": queries, "k": k}
+    for size in sizes:
+        vectors = rng.standard_normal((size, dimensions), dtype=np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        query_vectors = vectors[rng.choice(size, queries)].tolist()
+        embeddings = _FixedEmbeddings(vectors)
+        ids = [str(i) for i in range(size)]
+        result = {}
+
+        with tempfile.TemporaryDirectory() as directory:
+            collection = NumpyCollection(directory, embeddings)
+            # Bypass add_documents: a million vectors as Python lists would
+            # not fit in memory.
+            collection.pending_ids = ids
+            collection.pending_vectors = vectors
+            collection.pending_records = [
+                json.dumps({"text": key, "metadata": {}}).encode("utf-8")
+                for key in ids
+            ]
+            collection.persist()
+
+            start = time.perf_counter()
+            collection = NumpyCollection(directory, embeddings)
+            len(collection)
+            result["numpy_open_ms"] = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            for query in query_vectors:
+                collection.similarity_search_by_vector_with_relevance_scores(
+                    query, k
+                )
+            result["numpy_query_ms"] = (
+                (time.perf_counter() - start) * 1000 / queries
+            )
+            start = time.perf_counter()
+            collection.similarity_search_by_vectors_with_relevance_scores(
+                query_vectors, k
+            )
+            result["numpy_batched_query_ms"] = (
+                (time.perf_counter() - start) * 1000 / queries
+            )
+
+        if size <= chroma_max:
+            with tempfile.TemporaryDirectory() as directory:
+                chroma = Chroma(
+                    persist_directory=directory, embedding_function=embeddings
+                )
+                for i in range(0, size, 4000):
+                    chroma._collection.add(
+                        ids=ids[i : i + 4000],
+                        embeddings=vectors[i : i + 4000].tolist(),
+                        documents=ids[i : i + 4000],
+                    )
+                start = time.perf_counter()
+                for query in query_vectors:
+                    chroma.similarity_search_by_vector(query, k)
+                result["chroma_query_ms"] = (
+                    (time.perf_counter() - start) * 1000 / queries
+                )
+
+        report[str(size)] = {
+            key: round(value, 3) for key, value in result.items()
+        }
+    return report
+
+
+if __name__ == "__main__":
+    import sys
+
+    sizes = [int(size) for size in sys.argv[1:]] or [10000, 100000, 1000000]
+    print(json.dumps(benchmark(sizes), indent=2))
@@ -0,0 +1,207 @@
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+from typing import Optional
+
+import numpy as np
+
+from rag.faiss_store import FaissCollection, normalize
+
+# (quantization, rerank factor) pairs compared against the Chroma store.
+VARIANTS = (
+    ("none", 0),
+    ("float16", 0),
+    ("int8", 0),
+    ("int8", 4),
+)
+CHROMA_BATCH = 4000
+
+
+def directory_bytes(path: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(path)
+        for name in names
+    )
+
+
+def resident_bytes() -> Optional[int]:
+    """Resident set size of this process, including mapped file pages
+    that were touched; None where /proc is not available."""
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def recall_at_k(expected: np.ndarray, found: np.ndarray) -> float:
+    hits = sum(
+        len(set(row_expected) & set(row_found))
+        for row_expected, row_found in zip(expected, found)
+    )
+    return hits / max(expected.size, 1)
+
+
+def _open_and_search(
+    backend: str, directory: str, options: dict, queries: list, k: int
+) -> tuple[Optional[int], list[list[int]], float]:
+    """Open a store and run the queries, in a fresh process so that its
+    resident growth is not hidden by memory the parent already holds."""
+    # Libraries are loaded first, so only the store itself is counted.
+    import chromadb  # noqa: F401
+    import faiss  # noqa: F401
+    from langchain.vectorstores import Chroma
+
+    start_resident = resident_bytes()
+    start = time.perf_counter()
+    if backend == "chroma":
+        store = Chroma(persist_directory=directory)
+        found = [
+            store.similarity_search_by_vector(query, k) for query in queries
+        ]
+    else:
+        store = FaissCollection(directory, None, **options)
+        batch = store.similarity_search_by_vectors_with_relevance_scores(
+            queries, k
+        )
+        found = [[document for document, _ in results] for results in batch]
+    elapsed = time.perf_counter() - start
+    end_resident = resident_bytes()
+    rows = [[int(document.page_content) for document in row] for row in found]
+    growth = (
+        end_resident - start_resident
+        if start_resident is not None and end_resident is not None
+        else None
+    )
+    return growth, rows, elapsed
+
+
+def _build_chroma(directory: str, vectors: np.ndarray):
+    from langchain.vectorstores import Chroma
+
+    chroma = Chroma(persist_directory=directory)
+    ids = [str(i) for i in range(len(vectors))]
+    for i in range(0, len(vectors), CHROMA_BATCH):
+        chroma._collection.add(
+            ids=ids[i : i + CHROMA_BATCH],
+            embeddings=vectors[i : i + CHROMA_BATCH].tolist(),
+            documents=ids[i : i + CHROMA_BATCH],
+        )
+
+
+def _build_faiss(directory: str, vectors: np.ndarray, options: dict):
+    collection = FaissCollection(
+        directory, None, dimensions=vectors.shape[1], **options
+    )
+    collection.pending_ids = [str(i) for i in range(len(vectors))]
+    collection.pending_vectors = vectors
+    collection.pending_records = [
+        json.dumps({"text": key, "metadata": {}}).encode("utf-8")
+        for key in collection.pending_ids
+    ]
+    collection.persist()
+
+
+def quantization_report(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    k: int = 10,
+    index_type: str = "flat",
+) -> dict:
+    """Recall@k, on-disk and resident bytes of each quantization against
+    the current Chroma store.
+
+    Every store is built on disk with the vectors, then opened and queried
+    in a fresh process; resident bytes are the growth of that process,
+    including the pages of memory-mapped files it touched. Recall is the
+    overlap with the top-k of an exact inner-product scan. Re-ranked
+    variants store float32 vectors as well, but read only the rows of
+    their candidates.
+    """
+    vectors = np.ascontiguousarray(normalize(vectors.astype(np.float32)))
+    queries = np.ascontiguousarray(normalize(queries.astype(np.float32)))
+    exact = np.argsort(-(queries @ vectors.T), axis=1)[:, :k]
+
+    report = {
+        "vectors": len(vectors),
+        "dimensions": vectors.shape[1],
+        "queries": len(queries),
+        "k": k,
+        "stores": {},
+    }
+    stores = [("chroma", "chroma", {})] + [
+        (
+            quantization if not rerank else f"{quantization}+rerank{rerank}",
+            "faiss",
+            {
+                "index_type": index_type,
+                "quantization": quantization,
+                "rerank": rerank,
+            },
+        )
+        for quantization, rerank in VARIANTS
+    ]
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as directory:
+        for name, backend, options in stores:
+            path = os.path.join(directory, name)
+            if backend == "chroma":
+                _build_chroma(path, vectors)
+            else:
+                _build_faiss(path, vectors, options)
+
+        for name, backend, options in stores:
+            path = os.path.join(directory, name)
+            with context.Pool(1) as pool:
+                growth, rows, elapsed = pool.apply(
+                    _open_and_search,
+                    (backend, path, options, queries.tolist(), k),
+                )
+            report["stores"][name] = {
+                "disk_bytes": directory_bytes(path),
+                "resident_bytes": growth,
+                f"recall@{k}": round(recall_at_k(exact, np.array(rows)), 4),
+                "query_ms": round(elapsed * 1000 / len(queries), 3),
+            }
+
+    baseline = report["stores"]["chroma"]
+    for store in report["stores"].values():
+        store["disk_ratio"] = round(
+            store["disk_bytes"] / baseline["disk_bytes"], 4
+        )
+        if store["resident_bytes"] and baseline["resident_bytes"]:
+            store["resident_ratio"] = round(
+                store["resident_bytes"] / baseline["resident_bytes"], 4
+            )
+    return report
+
+
+if __name__ == "__main__":
+    import sys
+
+    from rag.hashing_embeddings import HashingEmbeddings
+    from rag.ingest import discover_documents
+    from rag.loader import load_and_split
+
+    source_dir = sys.argv[1] if len(sys.argv) > 1 else "docs"
+    chunks = [
+        chunk.page_content
+        for path in discover_documents(source_dir)
+        for chunk in load_and_split(path, "structure")
+    ]
+    embeddings = HashingEmbeddings()
+    vectors = np.asarray(embeddings.embed_documents(chunks))
+    # Queries are the opening words of a fixed sample of chunks.
+    sample = np.random.default_rng(0).choice(
+        len(chunks), size=min(200, len(chunks)), replace=False
+    )
+    queries = np.asarray(
+        [
+            embeddings.embed_query(" ".join(chunks[i].split()[:12]))
+            for i in sample
+        ]
+    )
+    print(json.dumps(quantization_report(vectors, queries), indent=2))
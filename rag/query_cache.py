@@ -0,0 +1,73 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from rag.bm25 import BM25_FILENAME
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a query."""
+    return " ".join(query.lower().split())
+
+
+def index_version(persist_directory: str) -> int:
+    """Changes whenever ingestion writes a new version of the index.
+
+    Ingestion saves the lexical index last, and only when chunks changed, so
+    its modification time identifies the index contents.
+    """
+    try:
+        path = os.path.join(persist_directory, BM25_FILENAME)
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
+
+class QueryCache:
+    """Thread-safe LRU cache of documentation search results with a TTL.
+
+    Keys combine the normalized query, k and the index version, so results
+    of an older index are never served.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(query: str, k: int, version: int) -> tuple:
+        return (normalize_query(query), k, version)
+
+    def get(self, key: tuple) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: tuple, result: str):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
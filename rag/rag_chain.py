@@ -1,12 +1,134 @@
-from langchain.embeddings import OpenAIEmbeddings
-from langchain.vectorstores import Chroma
-from langchain.chat_models import ChatOpenAI
+from typing import Callable
+
 from langchain.chains import RetrievalQA
+from langchain.schema import Document
+
+from config import config
+from rag.bm25 import BM25Index
+from rag.dedup import DedupIndex
+from rag.embeddings import get_embeddings
+from rag.ingest import PERSIST_DIRECTORY
+from rag.retriever import RETRIEVAL_MODES, HybridRetriever
+from rag.shards import open_vectorstore
+
+SEARCH_MODES = ("qa", "snippets")
+
+
+def create_retriever(
+    k: int = 3, persist_directory: str = PERSIST_DIRECTORY
+) -> HybridRetriever:
+    mode = config.infrapilot_CONFIG.RAG_RETRIEVAL_MODE.lower()
+    if mode not in RETRIEVAL_MODES:
+        raise Exception(f"Retrieval mode {mode} is not supported.")
+
+    vectorstore = None
+    if mode != "lexical":
+        vectorstore = open_vectorstore(persist_directory, get_embeddings())
+    dedup = None
+    if config.infrapilot_CONFIG.RAG_DEDUP_THRESHOLD:
+        dedup = DedupIndex.load(persist_directory)
+    return HybridRetriever(
+        bm25=BM25Index.load(persist_directory),
+        vectorstore=vectorstore,
+        dedup=dedup,
+        mode=mode,
+        k=k,
+        fetch_k=config.infrapilot_CONFIG.RAG_FETCH_K,
+        rrf_k=config.infrapilot_CONFIG.RAG_RRF_K,
+    )
 
 
 def create_rag_chain(k: int = 3) -> RetrievalQA:
-    embeddings = OpenAIEmbeddings()
-    vectorstore = Chroma(persist_directory=".chromadb", embedding_function=embeddings)
-    retriever = vectorstore.as_retriever(search_kwargs={"k": k})
-    llm = ChatOpenAI(model_name="gpt-4", temperature=0)
-    return RetrievalQA.from_chain_type(llm=llm, chain_type="stuff", retriever=retriever)
\ No newline at end of file
+    retriever = create_retriever(k=k)
+    from utils.models import create_llm
+
+    llm = create_llm("rag_answer")
+    return RetrievalQA.from_chain_type(
+        llm=llm, chain_type="stuff", retriever=retriever
+    )
+
+
+# Rough characters per token, used when the tokenizer is unavailable.
+CHARS_PER_TOKEN = 4
+# Sources named in the header of a snippet shared by near-duplicate chunks.
+MAX_LISTED_SOURCES = 3
+
+
+class _CharEncoding:
+    """Stand-in for a tiktoken encoding that counts CHARS_PER_TOKEN
+    characters as one token."""
+
+    def encode(self, text: str) -> list[str]:
+        return [
+            text[i : i + CHARS_PER_TOKEN]
+            for i in range(0, len(text), CHARS_PER_TOKEN)
+        ]
+
+    def decode(self, tokens: list[str]) -> str:
+        return "".join(tokens)
+
+
+def _get_encoding():
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # tiktoken downloads its vocabulary on first use; offline, estimate.
+        return _CharEncoding()
+
+
+def format_snippets(documents: list[Document], token_budget: int) -> str:
+    """Deduplicated, source-attributed snippets trimmed to a token budget."""
+    encoding = _get_encoding()
+    seen = set()
+    snippets = []
+    remaining = token_budget
+    for document in documents:
+        content = document.page_content.strip()
+        key = " ".join(content.split())
+        if not content or key in seen:
+            continue
+        seen.add(key)
+
+        sources = document.metadata.get("sources") or [
+            document.metadata.get("source", "unknown")
+        ]
+        if len(sources) > MAX_LISTED_SOURCES:
+            more = len(sources) - MAX_LISTED_SOURCES
+            sources = sources[:MAX_LISTED_SOURCES] + [f"+{more} more"]
+        header = f"[{', '.join(sources)}]\n"
+        tokens = encoding.encode(header + content)
+        if len(tokens) > remaining:
+            if snippets and remaining < 50:
+                break
+            tokens = tokens[:remaining]
+        snippets.append(encoding.decode(tokens))
+        remaining -= len(tokens)
+        if remaining <= 0:
+            break
+
+    if not snippets:
+        return "No relevant documentation found."
+    return "\n\n".join(snippets)
+
+
+def create_documentation_search(k: int = 3) -> Callable[[str], str]:
+    """Search function backing the documentation_search tool.
+
+    "snippets" mode returns the retrieved chunks directly as the tool
+    observation, saving one LLM round trip per lookup; "qa" mode answers
+    from them with RAG_ANSWER_MODEL.
+    """
+    mode = config.infrapilot_CONFIG.RAG_SEARCH_MODE.lower()
+    if mode not in SEARCH_MODES:
+        raise Exception(f"Documentation search mode {mode} is not supported.")
+
+    if mode == "qa":
+        return create_rag_chain(k=k).run
+
+    retriever = create_retriever(k=k)
+    token_budget = config.infrapilot_CONFIG.RAG_SNIPPET_TOKEN_BUDGET
+    return lambda query: format_snippets(
+        retriever.get_relevant_documents(query), token_budget
+    )
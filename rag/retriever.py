@@ -0,0 +1,120 @@
+from typing import Any, Optional
+
+from langchain.callbacks.manager import (
+    AsyncCallbackManagerForRetrieverRun,
+    CallbackManagerForRetrieverRun,
+)
+from langchain.schema import BaseRetriever, Document
+
+from rag.bm25 import BM25Index
+from rag.dedup import DedupIndex
+from rag.manifest import chunk_id
+
+RETRIEVAL_MODES = ("hybrid", "vector", "lexical")
+
+
+def document_id(document: Document) -> str:
+    return chunk_id(
+        document.metadata.get("source", ""),
+        document.metadata.get("chunk_index", 0),
+    )
+
+
+def reciprocal_rank_fusion(
+    rankings: list[list[str]], rrf_k: int = 60
+) -> list[str]:
+    """Fuse several rankings of ids: score(d) = sum 1 / (rrf_k + rank)."""
+    scores: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, start=1):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank)
+    return sorted(scores, key=scores.get, reverse=True)
+
+
+class HybridRetriever(BaseRetriever):
+    """Retriever fusing BM25 and vector search with reciprocal rank fusion.
+
+    In "lexical" mode the vector store and embedder are never touched, and
+    "vector" mode behaves like a plain vector store retriever. With a dedup
+    index, near-duplicate chunks collapse into their canonical chunk, which
+    lists every source they appear in under the "sources" metadata key.
+    """
+
+    bm25: BM25Index
+    vectorstore: Optional[Any] = None
+    dedup: Optional[DedupIndex] = None
+    mode: str = "hybrid"
+    k: int = 3
+    fetch_k: int = 20
+    rrf_k: int = 60
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    def _lexical_search(self, query: str, k: int) -> list[Document]:
+        documents = []
+        seen = set()
+        for key, _ in self.bm25.search(query, k):
+            if self.dedup is not None:
+                key = self.dedup.canonical(key)
+            if key in seen:
+                continue
+            seen.add(key)
+            chunk = self.bm25.get(key)
+            documents.append(
+                Document(
+                    page_content=chunk["text"], metadata=chunk["metadata"]
+                )
+            )
+        return documents
+
+    def _with_sources(self, documents: list[Document]) -> list[Document]:
+        if self.dedup is None:
+            return documents
+        for document in documents:
+            cluster = self.dedup.cluster(document_id(document))
+            if len(cluster) < 2:
+                continue
+            sources = []
+            for key in cluster:
+                chunk = self.bm25.get(key)
+                source = chunk["metadata"].get("source") if chunk else None
+                if source and source not in sources:
+                    sources.append(source)
+            document.metadata = {**document.metadata, "sources": sources}
+        return documents
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        if self.mode == "lexical" or self.vectorstore is None:
+            return self._with_sources(self._lexical_search(query, self.k))
+
+        if self.mode == "vector" or not len(self.bm25):
+            return self._with_sources(
+                self.vectorstore.similarity_search(query, k=self.k)
+            )
+
+        vector_documents = self.vectorstore.similarity_search(
+            query, k=self.fetch_k
+        )
+        lexical_documents = self._lexical_search(query, self.fetch_k)
+        by_id = {}
+        rankings = []
+        for documents in (vector_documents, lexical_documents):
+            ranking = []
+            for document in documents:
+                key = document_id(document)
+                by_id.setdefault(key, document)
+                ranking.append(key)
+            rankings.append(ranking)
+
+        fused = reciprocal_rank_fusion(rankings, rrf_k=self.rrf_k)
+        return self._with_sources([by_id[key] for key in fused[: self.k]])
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        return self._get_relevant_documents(
+            query, run_manager=run_manager.get_sync()
+        )
@@ -0,0 +1,346 @@
+import json
+import os
+import re
+from collections import defaultdict
+from typing import Any, Optional
+
+from langchain.embeddings.base import Embeddings
+from langchain.schema import Document
+
+from config import config
+from utils.text import singular, tokenize
+
+VECTOR_STORES = ("chroma", "faiss", "numpy")
+SHARDS_FILENAME = "shards.json"
+# Collection used when the index is not sharded; Chroma's default name, so
+# existing unsharded indexes keep working.
+DEFAULT_SHARD = "langchain"
+K8S_PREFIX = "k8s-api"
+K8S_VERSION_SUFFIX = re.compile(r"-v\d+((alpha|beta)\d+)?$")
+# AWS service names that are common words in infrastructure questions, e.g.
+# "logs" or "deploy" in Kubernetes questions; they do not route on their
+# own, only through their command names.
+GENERIC_SERVICE_NAMES = frozenset(
+    {
+        "config",
+        "configure",
+        "connect",
+        "deploy",
+        "health",
+        "logs",
+        "node",
+        "pipes",
+        "ram",
+        "service",
+        "translate",
+    }
+)
+
+
+def _relative_parts(source: str) -> list[str]:
+    return os.path.normpath(source).split(os.sep)
+
+
+def shard_for(source: str) -> str:
+    """Shard of a documentation source: one per AWS service and per
+    Kubernetes resource category."""
+    if "://" in source:
+        return "remote"
+    parts = _relative_parts(source)
+    for i in range(len(parts) - 3):
+        if parts[i : i + 2] == ["aws-cli", "examples"]:
+            return f"aws-{parts[i + 2]}"
+    for i in range(len(parts) - 2):
+        if parts[i] == K8S_PREFIX:
+            return f"k8s-{parts[i + 1]}"
+    return "general"
+
+
+def source_keywords(source: str) -> set[str]:
+    """Query terms that should route to the shard of a source: AWS service
+    and command names, Kubernetes resource kinds."""
+    shard = shard_for(source)
+    stem = os.path.splitext(os.path.basename(source))[0]
+    keywords = set()
+    if shard.startswith("aws-"):
+        service = shard[len("aws-") :]
+        if service not in GENERIC_SERVICE_NAMES:
+            keywords.add(service)
+        if service.endswith("api") and len(service) > 3:
+            keywords.add(service[: -len("api")])
+        if "-" in stem:
+            keywords.add(stem)
+    elif shard.startswith("k8s-") and not stem.startswith("_"):
+        kind = K8S_VERSION_SUFFIX.sub("", stem)
+        keywords.add(kind)
+        keywords.add(kind.replace("-", ""))
+    return keywords
+
+
+class ShardRouter:
+    """Routes a query to the shards whose keywords it mentions."""
+
+    def __init__(self, keywords: dict[str, list[str]]):
+        self.index: dict[str, set[str]] = defaultdict(set)
+        for shard, shard_keywords in keywords.items():
+            for keyword in shard_keywords:
+                # Indexes saved before the stop-list still list them.
+                generic = keyword in GENERIC_SERVICE_NAMES
+                if generic and shard.startswith("aws-"):
+                    continue
+                self.index[keyword].add(shard)
+
+    @classmethod
+    def load(cls, persist_directory: str) -> "ShardRouter":
+        path = os.path.join(persist_directory, SHARDS_FILENAME)
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return cls({})
+        return cls({shard: info["keywords"] for shard, info in data.items()})
+
+    def route(self, query: str) -> set[str]:
+        shards = set()
+        for term in tokenize(query):
+            for candidate in (term, singular(term)):
+                shards.update(self.index.get(candidate, ()))
+        return shards
+
+
+def save_shards(persist_directory: str, sources: dict[str, dict[str, Any]]):
+    """Record chunk counts and routing keywords of every shard."""
+    shards: dict[str, dict[str, Any]] = {}
+    for source, entry in sources.items():
+        shard = entry.get("shard", DEFAULT_SHARD)
+        info = shards.setdefault(shard, {"chunks": 0, "keywords": set()})
+        info["chunks"] += len(entry.get("chunk_ids", []))
+        info["keywords"].update(source_keywords(source))
+
+    path = os.path.join(persist_directory, SHARDS_FILENAME)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(
+            {
+                shard: {
+                    "chunks": info["chunks"],
+                    "keywords": sorted(info["keywords"]),
+                }
+                for shard, info in shards.items()
+            },
+            file,
+        )
+    os.replace(tmp_path, path)
+
+
+class ShardedVectorStore:
+    """Collections per shard behind a single vector store interface.
+
+    Queries go only to the shards the router picks. When those return
+    fewer than k hits, the global_k best matches of the other shards are
+    merged in by distance; when no shard matches or they return nothing,
+    all shards are searched. Each shard can be rebuilt on its own.
+    Collections are Chroma collections, memory-mapped FAISS indexes or
+    in-memory NumPy matrices, depending on backend.
+    """
+
+    def __init__(
+        self,
+        persist_directory: str,
+        embedding_function: Embeddings,
+        router: Optional[ShardRouter] = None,
+        backend: str = "chroma",
+        faiss_index_type: str = "auto",
+        faiss_nprobe: int = 8,
+        quantization: str = "none",
+        quantized_rerank: int = 0,
+        global_k: int = 0,
+    ):
+        if backend not in VECTOR_STORES:
+            raise Exception(f"Vector store {backend} is not supported.")
+        self.persist_directory = persist_directory
+        self.embedding_function = embedding_function
+        self.router = router or ShardRouter.load(persist_directory)
+        self.backend = backend
+        self.faiss_index_type = faiss_index_type
+        self.faiss_nprobe = faiss_nprobe
+        self.quantization = quantization
+        self.quantized_rerank = quantized_rerank
+        self.global_k = global_k
+        self.collections: dict[str, Any] = {}
+
+    def shard_names(self) -> list[str]:
+        path = os.path.join(self.persist_directory, SHARDS_FILENAME)
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                return list(json.load(file))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return [DEFAULT_SHARD]
+
+    def collection(self, shard: str):
+        if shard in self.collections:
+            return self.collections[shard]
+
+        if self.backend == "numpy":
+            from rag.embeddings import embedding_dimensions
+            from rag.numpy_store import NUMPY_DIRECTORY, NumpyCollection
+
+            collection = NumpyCollection(
+                os.path.join(self.persist_directory, NUMPY_DIRECTORY, shard),
+                self.embedding_function,
+                dimensions=embedding_dimensions(),
+            )
+        elif self.backend == "faiss":
+            from rag.embeddings import embedding_dimensions
+            from rag.faiss_store import FAISS_DIRECTORY, FaissCollection
+
+            collection = FaissCollection(
+                os.path.join(self.persist_directory, FAISS_DIRECTORY, shard),
+                self.embedding_function,
+                index_type=self.faiss_index_type,
+                nprobe=self.faiss_nprobe,
+                quantization=self.quantization,
+                rerank=self.quantized_rerank,
+                dimensions=embedding_dimensions(),
+            )
+        else:
+            from langchain.vectorstores import Chroma
+
+            collection = Chroma(
+                collection_name=shard,
+                persist_directory=self.persist_directory,
+                embedding_function=self.embedding_function,
+            )
+        self.collections[shard] = collection
+        return collection
+
+    def add_documents(self, documents: list[Document], ids: list[str]):
+        grouped: dict[str, tuple[list, list]] = defaultdict(lambda: ([], []))
+        for document, key in zip(documents, ids):
+            shard = document.metadata.get("shard", DEFAULT_SHARD)
+            grouped[shard][0].append(document)
+            grouped[shard][1].append(key)
+        for shard, (shard_documents, shard_ids) in grouped.items():
+            self.collection(shard).add_documents(
+                shard_documents, ids=shard_ids
+            )
+
+    def delete(self, ids_by_shard: dict[str, list[str]]):
+        for shard, ids in ids_by_shard.items():
+            if ids:
+                self.collection(shard).delete(ids=ids)
+
+    def persist(self):
+        for collection in self.collections.values():
+            collection.persist()
+
+    def _search_batch(
+        self, shards, embeddings: list[list[float]], k: int
+    ) -> list[list[tuple[Document, float]]]:
+        results: list[list[tuple[Document, float]]] = [[] for _ in embeddings]
+        for shard in shards:
+            collection = self.collection(shard)
+            search_batch = getattr(
+                collection,
+                "similarity_search_by_vectors_with_relevance_scores",
+                None,
+            )
+            if search_batch is not None:
+                found = search_batch(embeddings, k=k)
+            else:
+                search = getattr(
+                    collection,
+                    "similarity_search_by_vector_with_relevance_scores",
+                )
+                found = [search(embedding, k=k) for embedding in embeddings]
+            for merged, shard_results in zip(results, found):
+                merged.extend(shard_results)
+        for merged in results:
+            # Chroma returns distances: lower is closer.
+            merged.sort(key=lambda item: item[1])
+            del merged[k:]
+        return results
+
+    def _search_routed(
+        self, shards, embeddings: list[list[float]], k: int
+    ) -> list[list[tuple[Document, float]]]:
+        """Results of the routed shards; queries they answer with fewer
+        than k hits get the global_k best of the other shards merged in."""
+        results = self._search_batch(shards, embeddings, k)
+        short = [i for i, merged in enumerate(results) if 0 < len(merged) < k]
+        others = [name for name in self.shard_names() if name not in shards]
+        if self.global_k <= 0 or not short or not others:
+            return results
+        found = self._search_batch(
+            others, [embeddings[i] for i in short], min(self.global_k, k)
+        )
+        for i, global_results in zip(short, found):
+            results[i].extend(global_results)
+            results[i].sort(key=lambda item: item[1])
+            del results[i][k:]
+        return results
+
+    def similarity_search(self, query: str, k: int = 4) -> list[Document]:
+        embedding = self.embedding_function.embed_query(query)
+        results = []
+        routed = self.router.route(query)
+        if routed:
+            results = self._search_routed(routed, [embedding], k)[0]
+        if not results:
+            results = self._search_batch(self.shard_names(), [embedding], k)[0]
+        return [document for document, _ in results]
+
+    def similarity_search_batch(
+        self, queries: list[str], k: int = 4
+    ) -> list[list[Document]]:
+        """similarity_search for many queries, embedded in one call.
+
+        Queries routed to the same shards are searched together, which
+        NumPy and FAISS collections answer with a single matrix product.
+        """
+        embeddings = self.embedding_function.embed_documents(queries)
+        results: list[list[tuple[Document, float]]] = [[] for _ in queries]
+        groups: dict[frozenset, list[int]] = defaultdict(list)
+        for i, query in enumerate(queries):
+            groups[frozenset(self.router.route(query))].append(i)
+
+        for shards, indexes in groups.items():
+            if not shards:
+                continue
+            found = self._search_routed(
+                shards, [embeddings[i] for i in indexes], k
+            )
+            for i, query_results in zip(indexes, found):
+                results[i] = query_results
+
+        fallback = [i for i in range(len(queries)) if not results[i]]
+        if fallback:
+            found = self._search_batch(
+                self.shard_names(), [embeddings[i] for i in fallback], k
+            )
+            for i, query_results in zip(fallback, found):
+                results[i] = query_results
+        return [
+            [document for document, _ in query_results]
+            for query_results in results
+        ]
+
+
+def open_vectorstore(
+    persist_directory: str,
+    embedding_function: Embeddings,
+    router: Optional[ShardRouter] = None,
+) -> ShardedVectorStore:
+    """Vector store of the documentation index, as configured."""
+    settings = config.infrapilot_CONFIG
+    return ShardedVectorStore(
+        persist_directory,
+        embedding_function,
+        router=router,
+        backend=settings.RAG_VECTOR_STORE.lower(),
+        faiss_index_type=settings.RAG_FAISS_INDEX.lower(),
+        faiss_nprobe=settings.RAG_FAISS_NPROBE,
+        quantization=settings.RAG_VECTOR_QUANTIZATION.lower(),
+        quantized_rerank=settings.RAG_QUANTIZED_RERANK,
+        global_k=settings.RAG_SHARD_GLOBAL_K,
+    )
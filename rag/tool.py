@@ -0,0 +1,70 @@
+import threading
+from typing import Callable, Optional
+
+from langchain.tools.base import BaseTool
+from pydantic import PrivateAttr
+
+from config import config
+from rag.coordinator import coordinator
+from rag.ingest import PERSIST_DIRECTORY
+from rag.query_cache import QueryCache, index_version
+
+PARTIAL_INDEX_NOTE = (
+    "(The documentation index is still being built; "
+    "results may be incomplete.)\n"
+)
+
+
+class DocumentationSearchTool(BaseTool):
+    """Tool that answers questions from the ingested documentation.
+
+    Results on the complete index are cached per normalized query; the
+    cache and the search are rebuilt whenever ingestion changes the index,
+    under a lock, as actions of one agent step may search concurrently.
+    """
+
+    name = "documentation_search"
+    description = "Retrieve up-to-date Kubernetes/AWS documentation snippets"
+    k: int = 3
+    search: Optional[Callable[[str], str]] = None
+    # Whether search was built on the complete index.
+    complete: bool = False
+    # Index version search was built on.
+    version: int = 0
+    cache: Optional[QueryCache] = None
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def _run(self, query: str) -> str:
+        coordinator.start()
+        ready = coordinator.wait(config.infrapilot_CONFIG.RAG_READY_TIMEOUT)
+        version = index_version(PERSIST_DIRECTORY)
+
+        with self._lock:
+            if self.cache is None:
+                self.cache = QueryCache(
+                    max_entries=config.infrapilot_CONFIG.RAG_QUERY_CACHE_SIZE,
+                    ttl=config.infrapilot_CONFIG.RAG_QUERY_CACHE_TTL,
+                )
+            if (
+                self.search is None
+                or (ready and not self.complete)
+                or version != self.version
+            ):
+                from rag.rag_chain import create_documentation_search
+
+                self.search = create_documentation_search(k=self.k)
+                self.complete = ready
+                self.version = version
+                self.cache.clear()
+            search, cache = self.search, self.cache
+
+        if not ready:
+            # Fall back to whatever part of the index is persisted so far.
+            return PARTIAL_INDEX_NOTE + search(query)
+
+        key = QueryCache.key(query, self.k, version)
+        result = cache.get(key)
+        if result is None:
+            result = search(query)
+            cache.put(key, result)
+        return result
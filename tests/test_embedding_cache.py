@@ -0,0 +1,52 @@
+import sqlite3
+from array import array
+
+from rag.embedding_cache import EmbeddingCache
+
+VECTOR_BYTES = 4 * 8
+
+
+def vector(value: float) -> list[float]:
+    return [value] * 8
+
+
+def test_total_bytes_follows_puts_and_replacements(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite"), 1 << 20)
+    cache.put_many({"a": vector(1.0), "b": vector(2.0)})
+    cache.put_many({"a": vector(3.0)})
+
+    assert cache.total_bytes == 2 * VECTOR_BYTES
+    assert cache.get_many(["a"]) == {"a": vector(3.0)}
+    reopened = EmbeddingCache(str(tmp_path / "cache.sqlite"), 1 << 20)
+    assert reopened.total_bytes == cache.total_bytes
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite"), 4 * VECTOR_BYTES)
+    for i in range(4):
+        cache.put_many({str(i): vector(i)})
+    cache.get_many(["0"])
+    cache.put_many({"4": vector(4.0)})
+
+    assert cache.total_bytes <= 4 * VECTOR_BYTES
+    assert set(cache.get_many([str(i) for i in range(5)])) >= {"0", "4"}
+    assert "1" not in cache.get_many(["1"])
+
+
+def test_single_table_caches_are_migrated(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    blob = array("f", vector(1.0)).tobytes()
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL, "
+        "size INTEGER NOT NULL, last_used REAL NOT NULL)"
+    )
+    connection.execute(
+        "INSERT INTO embeddings VALUES (?, ?, ?, ?)", ("a", blob, len(blob), 0)
+    )
+    connection.commit()
+    connection.close()
+
+    cache = EmbeddingCache(path, 1 << 20)
+    assert cache.total_bytes == VECTOR_BYTES
+    assert cache.get_many(["a"]) == {"a": vector(1.0)}
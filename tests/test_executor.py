@@ -0,0 +1,108 @@
+import threading
+import time
+
+import pytest
+from langchain.llms.fake import FakeListLLM
+
+from agent.agent import create_conversational_agent
+from agent.executor import ParallelAgentExecutor
+from config import config
+from tools.human.tool import HumanTool
+
+BATCH = (
+    "Thought: Do I need to use a tool? Yes\n"
+    "Action: human\nAction Input: first\nReason: ask\n"
+    "Action: human\nAction Input: second\nReason: ask again\n"
+)
+FINISH = "Thought: Do I need to use a tool? No\nAI: done"
+
+
+@pytest.fixture(autouse=True)
+def settings():
+    config.init()
+
+
+def test_human_prompts_of_a_batch_do_not_overlap():
+    reading = threading.Event()
+    overlaps = []
+
+    def input_func(prompt):
+        overlaps.append(reading.is_set())
+        reading.set()
+        time.sleep(0.05)
+        reading.clear()
+        return "yes"
+
+    tools = [HumanTool(prompt_func=lambda text: None, input_func=input_func)]
+    llm = FakeListLLM(responses=[BATCH, FINISH])
+    executor = ParallelAgentExecutor.from_agent_and_tools(
+        agent=create_conversational_agent(llm, tools),
+        tools=tools,
+        max_workers=2,
+    )
+
+    assert executor.run(input="ask twice", chat_history="") == "done"
+    assert overlaps == [False, False]
+
+
+DELAYS = {"a": 0.2, "b": 0.1, "c": 0.0}
+ECHO_BATCH = "Thought: Do I need to use a tool? Yes\n" + "".join(
+    f"Action: echo\nAction Input: {name}\nReason: echo {name}\n"
+    for name in DELAYS
+)
+
+
+def _echo_executor(tools, max_workers):
+    llm = FakeListLLM(responses=[ECHO_BATCH, FINISH])
+    return ParallelAgentExecutor.from_agent_and_tools(
+        agent=create_conversational_agent(llm, tools),
+        tools=tools,
+        max_workers=max_workers,
+        return_intermediate_steps=True,
+    )
+
+
+def _observations(result):
+    return [
+        (action.tool_input, observation)
+        for action, observation in result["intermediate_steps"]
+    ]
+
+
+@pytest.mark.parametrize("max_workers", [1, 3])
+def test_observations_follow_the_order_of_the_actions(max_workers):
+    from langchain.tools import Tool
+
+    # The first action finishes last when the actions run concurrently.
+    def echo(text):
+        time.sleep(DELAYS[text])
+        return f"observed {text}"
+
+    tools = [Tool(name="echo", func=echo, description="echo")]
+    executor = _echo_executor(tools, max_workers)
+
+    result = executor({"input": "echo", "chat_history": ""})
+
+    assert _observations(result) == [
+        (name, f"observed {name}") for name in DELAYS
+    ]
+
+
+@pytest.mark.parametrize("max_workers", [1, 3])
+def test_async_observations_follow_the_order_of_the_actions(max_workers):
+    import asyncio
+
+    from langchain.tools import Tool
+
+    async def echo(text):
+        await asyncio.sleep(DELAYS[text])
+        return f"observed {text}"
+
+    tools = [Tool(name="echo", func=None, coroutine=echo, description="echo")]
+    executor = _echo_executor(tools, max_workers)
+
+    result = asyncio.run(executor.acall({"input": "echo", "chat_history": ""}))
+
+    assert _observations(result) == [
+        (name, f"observed {name}") for name in DELAYS
+    ]
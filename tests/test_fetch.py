@@ -0,0 +1,123 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import rag.ingest
+from config import config
+from rag.fetch import RemoteDocFetcher
+
+
+class DocServer(ThreadingHTTPServer):
+    """Serves one page with ETag and Last-Modified validators."""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), DocHandler)
+        self.statuses = []
+        self.publish(b"Pods are the smallest deployable units.", 1)
+
+    def publish(self, body: bytes, version: int):
+        self.body = body
+        self.etag = f'"v{version}"'
+        self.last_modified = f"Mon, 0{version} Jan 2024 00:00:00 GMT"
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}/pods.txt"
+
+
+class DocHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        if self.headers.get("If-None-Match") == server.etag or (
+            self.headers.get("If-Modified-Since") == server.last_modified
+        ):
+            server.statuses.append(304)
+            self.send_response(304)
+            self.end_headers()
+            return
+        server.statuses.append(200)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(server.body)))
+        self.send_header("ETag", server.etag)
+        self.send_header("Last-Modified", server.last_modified)
+        self.end_headers()
+        self.wfile.write(server.body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = DocServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_unchanged_page_is_revalidated(server, tmp_path):
+    fetcher = RemoteDocFetcher(str(tmp_path), workers=2)
+
+    first = fetcher.fetch(server.url)
+    second = fetcher.fetch(server.url)
+
+    assert server.statuses == [200, 304]
+    assert (first.status, second.status) == ("fetched", "not_modified")
+    assert second.body == server.body
+    assert second.sha256 == first.sha256
+
+
+def test_changed_page_is_fetched_again(server, tmp_path):
+    fetcher = RemoteDocFetcher(str(tmp_path), workers=2)
+    first = fetcher.fetch(server.url)
+
+    server.publish(b"Pods run one or more containers.", 2)
+    second = fetcher.fetch(server.url)
+
+    assert server.statuses == [200, 200]
+    assert second.status == "fetched"
+    assert second.body == server.body
+    assert second.sha256 != first.sha256
+
+
+def test_ingestion_parses_only_changed_pages(server, tmp_path, monkeypatch):
+    config.init()
+    settings = config.infrapilot_CONFIG
+    monkeypatch.setattr(settings, "REMOTE_DOC_URLS", [server.url])
+    monkeypatch.setattr(
+        settings, "REMOTE_DOC_CACHE_PATH", str(tmp_path / "remote")
+    )
+    monkeypatch.setattr(settings, "RAG_EMBEDDING_PROVIDER", "local")
+    monkeypatch.setattr(settings, "RAG_VECTOR_STORE", "numpy")
+    parsed = []
+
+    def parse_remote_doc(result):
+        parsed.append(result.url)
+        return parse(result)
+
+    parse = rag.ingest.parse_remote_doc
+    monkeypatch.setattr(rag.ingest, "parse_remote_doc", parse_remote_doc)
+    docs, index = tmp_path / "docs", str(tmp_path / "index")
+    docs.mkdir()
+
+    rag.ingest.ingest_documentation(str(docs), index)
+    rag.ingest.ingest_documentation(str(docs), index)
+    assert server.statuses == [200, 304]
+    assert len(parsed) == 1
+
+    server.publish(b"Pods run one or more containers.", 2)
+    stats = rag.ingest.ingest_documentation(str(docs), index)
+    assert server.statuses == [200, 304, 200]
+    assert len(parsed) == 2
+    assert stats["changed_sources"] == 1
+
+    # New validators, same content: downloaded but not parsed again.
+    server.publish(server.body, 3)
+    stats = rag.ingest.ingest_documentation(str(docs), index)
+    assert server.statuses == [200, 304, 200, 200]
+    assert len(parsed) == 2
+    assert stats["changed_sources"] == 0
@@ -0,0 +1,41 @@
+import pytest
+from langchain.schema.output import Generation, LLMResult
+
+from callbacks.handlers import PrintReasoningCallbackHandler
+from config import config
+from utils import utils
+
+BATCH = (
+    "Thought: Do I need to use a tool? Yes\n"
+    "Action: describe_pod\nAction Input: web-1\nReason: check web-1\n"
+    "Action: describe_pod\nAction Input: web-2\nReason: check web-2\n"
+)
+
+
+@pytest.fixture
+def reasons(monkeypatch):
+    config.init()
+    monkeypatch.setattr(config.infrapilot_CONFIG, "show_reasoning", True)
+    printed = []
+    monkeypatch.setattr(utils, "print_ai_reasoning", printed.append)
+    return printed
+
+
+def test_reason_of_every_batched_action_is_streamed(reasons):
+    handler = PrintReasoningCallbackHandler()
+    handler.on_llm_start({}, [""])
+    for i in range(0, len(BATCH), 5):
+        handler.on_llm_new_token(BATCH[i : i + 5])
+    handler.on_llm_end(LLMResult(generations=[]), run_id=None)
+
+    assert reasons == ["check web-1", "check web-2"]
+
+
+def test_reasons_are_printed_when_not_streamed(reasons):
+    handler = PrintReasoningCallbackHandler()
+    handler.on_llm_start({}, [""])
+    handler.on_llm_end(
+        LLMResult(generations=[[Generation(text=BATCH)]]), run_id=None
+    )
+
+    assert reasons == ["check web-1", "check web-2"]
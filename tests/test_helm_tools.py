@@ -0,0 +1,79 @@
+import asyncio
+import json
+import os
+import stat
+
+import pytest
+from langchain.llms.fake import FakeListLLM
+
+from k8s.tools.helm import tool
+from k8s.tools.helm.tool import (
+    GenerateUpgradeApplicationValuesTool,
+    GetApplicationDetailTool,
+    ListApplicationsTool,
+)
+
+RELEASES = [
+    {"name": "web", "namespace": "prod", "chart": "web", "app_version": "1"},
+    {"name": "db", "namespace": "", "chart": "db", "app_version": "1"},
+]
+HELM = f"""#!/bin/sh
+case "$1 $2" in
+  "list --all") echo '{json.dumps(RELEASES)}' ;;
+  "get manifest") echo "manifest of $3 in $5" ;;
+  "get values") printf 'global:\\n  metadata_chart_url: oci://charts/db\\n' ;;
+  "show values") echo "replicaCount: 1" ;;
+  *) echo "unknown release" >&2; exit 1 ;;
+esac
+"""
+
+
+@pytest.fixture(autouse=True)
+def helm(tmp_path, monkeypatch):
+    path = tmp_path / "helm"
+    path.write_text(HELM)
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+    # Readiness reads the cluster; report the manifest it was given.
+    monkeypatch.setattr(
+        tool, "pod_ready_status", lambda output, namespace: output.strip()
+    )
+
+
+@pytest.fixture(params=["run", "arun"])
+def run(request):
+    def run(tool, text):
+        if request.param == "run":
+            return tool.run(text)
+        return asyncio.run(tool.arun(text))
+
+    return run
+
+
+def test_list_applications_reports_readiness_of_each_release(run):
+    output = json.loads(run(ListApplicationsTool(), '{"namespace": "--all"}'))
+
+    assert [release["ready"] for release in output] == [
+        "manifest of web in prod",
+        "manifest of db in default",
+    ]
+    assert all("chart" not in release for release in output)
+
+
+def test_failed_helm_command_is_reported(run):
+    text = '{"name": "web", "namespace": ""}'
+
+    output = run(GetApplicationDetailTool(), text)
+
+    assert output.startswith("Helm status failed: Command 'helm status web")
+
+
+def test_upgrade_values_are_generated_from_the_release_values(run):
+    llm = FakeListLLM(
+        responses=["global:\n  metadata_chart_url: x\nreplicaCount: 3"]
+    )
+    text = json.dumps({"namespace": "", "name": "db", "user_query": "scale"})
+
+    output = run(GenerateUpgradeApplicationValuesTool(llm=llm), text)
+
+    assert json.loads(output) == {"global": {}, "replicaCount": 3}
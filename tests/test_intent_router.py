@@ -0,0 +1,105 @@
+import pytest
+from langchain.tools import Tool
+
+from agent.intent_router import INTENTS, IntentRouter
+from agent.tool_router import ROUTING_QUERIES
+
+
+@pytest.fixture(scope="module")
+def router():
+    return IntentRouter(
+        [
+            Tool(name=intent.tool_name, func=str, description="")
+            for intent in INTENTS
+        ]
+    )
+
+
+@pytest.mark.parametrize(
+    "query,tool_name",
+    [
+        (example, intent.tool_name)
+        for intent in INTENTS
+        for example in intent.examples
+    ],
+)
+def test_examples_are_served_by_their_intent(router, query, tool_name):
+    tool, _ = router.match(query)
+    assert tool.name == tool_name
+
+
+@pytest.mark.parametrize(
+    "query,tool_name,arguments",
+    [
+        ("docker ps -a", "list_docker_containers", {"all": True}),
+        ("show running containers", "list_docker_containers", {"all": False}),
+        (
+            "Show me the pods in the kube-system namespace?",
+            "list_kubernetes_resources",
+            {"resource_kind": "pods", "namespace": "kube-system"},
+        ),
+        (
+            "list pods in the default namespace",
+            "list_kubernetes_resources",
+            {"resource_kind": "pods", "namespace": "default"},
+        ),
+        (
+            "kubectl get deployments --all-namespaces",
+            "list_kubernetes_resources",
+            {"resource_kind": "deployments", "namespace": "--all"},
+        ),
+        ("list helm apps", "list_applications", {"namespace": ""}),
+    ],
+)
+def test_arguments_are_taken_from_the_query(
+    router, query, tool_name, arguments
+):
+    tool, matched = router.match(query)
+    assert (tool.name, matched) == (tool_name, arguments)
+
+
+@pytest.mark.parametrize(
+    "query,namespace",
+    [
+        ("list pods in all namespaces", "--all"),
+        ("kubectl get deployments -A", "--all"),
+        ("list helm releases in all namespaces", "--all"),
+        ("list pods in kube-system", "kube-system"),
+    ],
+)
+def test_list_intents_take_a_namespace(router, query, namespace):
+    _, arguments = router.match(query)
+    assert arguments["namespace"] == namespace
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "describe pod web-1 in all namespaces",
+        "show logs of pod api -A",
+        "show logs of pod X",
+        "describe pod web-1 -n Prod",
+    ],
+)
+def test_pod_intents_need_a_valid_name_and_namespace(router, query):
+    assert router.match(query) is None
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "list pods in kube-system and delete the failing ones",
+        "show logs of container api",
+        "list the widgets",
+    ],
+)
+def test_other_queries_are_left_to_the_agent(router, query):
+    assert router.match(query) is None
+
+
+@pytest.mark.parametrize("query,tool_name", ROUTING_QUERIES)
+def test_routed_queries_are_served_by_their_tool_or_the_agent(
+    router, query, tool_name
+):
+    matched = router.match(query)
+    assert matched is None or matched[0].name == tool_name
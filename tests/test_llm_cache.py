@@ -0,0 +1,46 @@
+import langchain
+import pytest
+from langchain.llms.fake import FakeListLLM
+
+from utils.llm_cache import CompletionCache
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = CompletionCache(str(tmp_path / "llm.sqlite"))
+    monkeypatch.setattr(langchain, "llm_cache", cache)
+    return cache
+
+
+def test_repeated_prompt_is_answered_from_the_cache(cache):
+    llm = FakeListLLM(responses=["aws s3 ls", "unused"])
+
+    assert llm.predict("list my buckets") == "aws s3 ls"
+    assert llm.predict("list my buckets") == "aws s3 ls"
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert llm.i == 1
+
+
+def test_other_prompt_misses(cache):
+    llm = FakeListLLM(responses=["aws s3 ls", "aws ec2 describe-instances"])
+
+    llm.predict("list my buckets")
+    assert llm.predict("list my instances") == "aws ec2 describe-instances"
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_entries_persist_and_expire(tmp_path):
+    path = str(tmp_path / "llm.sqlite")
+    CompletionCache(path).update("prompt", "model", [])
+
+    assert CompletionCache(path).lookup("prompt", "model") == []
+    assert CompletionCache(path, ttl=-1).lookup("prompt", "model") is None
+    assert len(CompletionCache(path)) == 0
+
+
+def test_entries_beyond_max_entries_are_evicted(tmp_path):
+    cache = CompletionCache(str(tmp_path / "llm.sqlite"), max_entries=2)
+    for prompt in ("a", "b", "c"):
+        cache.update(prompt, "model", [])
+
+    assert len(cache) == 2
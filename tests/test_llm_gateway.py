@@ -0,0 +1,148 @@
+import asyncio
+
+import openai
+import pytest
+
+from utils.llm_gateway import LLMGateway, TokenBucket
+
+REQUEST = {"messages": [{"role": "user", "content": "hi"}], "max_tokens": 50}
+
+
+class FakeCreate:
+    """Stands in for openai.ChatCompletion.create: raises errors, in order,
+    then answers."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.requests = []
+
+    def __call__(self, **request):
+        self.requests.append(request)
+        if self.errors:
+            raise self.errors.pop(0)
+        return "answer"
+
+    async def acreate(self, **request):
+        return self(**request)
+
+
+def rate_limited(retry_after="0"):
+    return openai.error.RateLimitError(
+        "slow down", headers={"retry-after": retry_after}
+    )
+
+
+def test_token_bucket_queues_reservations_past_capacity():
+    bucket = TokenBucket(rate_per_minute=60)
+
+    assert bucket.reserve(60) == 0
+    assert bucket.reserve(30) == pytest.approx(30, abs=0.1)
+    assert bucket.reserve(30) == pytest.approx(60, abs=0.1)
+    bucket.refund(60)
+    assert bucket.reserve(1) == pytest.approx(1, abs=0.1)
+
+
+def test_token_bucket_without_rate_never_waits():
+    bucket = TokenBucket(rate_per_minute=0)
+
+    assert bucket.reserve(1e9) == 0
+
+
+def test_retries_are_counted_against_one_request():
+    gateway = LLMGateway(requests_per_minute=0, tokens_per_minute=60000)
+    create = FakeCreate(rate_limited(), rate_limited())
+    # Empty the bucket so that each attempt waits 50 tokens / 1000 per s.
+    gateway.tokens.tokens = 0
+
+    assert gateway.call(create, **REQUEST) == "answer"
+
+    metrics = gateway.metrics()
+    assert len(create.requests) == 3
+    assert {key: metrics[key] for key in gateway.counts} == {
+        "requests": 1,
+        "retries": 2,
+        "rate_limited": 2,
+        "failures": 0,
+    }
+    assert metrics["queue_wait_mean_ms"] == pytest.approx(150, abs=15)
+    assert metrics["queue_wait_max_ms"] == metrics["queue_wait_mean_ms"]
+
+
+def test_async_retries_are_counted_against_one_request():
+    gateway = LLMGateway(
+        requests_per_minute=0, tokens_per_minute=0, base_delay=0.01
+    )
+    create = FakeCreate(openai.error.Timeout("timed out"))
+
+    async def call():
+        try:
+            return await gateway.acall(create.acreate, **REQUEST)
+        finally:
+            await gateway.aclose()
+
+    assert asyncio.run(call()) == "answer"
+    assert len(create.requests) == 2
+    assert gateway.metrics()["requests"] == 1
+    assert gateway.metrics()["retries"] == 1
+
+
+def test_errors_that_are_not_transient_are_not_retried():
+    gateway = LLMGateway(requests_per_minute=0, tokens_per_minute=0)
+    create = FakeCreate(openai.error.InvalidRequestError("bad", "messages"))
+
+    with pytest.raises(openai.error.InvalidRequestError):
+        gateway.call(create, **REQUEST)
+
+    assert len(create.requests) == 1
+    assert gateway.metrics()["failures"] == 1
+
+
+def test_retries_stop_at_max_retries():
+    gateway = LLMGateway(
+        requests_per_minute=0, tokens_per_minute=0, max_retries=2
+    )
+    create = FakeCreate(*(rate_limited() for _ in range(5)))
+
+    with pytest.raises(openai.error.RateLimitError):
+        gateway.call(create, **REQUEST)
+
+    assert len(create.requests) == 3
+    assert gateway.metrics()["retries"] == 2
+
+
+def test_retry_after_past_the_deadline_fails_the_request():
+    gateway = LLMGateway(
+        requests_per_minute=0, tokens_per_minute=0, deadline=1
+    )
+    create = FakeCreate(rate_limited(retry_after="5"))
+
+    with pytest.raises(openai.error.RateLimitError):
+        gateway.call(create, **REQUEST)
+
+    assert len(create.requests) == 1
+    assert gateway.metrics()["failures"] == 1
+
+
+def test_rate_limit_wait_past_the_deadline_fails_without_calling():
+    gateway = LLMGateway(requests_per_minute=60, deadline=1)
+    create = FakeCreate()
+    # Owe a request, so the next one waits 2s.
+    gateway.requests.tokens = -1
+
+    with pytest.raises(Exception, match="deadline of 1s exceeded"):
+        gateway.call(create, **REQUEST)
+
+    assert create.requests == []
+    # The reservation is refunded for the requests that follow.
+    assert gateway.requests.tokens == pytest.approx(-1, abs=0.1)
+
+
+def test_attempt_timeout_is_capped_by_the_time_left():
+    gateway = LLMGateway(
+        requests_per_minute=0, tokens_per_minute=0, deadline=10
+    )
+    create = FakeCreate()
+
+    gateway.call(create, request_timeout=60, **REQUEST)
+
+    assert create.requests[0]["request_timeout"] <= 10
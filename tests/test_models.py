@@ -0,0 +1,35 @@
+import pytest
+
+from callbacks.handlers import LatencyCallbackHandler
+from config import config
+from utils import models
+
+
+@pytest.fixture(autouse=True)
+def latencies(monkeypatch):
+    config.init()
+    monkeypatch.setattr(models, "latencies", {})
+    return models.latencies
+
+
+def test_latency_report_since_marks_covers_later_calls(latencies):
+    latencies["cli"] = LatencyCallbackHandler()
+    latencies["cli"].calls.extend([1.0, 1.0])
+    marks = models.latency_marks()
+    latencies["cli"].calls.append(0.2)
+    latencies["planner"] = LatencyCallbackHandler()
+    latencies["planner"].calls.append(0.5)
+
+    report = models.latency_report(marks)
+
+    assert report["cli"]["calls"] == 1
+    assert report["cli"]["mean_ms"] == 200.0
+    assert report["planner"]["calls"] == 1
+    assert models.latency_report()["cli"]["calls"] == 3
+
+
+def test_roles_without_calls_since_marks_are_left_out(latencies):
+    latencies["cli"] = LatencyCallbackHandler()
+    latencies["cli"].calls.append(1.0)
+
+    assert models.latency_report(models.latency_marks()) == {}
@@ -0,0 +1,47 @@
+import pytest
+from langchain.schema import AgentAction, AgentFinish, OutputParserException
+
+from agent.output_parser import BATCH_THOUGHT, OutputParser
+
+THOUGHT = "Thought: Do I need to use a tool? Yes\n"
+FIRST = "Action: describe_pod\nAction Input: web-1\nReason: check web-1\n"
+SECOND = 'Action: describe_pod\nAction Input: "web-2"\nReason: check web-2\n'
+
+
+def test_single_action():
+    text = THOUGHT + FIRST
+
+    action = OutputParser().parse(text)
+
+    assert isinstance(action, AgentAction)
+    assert (action.tool, action.tool_input) == ("describe_pod", "web-1")
+    assert action.log == text
+
+
+def test_batch_of_actions():
+    actions = OutputParser().parse(THOUGHT + FIRST + SECOND)
+
+    assert [(action.tool, action.tool_input) for action in actions] == [
+        ("describe_pod", "web-1"),
+        ("describe_pod", "web-2"),
+    ]
+    # Each log is the action's own part, so the scratchpad reads as one
+    # step per action.
+    assert actions[0].log == (THOUGHT + FIRST).rstrip()
+    assert actions[1].log == f"{BATCH_THOUGHT}\n{SECOND}".rstrip()
+
+
+def test_malformed_second_block_is_rejected():
+    text = THOUGHT + FIRST + "Action: describe_pod\nReason: no input\n"
+
+    with pytest.raises(OutputParserException):
+        OutputParser().parse(text)
+
+
+def test_final_answer():
+    finish = OutputParser().parse(
+        "Thought: Do I need to use a tool? No\nAI: all pods are running"
+    )
+
+    assert isinstance(finish, AgentFinish)
+    assert finish.return_values == {"output": "all pods are running"}
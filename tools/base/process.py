@@ -0,0 +1,164 @@
+import asyncio
+import subprocess
+import time
+from typing import Any, Callable, Generator, NamedTuple, Optional, Union
+
+
+async def run(
+    command: Union[str, list[str]], input: Optional[str] = None
+) -> subprocess.CompletedProcess:
+    """Asyncio counterpart of subprocess.run(..., capture_output=True,
+    text=True).
+
+    An argument list is executed directly; a string is run by the shell, as
+    the LLM-generated commands (pipes, quoting, multi-line) need.
+    """
+    if isinstance(command, str):
+        process = await asyncio.create_subprocess_shell(
+            command,
+            stdin=subprocess.PIPE if input is not None else None,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+    else:
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdin=subprocess.PIPE if input is not None else None,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+    try:
+        stdout, stderr = await process.communicate(
+            input.encode("utf-8") if input is not None else None
+        )
+    except asyncio.CancelledError:
+        if process.returncode is None:
+            process.kill()
+        raise
+    return subprocess.CompletedProcess(
+        command,
+        process.returncode,
+        stdout.decode("utf-8", errors="replace"),
+        stderr.decode("utf-8", errors="replace"),
+    )
+
+
+async def check_output(command: Union[str, list[str]]) -> str:
+    """Asyncio counterpart of subprocess.check_output(..., text=True)."""
+    result = await run(command)
+    if result.returncode != 0:
+        raise subprocess.CalledProcessError(
+            result.returncode, command, result.stdout, result.stderr
+        )
+    return result.stdout
+
+
+class Run(NamedTuple):
+    """Step: run a shell command; sends back its CompletedProcess."""
+
+    command: str
+
+
+class Predict(NamedTuple):
+    """Step: ask the LLM; sends back its answer."""
+
+    prompt: str
+
+
+class Sleep(NamedTuple):
+    """Step: wait, e.g. between status polls."""
+
+    seconds: float
+
+
+class Call(NamedTuple):
+    """Step: call a blocking function, e.g. an HTTP or kubernetes client;
+    sends back its result. arun_steps calls it in a worker thread."""
+
+    function: Callable[..., Any]
+    args: tuple = ()
+
+
+class Gather(NamedTuple):
+    """Step: run several generators of steps; sends back their results in
+    order. arun_steps runs them concurrently."""
+
+    steps: list
+
+
+Steps = Generator[Union[Run, Predict, Sleep, Call, Gather], Any, str]
+
+
+def checked_output(command: str) -> Steps:
+    """Steps running a shell command; returns its stdout and, like
+    subprocess.check_output, raises CalledProcessError when it fails."""
+    result = yield Run(command)
+    if result.returncode != 0:
+        raise subprocess.CalledProcessError(
+            result.returncode, command, result.stdout, result.stderr
+        )
+    return result.stdout
+
+
+def run_steps(steps: Steps, llm: Any = None) -> str:
+    """Run a tool written as a generator of steps, blocking.
+
+    The same generator runs on the event loop with arun_steps, so a tool
+    keeps a single implementation for _run and _arun.
+    """
+    result = None
+    error: Optional[Exception] = None
+    while True:
+        try:
+            step = steps.throw(error) if error else steps.send(result)
+        except StopIteration as stop:
+            return stop.value
+        result, error = None, None
+        try:
+            if isinstance(step, Run):
+                result = subprocess.run(
+                    step.command,
+                    shell=True,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                )
+            elif isinstance(step, Predict):
+                result = llm.predict(step.prompt)
+            elif isinstance(step, Call):
+                result = step.function(*step.args)
+            elif isinstance(step, Gather):
+                result = [run_steps(branch, llm) for branch in step.steps]
+            else:
+                time.sleep(step.seconds)
+        except Exception as e:
+            error = e
+
+
+async def arun_steps(steps: Steps, llm: Any = None) -> str:
+    """Asyncio counterpart of run_steps."""
+    result = None
+    error: Optional[Exception] = None
+    while True:
+        try:
+            step = steps.throw(error) if error else steps.send(result)
+        except StopIteration as stop:
+            return stop.value
+        result, error = None, None
+        try:
+            if isinstance(step, Run):
+                result = await run(step.command)
+            elif isinstance(step, Predict):
+                result = await llm.apredict(step.prompt)
+            elif isinstance(step, Call):
+                result = await asyncio.to_thread(step.function, *step.args)
+            elif isinstance(step, Gather):
+                result = list(
+                    await asyncio.gather(
+                        *(arun_steps(branch, llm) for branch in step.steps)
+                    )
+                )
+            else:
+                await asyncio.sleep(step.seconds)
+        except Exception as e:
+            error = e
@@ -1,6 +1,9 @@
-from typing import Any
+import subprocess
+from typing import Any, Optional
 from langchain.agents.tools import BaseTool
+from langchain.schema.language_model import BaseLanguageModel
 from callbacks.handlers import ApprovalCallbackHandler
+from tools.base import process
 
 
 class RequireApprovalTool(BaseTool):
@@ -8,3 +11,66 @@ class RequireApprovalTool(BaseTool):
 
     def __init__(self, **data: Any) -> None:
         super().__init__(callbacks=[ApprovalCallbackHandler()], **data)
+
+
+def parse_command(raw: str) -> str:
+    """Command in an LLM answer, without the code fence around it."""
+    raw = raw.strip()
+    if raw.startswith("```"):
+        lines = raw.splitlines()
+        raw = "\n".join(lines[1:-1])
+    return raw.strip()
+
+
+class CommandTool(BaseTool):
+    """Tool that runs a shell command, by default one the LLM writes from
+    the query with prompt.
+
+    Subclasses set prompt, or override command() to build the command from
+    the input, and override output() to report a successful run. The async
+    path awaits the LLM and the process instead of blocking.
+    """
+
+    llm: Optional[BaseLanguageModel] = None
+    prompt: str = ""
+
+    def command(self, query: str) -> str:
+        return parse_command(
+            self.llm.predict(self.prompt.format(query=query))
+        )
+
+    async def acommand(self, query: str) -> str:
+        if not self.prompt:
+            return self.command(query)
+        return parse_command(
+            await self.llm.apredict(self.prompt.format(query=query))
+        )
+
+    def output(self, stdout: str) -> str:
+        return stdout
+
+    def _result(self, result: subprocess.CompletedProcess) -> str:
+        if result.returncode == 0:
+            return self.output(result.stdout)
+        return f"Error: {result.stderr}"
+
+    def _run(self, query: str) -> str:
+        cmd = self.command(query)
+        try:
+            result = subprocess.run(
+                cmd,
+                shell=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+            )
+            return self._result(result)
+        except Exception as e:
+            return f"Exception: {e}"
+
+    async def _arun(self, query: str) -> str:
+        cmd = await self.acommand(query)
+        try:
+            return self._result(await process.run(cmd))
+        except Exception as e:
+            return f"Exception: {e}"
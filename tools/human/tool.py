@@ -5,6 +5,8 @@ from pydantic import Field
 from langchain.callbacks.manager import CallbackManagerForToolRun
 from langchain.tools.base import BaseTool
 
+from callbacks.handlers import terminal_lock
+
 
 def _print_func(text: str) -> None:
     print("\n")
@@ -31,5 +33,6 @@ class HumanTool(BaseTool):
         run_manager: Optional[CallbackManagerForToolRun] = None,
     ) -> str:
         """Use the Human input tool."""
-        self.prompt_func(query)
-        return self.input_func(">")
+        with terminal_lock:
+            self.prompt_func(query)
+            return self.input_func(">")
@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+from langchain.load.dump import dumps
+from langchain.load.load import loads
+from langchain.schema.cache import RETURN_VAL_TYPE, BaseCache
+
+
+class CompletionCache(BaseCache):
+    """Persistent LLM completion cache in SQLite, with a TTL and LRU
+    eviction beyond max_entries.
+
+    Entries are keyed by the model parameters (llm_string: model, temperature,
+    stop words, ...) and the fully rendered prompt. Installed as
+    langchain.llm_cache, it serves every model that does not opt out with
+    cache=False, so all toolkits share it; utils.models.create_llm opts out
+    every role but the tools' (see CACHED_ROLES).
+    """
+
+    def __init__(
+        self, path: str, max_entries: int = 1000, ttl: float = 86400.0
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS completions ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS completions_accessed "
+            "ON completions (accessed)"
+        )
+        self._connection.commit()
+
+    @staticmethod
+    def key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(
+            f"{llm_string}\0{prompt}".encode("utf-8")
+        ).hexdigest()
+
+    def __len__(self) -> int:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT COUNT(*) FROM completions"
+            ).fetchone()
+        return row[0]
+
+    def lookup(
+        self, prompt: str, llm_string: str
+    ) -> Optional[RETURN_VAL_TYPE]:
+        key = self.key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT response, created FROM completions WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None or row[1] + self.ttl < now:
+                if row is not None:
+                    self._connection.execute(
+                        "DELETE FROM completions WHERE key = ?", (key,)
+                    )
+                    self._connection.commit()
+                self.misses += 1
+                return None
+            self._connection.execute(
+                "UPDATE completions SET accessed = ? WHERE key = ?",
+                (now, key),
+            )
+            self._connection.commit()
+            self.hits += 1
+        return [loads(generation) for generation in json.loads(row[0])]
+
+    def update(
+        self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE
+    ) -> None:
+        if self.max_entries <= 0:
+            return
+        response = json.dumps(
+            [dumps(generation) for generation in return_val]
+        )
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO completions VALUES (?, ?, ?, ?)",
+                (self.key(prompt, llm_string), response, now, now),
+            )
+            self._connection.execute(
+                "DELETE FROM completions WHERE key IN (SELECT key FROM "
+                "completions ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._connection.commit()
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM completions")
+            self._connection.commit()
+
+
+if __name__ == "__main__":
+    import sys
+
+    path = sys.argv[1] if len(sys.argv) > 1 else ".cache/llm.sqlite"
+    cache = CompletionCache(path)
+    if len(sys.argv) > 2 and sys.argv[2] == "clear":
+        cache.clear()
+    print(f"{len(cache)} cached completions in {path}")
@@ -0,0 +1,309 @@
+import asyncio
+import random
+import threading
+import time
+import weakref
+from typing import Any, Callable, Optional
+
+# Rough characters per token of a prompt, for rate limiting.
+CHARS_PER_TOKEN = 4
+# Completion tokens assumed when a request does not cap them.
+DEFAULT_COMPLETION_TOKENS = 512
+
+
+class TokenBucket:
+    """Token bucket refilled at rate_per_minute, holding up to a minute's
+    worth. A rate of 0 disables the limit."""
+
+    def __init__(self, rate_per_minute: float):
+        self.rate = rate_per_minute / 60
+        self.capacity = rate_per_minute
+        self.tokens = rate_per_minute
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """Take amount and return the seconds to wait before using it.
+
+        The balance may go negative, so concurrent callers queue up in
+        reservation order instead of racing for the refill.
+        """
+        if self.rate <= 0:
+            return 0.0
+        amount = min(amount, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            self.tokens -= amount
+            return max(0.0, -self.tokens / self.rate)
+
+    def refund(self, amount: float):
+        if self.rate <= 0:
+            return
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+
+def _is_retryable(error: Exception) -> bool:
+    import openai
+
+    if isinstance(
+        error,
+        (
+            openai.error.RateLimitError,
+            openai.error.Timeout,
+            openai.error.APIConnectionError,
+            openai.error.ServiceUnavailableError,
+            openai.error.TryAgain,
+        ),
+    ):
+        return True
+    if isinstance(error, openai.error.APIError):
+        return error.http_status is None or error.http_status >= 500
+    return False
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    headers = getattr(error, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after", ""))
+    except ValueError:
+        return None
+
+
+def estimate_tokens(request: dict) -> int:
+    """Prompt plus completion tokens a request counts against the
+    tokens-per-minute limit."""
+    characters = sum(
+        len(str(message.get("content") or ""))
+        for message in request.get("messages", [])
+    )
+    completion = request.get("max_tokens") or DEFAULT_COMPLETION_TOKENS
+    return characters // CHARS_PER_TOKEN + completion
+
+
+class LLMGateway:
+    """Process-wide gate in front of the OpenAI API.
+
+    Requests wait for both the requests-per-minute and tokens-per-minute
+    buckets, are retried on rate limits, timeouts and server errors with
+    full-jitter exponential backoff (or the server's Retry-After), and give
+    up once deadline seconds have passed since they were made. Each attempt
+    gets the smaller of its own timeout and the time left. Sync requests
+    share one keep-alive HTTP session; async requests share one aiohttp
+    session per event loop, closed with aclose().
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 200,
+        tokens_per_minute: float = 40000,
+        max_retries: int = 6,
+        deadline: float = 180.0,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        pool_size: int = 16,
+    ):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.deadline = deadline
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.pool_size = pool_size
+        self.session = None
+        self.asessions: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.counts = {
+            "requests": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "failures": 0,
+        }
+        self.queue_wait = 0.0
+        self.queue_wait_max = 0.0
+
+    def install_session(self):
+        """Route the openai package through a pooled keep-alive session."""
+        import openai
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        if self.session is None:
+            self.session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=self.pool_size, pool_maxsize=self.pool_size
+            )
+            self.session.mount("https://", adapter)
+            self.session.mount("http://", adapter)
+        openai.requestssession = self.session
+
+    def _asession(self):
+        """Pooled keep-alive aiohttp session of the running event loop."""
+        import aiohttp
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            session = self.asessions.get(loop)
+            if session is None or session.closed:
+                session = aiohttp.ClientSession(
+                    connector=aiohttp.TCPConnector(limit=self.pool_size)
+                )
+                self.asessions[loop] = session
+        return session
+
+    async def aclose(self):
+        """Close the aiohttp session of the running event loop."""
+        with self._lock:
+            session = self.asessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.close()
+
+    def _count(self, key: str):
+        with self._lock:
+            self.counts[key] += 1
+
+    def _queued(self, wait: float):
+        """Record the rate-limit wait of a request, over all its attempts."""
+        with self._lock:
+            self.queue_wait += wait
+            self.queue_wait_max = max(self.queue_wait_max, wait)
+
+    def _admit(self, request: dict, expires: float) -> float:
+        """Reserve capacity for one attempt; seconds to wait first."""
+        tokens = estimate_tokens(request)
+        wait = max(self.requests.reserve(1), self.tokens.reserve(tokens))
+        if time.monotonic() + wait > expires:
+            self.requests.refund(1)
+            self.tokens.refund(tokens)
+            self._count("failures")
+            raise Exception(
+                f"LLM request deadline of {self.deadline}s exceeded while "
+                "waiting for the rate limit"
+            )
+        return wait
+
+    def _attempt(self, request: dict, expires: float) -> dict:
+        remaining = expires - time.monotonic()
+        timeout = request.get("request_timeout")
+        return {
+            **request,
+            "request_timeout": min(timeout, remaining)
+            if timeout
+            else remaining,
+        }
+
+    def _backoff(self, error: Exception, attempt: int, expires: float):
+        """Seconds to sleep before retrying, or raise error."""
+        import openai
+
+        if not _is_retryable(error) or attempt >= self.max_retries:
+            self._count("failures")
+            raise error
+        if isinstance(error, openai.error.RateLimitError):
+            self._count("rate_limited")
+        delay = _retry_after(error)
+        if delay is None:
+            delay = random.uniform(
+                0, min(self.max_delay, self.base_delay * 2**attempt)
+            )
+        if time.monotonic() + delay > expires:
+            self._count("failures")
+            raise error
+        self._count("retries")
+        return delay
+
+    def call(self, create: Callable[..., Any], **request: Any) -> Any:
+        expires = time.monotonic() + self.deadline
+        self._count("requests")
+        queued = 0.0
+        try:
+            for attempt in range(self.max_retries + 1):
+                wait = self._admit(request, expires)
+                queued += wait
+                time.sleep(wait)
+                try:
+                    return create(**self._attempt(request, expires))
+                except Exception as e:
+                    time.sleep(self._backoff(e, attempt, expires))
+        finally:
+            self._queued(queued)
+
+    async def acall(self, create: Callable[..., Any], **request: Any) -> Any:
+        import openai
+
+        expires = time.monotonic() + self.deadline
+        self._count("requests")
+        queued = 0.0
+        # openai opens a new aiohttp session per request unless one is set.
+        session = openai.aiosession.set(self._asession())
+        try:
+            for attempt in range(self.max_retries + 1):
+                wait = self._admit(request, expires)
+                queued += wait
+                await asyncio.sleep(wait)
+                try:
+                    return await create(**self._attempt(request, expires))
+                except Exception as e:
+                    await asyncio.sleep(self._backoff(e, attempt, expires))
+        finally:
+            openai.aiosession.reset(session)
+            self._queued(queued)
+
+    def wrap(self, client: Any) -> "GatewayClient":
+        return GatewayClient(client, self)
+
+    def metrics(self) -> dict:
+        """Counts of requests and of their retries, rate limits and
+        failures, and the rate-limit wait per request."""
+        with self._lock:
+            requests = self.counts["requests"]
+            return {
+                **self.counts,
+                "queue_wait_mean_ms": round(
+                    1000 * self.queue_wait / requests, 1
+                )
+                if requests
+                else 0.0,
+                "queue_wait_max_ms": round(1000 * self.queue_wait_max, 1),
+            }
+
+
+class GatewayClient:
+    """Stands in for openai.ChatCompletion as the client of a ChatOpenAI,
+    sending its calls through the gateway."""
+
+    def __init__(self, client: Any, gateway: LLMGateway):
+        self.client = client
+        self.gateway = gateway
+
+    def create(self, **kwargs: Any) -> Any:
+        return self.gateway.call(self.client.create, **kwargs)
+
+    async def acreate(self, **kwargs: Any) -> Any:
+        return await self.gateway.acall(self.client.acreate, **kwargs)
+
+
+_gateway: Optional[LLMGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway() -> LLMGateway:
+    """The process-wide gateway, configured from config on first use."""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            from config import config
+
+            settings = config.infrapilot_CONFIG
+            _gateway = LLMGateway(
+                requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+                tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+                max_retries=settings.LLM_MAX_RETRIES,
+                deadline=settings.LLM_REQUEST_DEADLINE,
+            )
+            _gateway.install_session()
+        return _gateway
@@ -0,0 +1,73 @@
+import statistics
+from typing import Any, Optional
+
+from callbacks.handlers import LatencyCallbackHandler
+from config import config
+from utils.llm_gateway import get_gateway
+
+# Call latencies of each model role, shared by the clients of the role.
+latencies: dict[str, LatencyCallbackHandler] = {}
+# Roles served by the completion cache (langchain.llm_cache): the tools'
+# command generation and construction. Planning, translation, summaries
+# and documentation answers always reach the model.
+CACHED_ROLES = ("cli", "construction")
+
+
+def create_llm(role: str, **kwargs: Any):
+    """Chat model client for a role of config.MODEL_ROLES, with the role's
+    model, request timeout and max tokens; kwargs override them.
+
+    Each call returns a new client, so roles never share HTTP settings;
+    requests of every client go through the process-wide LLM gateway.
+    Latencies of the role's calls are recorded for latency_report(), and
+    only CACHED_ROLES use the completion cache.
+    """
+    from langchain.chat_models import ChatOpenAI
+
+    settings = config.infrapilot_CONFIG.models.get(role)
+    if settings is None:
+        raise Exception(f"Unknown model role: {role}")
+    config.require_openai_api_key()
+
+    handler = latencies.setdefault(role, LatencyCallbackHandler())
+    options = {
+        "model_name": settings.model_name,
+        "temperature": 0,
+        "request_timeout": settings.timeout,
+        "max_tokens": settings.max_tokens or None,
+        # The gateway retries; a single attempt per gateway call.
+        "max_retries": 1,
+    }
+    if role not in CACHED_ROLES:
+        options["cache"] = False
+    options.update(kwargs)
+    options["callbacks"] = list(options.get("callbacks") or []) + [handler]
+    llm = ChatOpenAI(**options)
+    llm.client = get_gateway().wrap(llm.client)
+    return llm
+
+
+def latency_marks() -> dict[str, int]:
+    """Number of calls of each role so far, to report the later ones."""
+    return {role: len(handler.calls) for role, handler in latencies.items()}
+
+
+def latency_report(
+    since: Optional[dict[str, int]] = None
+) -> dict[str, dict[str, float]]:
+    """Calls and mean/p50/max latency in ms of each role used so far, or
+    used after the latency_marks() since, e.g. during a turn."""
+    since = since or {}
+    report = {}
+    for role, handler in latencies.items():
+        calls = handler.calls[since.get(role, 0) :]
+        if not calls:
+            continue
+        report[role] = {
+            "model": config.infrapilot_CONFIG.models[role].model_name,
+            "calls": len(calls),
+            "mean_ms": round(1000 * statistics.fmean(calls), 1),
+            "p50_ms": round(1000 * statistics.median(calls), 1),
+            "max_ms": round(1000 * max(calls), 1),
+        }
+    return report
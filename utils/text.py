@@ -0,0 +1,27 @@
+import re
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-_.][a-z0-9]+)*")
+SUBTOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercased terms. Compound CLI tokens such as ``describe-instances``
+    or ``--stack-name`` are kept whole and also split into their parts."""
+    terms = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        terms.append(token)
+        parts = SUBTOKEN_PATTERN.findall(token)
+        if len(parts) > 1:
+            terms.extend(parts)
+    return terms
+
+
+def singular(term: str) -> str:
+    """Term with a plural ending folded, so "pods" matches "pod"."""
+    if term.endswith("ies") and len(term) > 4:
+        return term[:-3] + "y"
+    if term.endswith("sses"):
+        return term[:-2]
+    if term.endswith("s") and not term.endswith("ss") and len(term) > 3:
+        return term[:-1]
+    return term
@@ -6,6 +6,7 @@ from i18n import text
 from colorama import Fore, Style
 from rich.markdown import Markdown
 from rich.console import Console
+from rich.live import Live
 from datetime import datetime
 from dateutil import parser
 from datetime import timezone
@@ -13,6 +14,7 @@ from datetime import timezone
 console = Console()
 
 inform_sent = False
+response_streamed = False
 
 raw_format_prefix = "[raw]"
 
@@ -38,6 +40,20 @@ def get_env_bool(key: str, default: bool = False) -> bool:
         return env.lower() in ["1", "true", "yes", "on"]
 
 
+def get_env_float(key: str, default: float = 0.0) -> float:
+    env = os.getenv(key)
+    if env is None or not env.strip():
+        return default
+    return float(env)
+
+
+def get_env_int(key: str, default: int = 0) -> int:
+    env = os.getenv(key)
+    if env is None or not env.strip():
+        return default
+    return int(env)
+
+
 def print_ai_reasoning(message):
     print(Fore.CYAN + text.get("ai_reasoning") + message + Style.RESET_ALL)
 
@@ -71,6 +87,71 @@ def print_ai_response(message):
         console.print(Markdown(message))
 
 
+def is_response_streamed():
+    global response_streamed
+    if response_streamed:
+        response_streamed = False
+        return True
+
+
+class AIResponseStream:
+    """Renders an AI response while it streams in, the way
+    print_ai_response renders a complete one."""
+
+    def __init__(self):
+        self.text = ""
+        self.raw = None
+        self.live = None
+
+    def write(self, token):
+        global response_streamed
+        self.text += token
+        message = self.text.lstrip()
+        if self.raw is None:
+            # Wait until we know whether the response is raw.
+            if raw_format_prefix.startswith(message):
+                return
+            response_streamed = True
+            print(text.get("response_prefix"), end="")
+            self.raw = message.startswith(raw_format_prefix)
+            if self.raw:
+                sys.stdout.write(message[len(raw_format_prefix) :])
+            else:
+                self.live = Live(
+                    Markdown(message),
+                    console=console,
+                    refresh_per_second=10,
+                    vertical_overflow="visible",
+                )
+                self.live.start()
+        elif self.raw:
+            sys.stdout.write(token)
+        else:
+            self.live.update(Markdown(message))
+        sys.stdout.flush()
+
+    def close(self):
+        global response_streamed
+        message = self.text.strip()
+        if self.raw is None:
+            if message:
+                response_streamed = True
+                print_ai_response(message)
+        elif self.raw:
+            print()
+        else:
+            self.live.update(Markdown(message), refresh=True)
+            self.live.stop()
+
+
+def print_turn_metrics(metrics):
+    print(
+        Style.DIM
+        + ", ".join(f"{key}: {value}" for key, value in metrics.items())
+        + Style.RESET_ALL
+    )
+
+
 def print_rejected_message():
     print(text.get("response_prefix"), end="")
     print(text.get("rejected_message"))